@@ -0,0 +1,121 @@
+"""Measures how long it takes to build the lineage of large executions and
+find their critical paths, to check that both grow linearly with the number
+of process executions. A work directory is generated for each process
+execution, with a ``.command.run`` file which stages in the outputs of up to
+three earlier process executions. The lineage is built from these files,
+first one at a time and then with a pool of threads, and the critical path
+is then found from it.
+
+    $ python benchmarks/critical_path.py --tasks 10000 100000 --workers 8
+
+On a local disk, with the files in the page cache, reading them one at a time
+is fastest. To see the effect of a shared filesystem, where each read waits
+on the network, add a delay to every read with ``--latency`` (in
+milliseconds).
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate import get_task_identifier
+from nextflow.analytics import get_task_dependencies, get_critical_path
+from nextflow.lineage import get_lineage
+from nextflow.models import Execution, ProcessExecution
+
+class SlowIO:
+    """An io object which reads local files, but waits before each read."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+
+    def read(self, path):
+        time.sleep(self.latency)
+        with open(path) as f: return f.read()
+
+
+
+def make_execution(directory, tasks, seed=0):
+    rng = random.Random(seed)
+    execution = Execution(
+        identifier="big_run", stdout="", stderr="", return_code="0",
+        started=datetime(2025, 1, 1), finished=None, command="", log="",
+        path=directory, session_uuid="", process_executions=[]
+    )
+    paths = []
+    for i in range(tasks):
+        identifier, path = get_task_identifier(i)
+        upstream = rng.sample(paths[-1000:], min(len(paths), rng.randint(0, 3)))
+        os.makedirs(os.path.join(directory, "work", path))
+        with open(os.path.join(directory, "work", path, ".command.run"), "w") as f:
+            f.write("#!/bin/bash\nnxf_stage() {\n    true\n")
+            for n, source in enumerate(upstream):
+                f.write(f"    ln -s {directory}/work/{source}/out.txt in{n}.txt\n")
+            f.write("}\n")
+        submitted = datetime(2025, 1, 1) + timedelta(seconds=i)
+        process_execution = ProcessExecution(
+            identifier=identifier, name=f"P{i % 20} ({i})", process=f"P{i % 20}",
+            path=path, stdout="", stderr="", return_code="0", bash="",
+            submitted=submitted, started=submitted + timedelta(seconds=5),
+            finished=submitted + timedelta(seconds=5 + rng.randint(1, 600)),
+            status="COMPLETED", cached=False, io=None
+        )
+        process_execution.execution = execution
+        execution.process_executions.append(process_execution)
+        paths.append(path)
+    return execution
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds to wait before each read")
+    args = parser.parse_args()
+    io = SlowIO(args.latency / 1000) if args.latency else None
+    for tasks in args.tasks:
+        with tempfile.TemporaryDirectory() as directory:
+            execution = make_execution(directory, tasks)
+            times = {}
+            for workers in (1, args.workers):
+                for process_execution in execution.process_executions:
+                    process_execution.staged_inputs = None
+                    process_execution.io = io
+                execution.lineage = None
+                start = time.perf_counter()
+                lineage = get_lineage(execution, workers=workers)
+                times[workers] = time.perf_counter() - start
+            start = time.perf_counter()
+            get_lineage(execution)
+            repeat = time.perf_counter() - start
+            paths = [f"{directory}/work/{p.path}/out.txt" for p in execution.process_executions[:1000]]
+            start = time.perf_counter()
+            for path in paths:
+                lineage.get_producer(path)
+                lineage.get_users(path)
+            lookups = time.perf_counter() - start
+            start = time.perf_counter()
+            dependencies = get_task_dependencies(execution)
+            parsed = time.perf_counter() - start
+            start = time.perf_counter()
+            path = get_critical_path(execution, dependencies)
+            found = time.perf_counter() - start
+            edges = sum(len(d) for d in dependencies.values())
+            print(f"{tasks} tasks, {edges} dependencies")
+            for workers, seconds in times.items():
+                print(f"  lineage, {workers} worker(s): {seconds:.2f}s ({seconds / tasks * 1e6:.1f}us per task)")
+            print(f"  lineage, repeated:    {repeat * 1000:.1f}ms")
+            print(f"  producer and users:   {lookups / len(paths) * 1e6:.2f}us per file")
+            print(f"  dependencies:         {parsed:.3f}s from the lineage")
+            print(f"  critical path found:  {found:.3f}s ({found / tasks * 1e6:.2f}us per task)")
+            print(f"  critical path length: {len(path)} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""A stand-in for the ``nextflow`` executable, for load-testing the launcher
+and poller without a JVM. It accepts the command line the package builds, and
+rather than running a pipeline, acts out a scenario - writing a
+``.nextflow.log``, ``work/xx/yyyy`` directories with their ``.command.*``
+files, a trace file and weblog events as a real run would, at a controllable
+rate.
+
+The scenario is a JSON file, given either as the pipeline path or in the
+``FAKE_NEXTFLOW_SCENARIO`` environment variable. Any of these keys can be
+given:
+
+- ``tasks`` - the number of tasks to run (default 100).
+- ``processes`` - the number of distinct processes (default 10).
+- ``rate`` - tasks submitted per second, or 0 for as fast as possible.
+- ``concurrency`` - how many tasks can run at once (default 16).
+- ``duration`` - how long each task runs for, in seconds (default 0).
+- ``cached`` - how many tasks are reported as cached rather than run.
+- ``failed`` - make every nth task fail, which fails the run.
+- ``output_size`` - the size of each task's ``.command.out``.
+- ``exit`` - the exit code of the run, if not failed.
+
+The ``bin`` directory next to this file contains an executable called
+``nextflow`` which runs this script, and can be put at the front of PATH:
+
+    $ PATH=benchmarks/bin:$PATH python benchmarks/run_and_poll.py
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import uuid
+import urllib.request
+from datetime import datetime, timezone
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate import get_task_identifier, format_time
+
+DEFAULTS = {
+    "tasks": 100, "processes": 10, "rate": 0, "concurrency": 16,
+    "duration": 0, "cached": 0, "failed": 0, "output_size": 64, "exit": 0,
+}
+TRACE_COLUMNS = [
+    "task_id", "hash", "native_id", "name", "status", "exit", "submit",
+    "duration", "realtime", "%cpu", "peak_rss", "peak_vmem", "rchar", "wchar"
+]
+
+def parse_arguments(args):
+    """Picks out the parts of a ``nextflow run`` command line which affect
+    what files are written, ignoring the rest."""
+
+    options = {"log": ".nextflow.log", "pipeline": "", "params": {}}
+    args = [a for a in args if not a.startswith("-D")]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "-log":
+            options["log"] = args[i + 1]
+            i += 1
+        elif arg in ("-c", "-profile", "-params-file", "-with-report",
+                     "-with-timeline", "-with-dag"):
+            i += 1
+        elif arg == "-with-trace":
+            options["trace"] = args[i + 1]
+            i += 1
+        elif arg == "-with-weblog":
+            options["weblog"] = args[i + 1]
+            i += 1
+        elif arg == "-resume":
+            if i + 1 < len(args) and not args[i + 1].startswith("-"): i += 1
+        elif arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options["params"][key] = value
+        elif arg == "run" and not options["pipeline"] and i + 1 < len(args):
+            options["pipeline"] = args[i + 1]
+            i += 1
+        i += 1
+    return options
+
+
+def load_scenario(pipeline):
+    path = pipeline if pipeline.endswith(".json") else os.environ.get("FAKE_NEXTFLOW_SCENARIO")
+    scenario = dict(DEFAULTS)
+    if path:
+        with open(path) as f: scenario.update(json.load(f))
+    return scenario
+
+
+class FakeRun:
+    """Acts out a scenario, writing the files a run would as it goes."""
+
+    def __init__(self, scenario, options):
+        self.scenario = scenario
+        self.work = os.environ.get("NXF_WORK") or os.path.abspath("work")
+        self.log = open(options["log"], "a")
+        self.trace = open(options["trace"], "w") if options.get("trace") else None
+        if self.trace: self.trace.write("\t".join(TRACE_COLUMNS) + "\n")
+        self.weblog = options.get("weblog")
+        self.run_name = "fake_" + "".join(c for c in uuid.uuid4().hex if c.isalpha())[:6]
+        self.session = str(uuid.uuid4())
+        self.failed = False
+
+
+    def write_log(self, thread, level, logger, message):
+        line = f"{format_time(datetime.now())} [{thread}] {level:<5} {logger} - {message}\n"
+        self.log.write(line)
+        self.log.flush()
+
+
+    def send(self, event, trace=None):
+        if not self.weblog: return
+        body = {
+            "runName": self.run_name, "runId": self.session, "event": event,
+            "utcTime": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        }
+        if trace: body["trace"] = trace
+        if event == "completed":
+            body["metadata"] = {"workflow": {"exitStatus": self.exit_code}}
+        request = urllib.request.Request(
+            self.weblog, json.dumps(body).encode(),
+            {"Content-Type": "application/json"}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError:
+            pass
+
+
+    @property
+    def exit_code(self):
+        return 1 if self.failed else self.scenario["exit"]
+
+
+    def task_name(self, i):
+        return f"PROCESS_{i % self.scenario['processes']} ({i})"
+
+
+    def task_trace(self, i, status, submitted, completed=None):
+        identifier, path = get_task_identifier(i)
+        trace = {
+            "task_id": i + 1, "hash": identifier, "name": self.task_name(i),
+            "process": f"PROCESS_{i % self.scenario['processes']}",
+            "status": status, "workdir": os.path.join(self.work, path),
+            "submit": int(submitted * 1000),
+        }
+        if completed is not None:
+            trace.update({
+                "start": int(submitted * 1000), "complete": int(completed * 1000),
+                "exit": 1 if status == "FAILED" else 0,
+                "realtime": int((completed - submitted) * 1000),
+                "%cpu": 99.5, "peak_rss": 1048576, "rchar": 2048, "wchar": 1024,
+            })
+        return trace
+
+
+    def submit(self, i):
+        identifier, path = get_task_identifier(i)
+        full_path = os.path.join(self.work, path)
+        os.makedirs(full_path, exist_ok=True)
+        with open(os.path.join(full_path, ".command.sh"), "w") as f:
+            f.write(f"#!/bin/bash -ue\necho {i}\n")
+        with open(os.path.join(full_path, ".command.run"), "w") as f:
+            f.write(f"#!/bin/bash\n# NEXTFLOW TASK: {self.task_name(i)}\n")
+        self.write_log(
+            "Task submitter", "INFO", "nextflow.Session",
+            f"[{identifier}] Submitted process > {self.task_name(i)}"
+        )
+        print(f"[{identifier}] Submitted process > {self.task_name(i)}", flush=True)
+        open(os.path.join(full_path, ".command.begin"), "w").close()
+        self.send("process_submitted", self.task_trace(i, "SUBMITTED", time.time()))
+
+
+    def cache(self, i):
+        identifier, path = get_task_identifier(i)
+        os.makedirs(os.path.join(self.work, path), exist_ok=True)
+        self.write_log(
+            "Actor Thread 1", "INFO", "nextflow.processor.TaskProcessor",
+            f"[{identifier}] Cached process > {self.task_name(i)}"
+        )
+        print(f"[{identifier}] Cached process > {self.task_name(i)}", flush=True)
+        self.send("process_completed", self.task_trace(i, "CACHED", time.time(), time.time()))
+
+
+    def complete(self, i, submitted):
+        identifier, path = get_task_identifier(i)
+        full_path = os.path.join(self.work, path)
+        failed = self.scenario["failed"] and (i + 1) % self.scenario["failed"] == 0
+        status, exit_code = ("FAILED", 1) if failed else ("COMPLETED", 0)
+        if failed: self.failed = True
+        output = "x" * (self.scenario["output_size"] - 1) + "\n"
+        for name, text in ((".command.out", output), (".command.err", ""),
+                           (".command.log", output), (".exitcode", str(exit_code))):
+            with open(os.path.join(full_path, name), "w") as f: f.write(text)
+        self.write_log(
+            "Task monitor", "DEBUG", "n.processor.TaskPollingMonitor",
+            f"Task completed > TaskHandler[id: {i + 1}; name: {self.task_name(i)}; "
+            f"status: {status}; exit: {exit_code}; error: -; workDir: {full_path}]"
+        )
+        now = time.time()
+        if self.trace:
+            realtime = int((now - submitted) * 1000)
+            self.trace.write("\t".join(map(str, [
+                i + 1, identifier, "-", self.task_name(i), status, exit_code,
+                "-", f"{realtime}ms", f"{realtime}ms", "99.5%", "1 MB", "2 MB",
+                "2 KB", "1 KB"
+            ])) + "\n")
+            self.trace.flush()
+        self.send("process_completed", self.task_trace(i, status, submitted, now))
+
+
+    def run(self):
+        scenario = self.scenario
+        os.makedirs(".nextflow", exist_ok=True)
+        self.write_log("main", "DEBUG", "nextflow.cli.Launcher", "$> nextflow " + " ".join(sys.argv[1:]))
+        self.write_log(
+            "main", "INFO", "nextflow.cli.CmdRun",
+            f"Launching `main.nf` [{self.run_name}] DSL2 - revision: 1a2b3c4d5e"
+        )
+        self.write_log("main", "DEBUG", "nextflow.Session", f"Session UUID: {self.session}")
+        print("N E X T F L O W  ~  version 24.10.0", flush=True)
+        print(f"Launching `main.nf` [{self.run_name}] DSL2 - revision: 1a2b3c4d5e", flush=True)
+        self.send("started")
+
+        start = time.time()
+        interval = 1 / scenario["rate"] if scenario["rate"] else 0
+        running, waiting = [], list(range(scenario["tasks"]))
+        waiting.reverse()
+        next_submission = start
+        while waiting or running:
+            now = time.time()
+            while running and running[0][0] <= now:
+                _, i, submitted = heapq.heappop(running)
+                self.complete(i, submitted)
+            while waiting and len(running) < scenario["concurrency"] and next_submission <= now:
+                i = waiting.pop()
+                if i < scenario["cached"]:
+                    self.cache(i)
+                    continue
+                self.submit(i)
+                heapq.heappush(running, (now + scenario["duration"], i, now))
+                next_submission += interval
+            if self.failed: break
+            events = [running[0][0]] if running else []
+            if waiting and len(running) < scenario["concurrency"]: events.append(next_submission)
+            if events and (delay := min(events) - time.time()) > 0: time.sleep(delay)
+
+        if self.failed:
+            self.write_log(
+                "main", "ERROR", "nextflow.processor.TaskProcessor",
+                "Error executing process > 'PROCESS' - Process terminated with an error exit status (1)"
+            )
+            print("ERROR ~ Error executing process", file=sys.stderr, flush=True)
+        self.send("completed")
+        self.write_log("main", "DEBUG", "nextflow.script.ScriptRunner", "> Execution complete -- Goodbye")
+        self.log.close()
+        if self.trace: self.trace.close()
+        return self.exit_code
+
+
+def main():
+    options = parse_arguments(sys.argv[1:])
+    scenario = load_scenario(options["pipeline"])
+    sys.exit(FakeRun(scenario, options).run())
+
+
+if __name__ == "__main__":
+    main()
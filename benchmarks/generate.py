@@ -0,0 +1,129 @@
+"""Generates synthetic Nextflow executions for the benchmarks - a
+``.nextflow.log`` file, and a ``work`` directory with a subdirectory for every
+task - at whatever scale is needed.
+
+    $ python benchmarks/generate.py /tmp/execution --tasks 10000
+"""
+
+import os
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+START = datetime(2024, 6, 1, 16, 45, 55)
+
+def get_task_identifier(i):
+    """Returns the ``xx/yyyyyy`` identifier, and the full work subdirectory
+    name, of the i-th task. The identifiers are unique and evenly spread over
+    the 256 top-level work directories, as Nextflow's hashes are."""
+
+    digest = hashlib.md5(str(i).encode()).hexdigest()
+    identifier = f"{i % 256:02x}/{i // 256:06x}"
+    return identifier, identifier + digest[8:]
+
+
+def format_time(dt):
+    return dt.strftime("%b-%d %H:%M:%S.") + f"{dt.microsecond // 1000:03d}"
+
+
+def make_log_lines(tasks, processes=20, concurrency=16, cached=0, failed=0):
+    """Creates the lines of a log file for a run of the given number of tasks.
+    The first ``cached`` tasks are reported as cached, and every ``failed``-th
+    task after that fails. Tasks run ``concurrency`` at a time, so submissions
+    and completions are interleaved as they are in a real log.
+
+    :rtype: ``list``"""
+
+    lines = [
+        f"{format_time(START)} [main] DEBUG nextflow.cli.Launcher - $> nextflow run main.nf",
+        f"{format_time(START)} [main] INFO  nextflow.cli.CmdRun - Launching `main.nf` [golden_fermi] DSL2 - revision: 1a2b3c4d5e",
+        f"{format_time(START)} [main] DEBUG nextflow.Session - Session UUID: 3e8c8e5c-4b7a-4f3b-9b6a-1f2e3d4c5b6a",
+    ]
+    clock = START + timedelta(seconds=2)
+    completions = []
+
+    def complete(i):
+        identifier, path = get_task_identifier(i)
+        status, exit_code = ("FAILED", 1) if failed and (i + 1) % failed == 0 else ("COMPLETED", 0)
+        lines.append(
+            f"{format_time(clock)} [Task monitor] DEBUG n.processor.TaskPollingMonitor - "
+            f"Task completed > TaskHandler[id: {i + 1}; name: PROCESS_{i % processes} ({i}); "
+            f"status: {status}; exit: {exit_code}; error: -; workDir: /work/{path}]"
+        )
+
+    for i in range(tasks):
+        clock += timedelta(milliseconds=50)
+        identifier, _ = get_task_identifier(i)
+        if i < cached:
+            lines.append(
+                f"{format_time(clock)} [Actor Thread 1] INFO  nextflow.processor.TaskProcessor - "
+                f"[{identifier}] Cached process > PROCESS_{i % processes} ({i})"
+            )
+            continue
+        lines.append(
+            f"{format_time(clock)} [Task submitter] INFO  nextflow.Session - "
+            f"[{identifier}] Submitted process > PROCESS_{i % processes} ({i})"
+        )
+        lines.append(
+            f"{format_time(clock)} [Task submitter] DEBUG n.executor.local.LocalTaskHandler - "
+            "Launch cmd line: /bin/bash -ue .command.run"
+        )
+        completions.append(i)
+        if len(completions) >= concurrency: complete(completions.pop(0))
+    for i in completions:
+        clock += timedelta(milliseconds=50)
+        complete(i)
+    clock += timedelta(seconds=1)
+    lines.append(f"{format_time(clock)} [main] DEBUG nextflow.script.ScriptRunner - > Execution complete -- Goodbye")
+    return lines
+
+
+def write_log(path, tasks, **kwargs):
+    """Writes a log file for a run of the given number of tasks."""
+
+    with open(path, "w") as f:
+        f.write("\n".join(make_log_lines(tasks, **kwargs)) + "\n")
+
+
+def write_work_tree(path, tasks, output_size=64):
+    """Creates the files of an execution in a directory - its ``stdout.txt``,
+    ``stderr.txt`` and ``rc.txt``, and a ``work/xx/yyyy`` subdirectory for
+    every task containing the files Nextflow leaves there."""
+
+    for name, text in (("stdout.txt", "N E X T F L O W\n"), ("stderr.txt", ""), ("rc.txt", "0\n")):
+        with open(os.path.join(path, name), "w") as f: f.write(text)
+    output = "x" * (output_size - 1) + "\n"
+    for i in range(tasks):
+        _, subdirectory = get_task_identifier(i)
+        full_path = os.path.join(path, "work", subdirectory)
+        os.makedirs(full_path)
+        for name, text in (
+            (".command.sh", f"#!/bin/bash -ue\necho {i}\n"),
+            (".command.run", "#!/bin/bash\n# NEXTFLOW TASK: PROCESS\n"),
+            (".command.begin", ""),
+            (".command.out", output),
+            (".command.err", ""),
+            (".command.log", output),
+            (".exitcode", "0"),
+        ):
+            with open(os.path.join(full_path, name), "w") as f: f.write(text)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="the directory to create the execution in")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=20)
+    parser.add_argument("--cached", type=int, default=0)
+    parser.add_argument("--failed", type=int, default=0, help="fail every nth task")
+    args = parser.parse_args()
+    os.makedirs(args.path, exist_ok=True)
+    write_log(
+        os.path.join(args.path, ".nextflow.log"), args.tasks,
+        processes=args.processes, cached=args.cached, failed=args.failed
+    )
+    write_work_tree(args.path, args.tasks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Measures how long it takes a fresh interpreter to import the package, and
+optionally compares it with the package at an earlier git revision.
+
+    $ python benchmarks/import_time.py --compare ce7cd39
+"""
+
+import os
+import sys
+import time
+import tarfile
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATEMENTS = ["pass", "import nextflow", "import nextflow.log", "from nextflow import run"]
+
+def time_statement(statement, path, runs):
+    env = {**os.environ, "PYTHONPATH": path}
+    times = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", statement], env=env, cwd=path,
+            capture_output=True
+        )
+        times.append(time.perf_counter() - start)
+        if result.returncode: return None
+    return statistics.median(times[1:])
+
+
+def extract_revision(revision, directory):
+    archive = subprocess.run(
+        ["git", "archive", revision, "nextflow"], cwd=ROOT,
+        capture_output=True, check=True
+    ).stdout
+    path = os.path.join(directory, "archive.tar")
+    with open(path, "wb") as f: f.write(archive)
+    with tarfile.open(path) as tar: tar.extractall(directory)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--compare", help="a git revision to compare with")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        trees = [("current", ROOT)]
+        if args.compare:
+            trees.append((args.compare, extract_revision(args.compare, directory)))
+        for name, path in trees:
+            print(name)
+            interpreter = time_statement("pass", path, args.runs)
+            for statement in STATEMENTS[1:]:
+                seconds = time_statement(statement, path, args.runs)
+                if seconds is None:
+                    print(f"  {statement:<26} failed")
+                else:
+                    print(f"  {statement:<26} {(seconds - interpreter) * 1000:6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
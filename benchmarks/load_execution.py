@@ -0,0 +1,38 @@
+"""Measures how the parsing of a large log file by ``load_execution`` scales
+with the number of processes used.
+
+    $ python benchmarks/load_execution.py --tasks 200000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate import write_log
+from nextflow.command import get_process_executions_from_log_file
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, ".nextflow.log")
+        write_log(path, args.tasks)
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"{args.tasks} tasks, {size:.1f} MB log, {os.cpu_count()} CPUs")
+        baseline = None
+        for processes in args.processes:
+            start = time.perf_counter()
+            process_executions = get_process_executions_from_log_file(path, None, processes)
+            seconds = time.perf_counter() - start
+            assert len(process_executions) == args.tasks
+            baseline = baseline or seconds
+            print(f"{processes:>3} processes: {seconds:.2f}s ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
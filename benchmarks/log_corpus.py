@@ -0,0 +1,78 @@
+"""Measures how many log lines per second are parsed for each Nextflow version
+in the log corpus in ``tests/logs``, by each of the ways the package reads a
+log - event iteration, chunk parsing for ``load_execution``, and the line
+scanning ``get_execution`` does while polling. Each version's logs are
+repeated until there are enough lines to time reliably, and the number of
+events found is checked against what the corpus says it should be, so that a
+faster parser which drops tasks is caught too.
+
+    $ python benchmarks/log_corpus.py --lines 200000
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nextflow.io import get_file_text
+from nextflow.log import iter_log_events, parse_log_chunk
+from nextflow.models import Execution
+from nextflow.command import get_initial_process_executions
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "logs")
+
+def load_version(directory):
+    texts, events = [], 0
+    for path in sorted(glob.glob(os.path.join(directory, "*.log"))):
+        with open(path) as f: texts.append(f.read().rstrip("\n") + "\n")
+        with open(path[:-4] + ".json") as f: events += len(json.load(f)["events"])
+    return "".join(texts), events
+
+
+def time_parser(parse, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        found = parse()
+        times.append(time.perf_counter() - start)
+    return min(times), found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for version_directory in sorted(glob.glob(os.path.join(CORPUS, "*"))):
+            text, events = load_version(version_directory)
+            repeats = max(1, args.lines // text.count("\n"))
+            path = os.path.join(directory, "nextflow.log")
+            with open(path, "w") as f: f.write(text * repeats)
+            lines, size = text.count("\n") * repeats, os.path.getsize(path)
+            execution = Execution(
+                identifier="", stdout="", stderr="", return_code="",
+                started=None, finished=None, command="", log="",
+                session_uuid="", path="", process_executions=[]
+            )
+            parsers = {
+                "iter_log_events": lambda: len(list(iter_log_events(path))),
+                "parse_log_chunk": lambda: len(parse_log_chunk(path, 0, size)),
+                "polling scan": lambda: len(get_initial_process_executions(
+                    get_file_text(path), execution, None
+                )[1]),
+            }
+            print(f"{os.path.basename(version_directory)} ({lines} lines, {size / 1024 / 1024:.1f} MB)")
+            for name, parse in parsers.items():
+                seconds, found = time_parser(parse, args.runs)
+                check = ""
+                if name == "iter_log_events" and found != events * repeats:
+                    check = f" - expected {events * repeats} events, found {found}"
+                print(f"  {name:<16} {lines / seconds:>12,.0f} lines/s{check}")
+
+
+if __name__ == "__main__":
+    main()
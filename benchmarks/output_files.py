@@ -0,0 +1,94 @@
+"""Measures how long it takes to find the output files of every process
+execution in a large execution. A work directory is generated for each
+process execution, with Nextflow's own files, a staged input, and a few
+output files - some of them in a subdirectory. The outputs are then found
+with ``all_output_data``, and with :py:func:`get_execution_output_files`
+with and without recursion and hashing, and hashed again to show the effect
+of the hash cache.
+
+    $ python benchmarks/output_files.py --tasks 1000 10000 --size 64 --threads 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate import get_task_identifier
+from nextflow.files import get_execution_output_files, clear_hash_cache
+from nextflow.models import Execution, ProcessExecution
+
+def make_execution(directory, tasks, size):
+    execution = Execution(
+        identifier="big_run", stdout="", stderr="", return_code="0",
+        started=datetime(2025, 1, 1), finished=None, command="", log="",
+        path=directory, session_uuid="", process_executions=[]
+    )
+    data = os.urandom(size * 1024)
+    with open(os.path.join(directory, "input.txt"), "wb") as f: f.write(data)
+    for i in range(tasks):
+        identifier, path = get_task_identifier(i)
+        task = os.path.join(directory, "work", path)
+        os.makedirs(os.path.join(task, "results"))
+        with open(os.path.join(task, ".command.run"), "w") as f:
+            f.write(f"#!/bin/bash\nnxf_stage() {{\n    ln -s {directory}/input.txt input.txt\n}}\n")
+        for name in (".command.sh", ".command.out", ".command.err", ".exitcode"):
+            open(os.path.join(task, name), "w").close()
+        os.symlink(os.path.join(directory, "input.txt"), os.path.join(task, "input.txt"))
+        for name in ("out.bam", "out.bai", "results/a.csv", "results/b.csv"):
+            with open(os.path.join(task, name), "wb") as f: f.write(data)
+        process_execution = ProcessExecution(
+            identifier=identifier, name=f"P ({i})", process="P", path=path,
+            stdout="", stderr="", return_code="0", bash="", submitted=None,
+            started=None, finished=None, status="COMPLETED", cached=False, io=None
+        )
+        process_execution.execution = execution
+        execution.process_executions.append(process_execution)
+    return execution
+
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--size", type=int, default=64, help="kilobytes per output file")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    for tasks in args.tasks:
+        with tempfile.TemporaryDirectory() as directory:
+            execution = make_execution(directory, tasks, args.size)
+            pes = execution.process_executions
+            listed, _ = measure(lambda: [pe.all_output_data() for pe in pes])
+            scanned, _ = measure(lambda: get_execution_output_files(execution, threads=args.threads))
+            recursive, files = measure(lambda: get_execution_output_files(
+                execution, recursive=True, threads=args.threads
+            ))
+            timings = {}
+            for threads in (1, args.threads):
+                clear_hash_cache()
+                timings[threads], _ = measure(lambda: get_execution_output_files(
+                    execution, recursive=True, hashes=True, threads=threads
+                ))
+            cached, _ = measure(lambda: get_execution_output_files(
+                execution, recursive=True, hashes=True, threads=args.threads
+            ))
+            count = sum(len(entries) for entries in files.values())
+            print(f"{tasks} tasks, {count} output entries, {args.size}KB per file")
+            print(f"  all_output_data:       {listed:.2f}s (names only, not recursive)")
+            print(f"  scanned:               {scanned:.2f}s")
+            print(f"  scanned recursively:   {recursive:.2f}s")
+            for threads, seconds in timings.items():
+                print(f"  hashed, {threads} thread(s):   {seconds:.2f}s")
+            print(f"  hashed again, cached:  {cached:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
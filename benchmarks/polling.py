@@ -0,0 +1,164 @@
+"""Measures the cost of following an execution with ``get_execution`` as its
+log grows, for executions of increasing size. For each size a log file and
+work directory tree are generated, and the log is then written out a chunk at
+a time, as Nextflow would, with a poll after each chunk. The time per poll,
+the time to replay the whole run, the peak memory used, and the number of
+file operations made are reported, along with the time spent in each
+phase of ``get_execution``.
+
+    $ python benchmarks/polling.py --tasks 1000 10000 100000
+
+Generating the work tree for 100,000 tasks creates 700,000 files, so it is
+best done on a fast local disk, and is not included by default.
+
+The results can be saved, and later runs checked against them, so that a
+regression in the polling hot paths is caught before release:
+
+    $ python benchmarks/polling.py --save baseline.json
+    $ python benchmarks/polling.py --check baseline.json
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from generate import make_log_lines, write_work_tree
+from nextflow.command import get_execution
+
+class CountingIO:
+    """An io object which performs file operations on the local filesystem,
+    as the package does when no io object is given, but counts them."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+
+    def read(self, path):
+        self.counts["read"] += 1
+        with open(path, "r") as f: return f.read()
+
+
+    def ctime(self, path):
+        self.counts["ctime"] += 1
+        return datetime.fromtimestamp(os.path.getctime(path))
+
+
+    def glob(self, pattern):
+        self.counts["glob"] += 1
+        return glob.glob(pattern)
+
+
+    def abspath(self, path):
+        self.counts["abspath"] += 1
+        return os.path.abspath(path)
+
+
+
+def replay(directory, lines, polls, io=None, on_phase=None):
+    """Writes the log a chunk at a time, polling after each one, and returns
+    the final execution and the time each poll took."""
+
+    log_path = os.path.join(directory, ".nextflow.log")
+    open(log_path, "w").close()
+    size = -(-len(lines) // polls)
+    execution, log_start, times = None, 0, []
+    for start in range(0, len(lines), size):
+        with open(log_path, "a") as f:
+            f.write("\n".join(lines[start:start + size]) + "\n")
+        started = time.perf_counter()
+        execution, diff = get_execution(
+            directory, directory, "nextflow run main.nf", execution, log_start,
+            io=io, on_phase=on_phase
+        )
+        times.append(time.perf_counter() - started)
+        log_start += diff
+    return execution, times
+
+
+def measure(tasks, polls):
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        lines = make_log_lines(tasks)
+        write_work_tree(directory, tasks)
+        setup = time.perf_counter() - started
+
+        io, phases = CountingIO(), Counter()
+        execution, times = replay(
+            directory, lines, polls, io,
+            lambda name, seconds: phases.update({name: seconds})
+        )
+        assert len(execution.process_executions) == tasks
+        assert all(p.bash and p.started for p in execution.process_executions)
+
+        tracemalloc.start()
+        replay(directory, lines, polls)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        started = time.perf_counter()
+        get_execution(directory, directory, "nextflow run main.nf")
+        single = time.perf_counter() - started
+    return {
+        "setup": setup, "replay": sum(times), "poll_mean": sum(times) / len(times),
+        "poll_max": max(times), "single": single, "peak_memory": peak,
+        "operations": dict(io.counts), "phases": dict(phases),
+    }
+
+
+def check(results, baseline, tolerance):
+    """Compares results with a baseline, and returns the regressions found.
+    Times may vary by the tolerance given, but the number of file operations
+    made is deterministic and may not increase at all."""
+
+    regressions = []
+    for tasks, result in results.items():
+        if tasks not in baseline: continue
+        for key in ("replay", "poll_mean", "single", "peak_memory"):
+            if result[key] > baseline[tasks][key] * (1 + tolerance):
+                regressions.append(f"{tasks} tasks: {key} {baseline[tasks][key]:.4g} -> {result[key]:.4g}")
+        for key, count in result["operations"].items():
+            if count > baseline[tasks]["operations"].get(key, 0):
+                regressions.append(f"{tasks} tasks: {key} calls {baseline[tasks]['operations'].get(key, 0)} -> {count}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--save", help="a file to save the results to")
+    parser.add_argument("--check", help="a file of saved results to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    results = {}
+    for tasks in args.tasks:
+        result = measure(tasks, args.polls)
+        results[str(tasks)] = result
+        operations = ", ".join(f"{v} {k}" for k, v in sorted(result["operations"].items()))
+        print(f"{tasks} tasks ({result['setup']:.1f}s to generate)")
+        print(f"  per poll:      {result['poll_mean'] * 1000:.1f}ms mean, {result['poll_max'] * 1000:.1f}ms max")
+        print(f"  full replay:   {result['replay']:.2f}s over {args.polls} polls")
+        print(f"  single poll:   {result['single']:.2f}s for the finished run")
+        print(f"  peak memory:   {result['peak_memory'] / 1024 / 1024:.1f} MB")
+        print(f"  file ops:      {operations}")
+        for name, seconds in sorted(result["phases"].items(), key=lambda p: -p[1]):
+            print(f"    {name:<38} {seconds:.2f}s")
+    if args.save:
+        with open(args.save, "w") as f: json.dump(results, f, indent=4)
+    if args.check:
+        with open(args.check) as f: baseline = json.load(f)
+        regressions = check(results, baseline, args.tolerance)
+        for regression in regressions: print(f"REGRESSION {regression}")
+        if regressions: sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
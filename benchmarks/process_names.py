@@ -0,0 +1,87 @@
+"""Measures how long it takes to find the process names of a pipeline, and
+optionally compares it with the package at an earlier git revision (such as
+ce7cd39, which resolved them with line-based regular expressions).
+
+    $ python benchmarks/process_names.py --compare ce7cd39
+
+Each run is timed twice - cold, with the parse cache cleared first, and
+then warm, when every file has already been parsed. Earlier revisions
+without a parse cache read and parse every file both times. The fake
+``nextflow`` in ``benchmarks/bin`` is put on the PATH, as earlier revisions
+check for Nextflow when they are imported.
+"""
+
+import os
+import sys
+import json
+import tarfile
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BIN = os.path.join(ROOT, "benchmarks", "bin")
+PIPELINE = os.path.join(ROOT, "tests", "integration", "pipelines", "rnaseq", "main.nf")
+CODE = """
+import sys, json, time, statistics
+import nextflow.outputs as outputs
+path, runs = sys.argv[1], int(sys.argv[2])
+clear = getattr(outputs, "clear_parse_cache", lambda: None)
+cold, warm = [], []
+for _ in range(runs):
+    clear()
+    start = time.perf_counter()
+    names = outputs.get_pipeline_process_names(path)
+    cold.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    outputs.get_pipeline_process_names(path)
+    warm.append(time.perf_counter() - start)
+print(json.dumps({
+    "names": len(names), "cold": statistics.median(cold),
+    "warm": statistics.median(warm),
+}))
+"""
+
+def time_tree(path, pipeline, runs):
+    result = subprocess.run(
+        [sys.executable, "-c", CODE, pipeline, str(runs)],
+        env={
+            **os.environ, "PYTHONPATH": path,
+            "PATH": BIN + os.pathsep + os.environ["PATH"],
+        }, cwd=path,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def extract_revision(revision, directory):
+    archive = subprocess.run(
+        ["git", "archive", revision, "nextflow"], cwd=ROOT,
+        capture_output=True, check=True
+    ).stdout
+    path = os.path.join(directory, "archive.tar")
+    with open(path, "wb") as f: f.write(archive)
+    with tarfile.open(path) as tar: tar.extractall(directory)
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--pipeline", default=PIPELINE)
+    parser.add_argument("--compare", help="a git revision to compare with")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        trees = [("current", ROOT)]
+        if args.compare:
+            trees.append((args.compare, extract_revision(args.compare, directory)))
+        for name, path in trees:
+            times = time_tree(path, os.path.abspath(args.pipeline), args.runs)
+            print(
+                f"{name:<10} {times['names']:4} processes  "
+                f"cold {times['cold'] * 1000:6.2f}ms  warm {times['warm'] * 1000:6.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Records how a real execution's files change over time, and replays the
+recording at any speed into a temporary directory while ``run_and_poll``
+watches it - so that polling can be benchmarked against real workloads without
+running them again.
+
+To record, point the recorder at the directory a pipeline is running in
+(before or after it starts) and it will scan it until the run finishes:
+
+    $ python benchmarks/recording.py record /data/runs/rnaseq rnaseq.jsonl
+
+To replay the recording ten times faster than it happened, reporting the time
+spent polling and the file operations made:
+
+    $ python benchmarks/recording.py replay rnaseq.jsonl --speed 10
+
+The recording is a JSON lines file, with one change per line: a directory
+being created, a file being written, or text being appended to a file, along
+with the number of seconds since recording began. Files in the work directory
+are truncated to ``--max-size`` bytes, as only their presence and the start
+of their contents matter to the poller - the log is always recorded in full.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from polling import CountingIO
+
+def scan(path, root=None, found=None):
+    """Finds every file and directory under a path, mapping their paths
+    relative to it to their size and modification time (or ``None`` for
+    directories)."""
+
+    root = root or path
+    found = {} if found is None else found
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return found
+    for entry in entries:
+        relative = os.path.relpath(entry.path, root)
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                found[relative] = None
+                scan(entry.path, root, found)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                found[relative] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+    return found
+
+
+def read_text(path, start=0, size=-1):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(size).decode(errors="replace")
+
+
+def record(path, output, interval=0.5, max_size=65536, timeout=None):
+    """Scans a directory repeatedly, writing every change found to a JSON lines
+    file, until an ``rc.txt`` file appears or the timeout is reached."""
+
+    started = time.perf_counter()
+    known, changes = {}, 0
+    with open(output, "w") as f:
+        while True:
+            elapsed = time.perf_counter() - started
+            current = scan(path)
+            for relative in sorted(current):
+                value, previous = current[relative], known.get(relative, False)
+                if value == previous: continue
+                full_path = os.path.join(path, relative)
+                limit = max_size if relative.startswith("work" + os.sep) else None
+                if value is None:
+                    change = {"t": elapsed, "path": relative, "directory": True}
+                elif previous and previous[0] <= value[0]:
+                    if limit and previous[0] >= limit: continue
+                    end = min(value[0], limit) if limit else value[0]
+                    change = {
+                        "t": elapsed, "path": relative,
+                        "append": read_text(full_path, previous[0], end - previous[0])
+                    }
+                else:
+                    change = {"t": elapsed, "path": relative, "text": read_text(full_path, 0, limit or -1)}
+                f.write(json.dumps(change) + "\n")
+                changes += 1
+            known = current
+            if "rc.txt" in current: break
+            if timeout and elapsed > timeout: break
+            time.sleep(interval)
+    return changes
+
+
+def replay(recording, path, speed=1):
+    """Recreates the changes in a recording in a directory, at the given
+    multiple of the speed at which they happened."""
+
+    started = time.perf_counter()
+    with open(recording) as f:
+        for line in f:
+            change = json.loads(line)
+            delay = change["t"] / speed - (time.perf_counter() - started)
+            if delay > 0: time.sleep(delay)
+            full_path = os.path.join(path, change["path"])
+            if change.get("directory"):
+                os.makedirs(full_path, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "a" if "append" in change else "w") as out:
+                out.write(change.get("append", change.get("text", "")))
+
+
+def benchmark(recording, speed, sleep, count):
+    """Replays a recording into a temporary directory, following it with
+    ``run_and_poll``, and reports how long each poll took."""
+
+    from nextflow import run_and_poll
+    io = CountingIO() if count else None
+    with tempfile.TemporaryDirectory() as directory:
+        thread = threading.Thread(target=replay, args=(recording, directory, speed))
+        polls, tasks, replayed = [], 0, False
+        cpu = time.thread_time()
+        last = time.perf_counter()
+        for execution in run_and_poll(
+            "main.nf", run_path=directory, runner=lambda command: thread.start(),
+            io=io, sleep=sleep
+        ):
+            now = time.perf_counter()
+            polls.append(now - last - sleep)
+            last = now
+            tasks = len(execution.process_executions)
+            if replayed: break
+            replayed = not thread.is_alive()
+        cpu = time.thread_time() - cpu
+        thread.join()
+    print(f"{len(polls)} polls, {tasks} tasks seen")
+    if polls:
+        print(f"  poll time:    {sum(polls) / len(polls) * 1000:.1f}ms mean, {max(polls) * 1000:.1f}ms max")
+    print(f"  polling CPU:  {cpu:.2f}s")
+    if io:
+        print("  file ops:     " + ", ".join(f"{v} {k}" for k, v in sorted(io.counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="record a running execution")
+    record_parser.add_argument("path", help="the directory the execution runs in")
+    record_parser.add_argument("output", help="the file to write the recording to")
+    record_parser.add_argument("--interval", type=float, default=0.5)
+    record_parser.add_argument("--max-size", type=int, default=65536)
+    record_parser.add_argument("--timeout", type=float)
+    replay_parser = subparsers.add_parser("replay", help="replay a recording while polling it")
+    replay_parser.add_argument("recording", help="the recording to replay")
+    replay_parser.add_argument("--speed", type=float, default=1)
+    replay_parser.add_argument("--sleep", type=float, default=1)
+    replay_parser.add_argument("--count", action="store_true", help="count file operations")
+    args = parser.parse_args()
+    if args.command == "record":
+        changes = record(args.path, args.output, args.interval, args.max_size, args.timeout)
+        print(f"{changes} changes recorded")
+    else:
+        benchmark(args.recording, args.speed, args.sleep, args.count)
+
+
+if __name__ == "__main__":
+    main()
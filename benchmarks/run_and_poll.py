@@ -0,0 +1,100 @@
+"""Load-tests ``run_and_poll`` against the fake ``nextflow`` executable in
+``benchmarks/bin``, so that no JVM or real pipeline is needed. One or more
+executions of a scenario are launched at once, and the time and CPU spent
+polling, and how far behind the run the poller falls, are reported.
+
+    $ python benchmarks/run_and_poll.py --tasks 5000 --rate 1000 --executions 4
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin")
+
+def follow(scenario_path, run_path, args, results):
+    from nextflow import run_and_poll
+    polls, lags, seen = [], [], 0
+    started = time.perf_counter()
+    last = started
+    for execution in run_and_poll(
+        scenario_path, run_path=run_path, sleep=args.sleep, push=args.push,
+        trace="trace.txt" if args.trace else None
+    ):
+        now = time.perf_counter()
+        polls.append(now - last - args.sleep)
+        last = now
+        finished = sum(1 for p in execution.process_executions if p.status != "-")
+        written = get_completed_count(run_path)
+        lags.append(written - finished)
+        seen = len(execution.process_executions)
+    results.append({
+        "time": time.perf_counter() - started, "polls": polls, "lags": lags,
+        "seen": seen, "return_code": execution.return_code,
+    })
+
+
+def get_completed_count(run_path):
+    """Counts how many tasks the fake executable has finished so far."""
+
+    try:
+        with open(os.path.join(run_path, ".nextflow.log")) as f:
+            return f.read().count("Task completed >")
+    except FileNotFoundError:
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500, help="tasks per second, 0 for unlimited")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=0.05)
+    parser.add_argument("--failed", type=int, default=0)
+    parser.add_argument("--executions", type=int, default=1)
+    parser.add_argument("--sleep", type=float, default=0.5)
+    parser.add_argument("--push", action="store_true", help="monitor with weblog")
+    parser.add_argument("--trace", action="store_true", help="read a trace file")
+    args = parser.parse_args()
+    os.environ["PATH"] = BIN + os.pathsep + os.environ["PATH"]
+    from nextflow.command import clear_nextflow_path_cache
+    clear_nextflow_path_cache()
+
+    with tempfile.TemporaryDirectory() as directory:
+        scenario_path = os.path.join(directory, "scenario.json")
+        with open(scenario_path, "w") as f:
+            json.dump({
+                "tasks": args.tasks, "rate": args.rate, "failed": args.failed,
+                "concurrency": args.concurrency, "duration": args.duration,
+            }, f)
+        results, threads = [], []
+        cpu = time.process_time()
+        for i in range(args.executions):
+            run_path = os.path.join(directory, f"run{i}")
+            os.mkdir(run_path)
+            threads.append(threading.Thread(
+                target=follow, args=(scenario_path, run_path, args, results)
+            ))
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        cpu = time.process_time() - cpu
+
+    polls = sorted(p for r in results for p in r["polls"])
+    lags = [l for r in results for l in r["lags"]]
+    print(f"{args.executions} x {args.tasks} tasks at {args.rate or 'unlimited'}/s")
+    for i, result in enumerate(results):
+        print(
+            f"  execution {i}: {result['time']:.1f}s, {len(result['polls'])} polls, "
+            f"{result['seen']} tasks seen, return code {result['return_code']}"
+        )
+    print(f"  poll time:    {sum(polls) / len(polls) * 1000:.1f}ms mean, {polls[-1] * 1000:.1f}ms max")
+    print(f"  poll lag:     {sum(lags) / len(lags):.1f} tasks mean, {max(lags)} max")
+    print(f"  polling CPU:  {cpu:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
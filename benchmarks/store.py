@@ -0,0 +1,111 @@
+"""Measures how long it takes to save executions to an ``ExecutionStore``, and
+to query and search its errors, once it holds millions of process executions.
+
+    $ python benchmarks/store.py --executions 1000 --tasks 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nextflow.models import Execution, ProcessExecution
+from nextflow.store import ExecutionStore
+
+ERRORS = [
+    "Killed\n.command.sh: line 3: 1234 Killed  bwa mem ref.fa reads.fq",
+    "Exception in thread \"main\" java.lang.OutOfMemoryError: Java heap space",
+    "[E::bgzf_read] Read block operation failed\nsamtools: truncated file",
+    "Traceback (most recent call last):\nKeyError: 'sample_id'",
+]
+
+def make_execution(i, tasks, processes):
+    started = datetime(2025, 1, 1) + timedelta(hours=i)
+    execution = Execution(
+        identifier=f"run_{i}", stdout="", stderr="", return_code="0",
+        started=started, finished=started + timedelta(hours=1), command="",
+        log="", path=f"/runs/{i}", session_uuid=f"session-{i % 100}",
+        process_executions=[]
+    )
+    for j in range(tasks):
+        finished = started + timedelta(seconds=j)
+        failed = (i + j) % 50 == 0
+        execution.process_executions.append(ProcessExecution(
+            identifier=f"{j % 256:02x}/{j:06x}", name=f"PROCESS_{j % processes} ({j})",
+            process=f"MAIN:SUB:PROCESS_{j % processes}", path="", stdout="",
+            stderr=ERRORS[(i + j) // 50 % len(ERRORS)] if failed else "", return_code="1" if failed else "0",
+            bash="", submitted=finished - timedelta(seconds=30),
+            started=finished - timedelta(seconds=20), finished=finished,
+            status="FAILED" if failed else "COMPLETED", cached=False, io=None
+        ))
+    if i % 100 == 99:
+        execution.log = (
+            "Jan-01 00:00:00.000 [main] ERROR nextflow.cli.Launcher - @unknown\n"
+            "java.nio.file.NoSuchFileException: /data/missing.fq\n\tat x.y(Z.java:1)"
+        )
+    return execution
+
+
+def time_query(name, function, runs=5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    print(f"  {name:<42} {min(times) * 1000:8.2f}ms ({len(result)} results)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--executions", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        with ExecutionStore(os.path.join(directory, "history.db")) as store:
+            start = time.perf_counter()
+            for i in range(args.executions):
+                store.save(make_execution(i, args.tasks, args.processes))
+            seconds = time.perf_counter() - start
+            rows = args.executions * args.tasks
+            print(f"{rows:,} process executions saved in {seconds:.1f}s ({rows / seconds:,.0f}/s)")
+
+            execution = make_execution(args.executions, args.tasks, args.processes)
+            start = time.perf_counter()
+            store.save(execution)
+            first = time.perf_counter() - start
+            execution.process_executions[0].status = "FAILED"
+            start = time.perf_counter()
+            store.save(execution)
+            print(f"  save of a {args.tasks} task execution:    {first * 1000:.1f}ms first, "
+                  f"{(time.perf_counter() - start) * 1000:.1f}ms with one task changed")
+
+            end = datetime(2025, 1, 1) + timedelta(hours=args.executions)
+            time_query("failed tasks of a process in 30 days", lambda: store.get_process_executions(
+                process="PROCESS_7", status="FAILED", since=end - timedelta(days=30)
+            ))
+            time_query("failed tasks of a full process name", lambda: store.get_process_executions(
+                process="MAIN:SUB:PROCESS_7", status="FAILED"
+            ))
+            time_query("all failed tasks in one day", lambda: store.get_process_executions(
+                status="FAILED", since=end - timedelta(days=1)
+            ))
+            time_query("latest 100 tasks", lambda: store.get_process_executions(limit=100))
+            time_query("search errors for a common signature", lambda: store.search_errors(
+                "OutOfMemoryError heap"
+            ))
+            time_query("search errors for a log exception", lambda: store.search_errors(
+                "NoSuchFileException"
+            ))
+            time_query("search errors with a raw query", lambda: store.search_errors(
+                '"truncated file" OR KeyError', limit=100, raw=True
+            ))
+            time_query("executions of a session", lambda: store.get_executions(
+                session_uuid="session-7", process_executions=False
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
-from shutil import which
 from .exceptions import NextflowNotInstalledError
-from .command import run, run_and_poll
 
 __author__ = "Sam Ireland"
 __version__ = "0.12.0"
 
-if not which("nextflow"):
-    raise NextflowNotInstalledError(
-        "Nextflow is either not installed, not in PATH, or is not executable."
-    )
\ No newline at end of file
+def __getattr__(name):
+    """Imports the run functions and submodules on first access, so that
+    importing the package (or any of its modules) doesn't import everything
+    else."""
+
+    if name in ("run", "run_and_poll"):
+        from . import command
+        return getattr(command, name)
+    import importlib
+    try:
+        return importlib.import_module(f"{__name__}.{name}")
+    except ModuleNotFoundError as e:
+        if e.name != f"{__name__}.{name}": raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
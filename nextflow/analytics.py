@@ -0,0 +1,311 @@
+import os
+import math
+import bisect
+from collections import deque
+from datetime import datetime, timedelta
+from functools import lru_cache
+from nextflow.io import get_file_text
+from nextflow.lineage import get_lineage
+from nextflow.models import DurationStatistics
+
+PERCENTILES = (50, 90, 95, 99)
+DURATION_BUCKETS = (1, 10, 30, 60, 300, 600, 1800, 3600, 7200, 21600, 86400)
+EXECUTOR_DIRECTIVES = {
+    "#SBATCH": "slurm", "#PBS": "pbs", "#$": "sge", "#BSUB": "lsf",
+    "#FLUX": "flux", "#MSUB": "moab", "#OAR": "oar", "#HQ": "hq",
+}
+
+def get_timings(executions, executors=False):
+    """Gets the queue wait (submitted to started) and run time (started to
+    finished) of every finished process execution in one or more
+    executions, as ``(process, executor, submitted, queue, run)`` tuples,
+    with the times in seconds. Cached process executions, and those without
+    all three times, are left out.
+
+    Finding the executor means reading a ``.command.run`` file, so it is only
+    done if asked for, and then only once per process per execution.
+
+    :param executions: an execution, or a list of executions.
+    :param bool executors: whether to find the executor of each process execution.
+    :rtype: ``list``"""
+
+    if not isinstance(executions, (list, tuple)): executions = [executions]
+    timings = []
+    for execution in executions:
+        process_executors = {}
+        for pe in execution.process_executions:
+            if pe.cached or not pe.submitted or not pe.started or not pe.finished:
+                continue
+            executor = ""
+            if executors:
+                if pe.process not in process_executors:
+                    process_executors[pe.process] = get_executor(pe)
+                executor = process_executors[pe.process]
+            timings.append((
+                pe.process, executor, pe.submitted,
+                (pe.started - pe.submitted).total_seconds(),
+                (pe.finished - pe.started).total_seconds()
+            ))
+    return timings
+
+
+def get_executor(process_execution):
+    """Works out which executor ran a process execution from the scheduler
+    directives at the top of its ``.command.run`` file - ``#SBATCH`` for
+    SLURM, for example. A script with no directives is assumed to have been
+    run by the local executor, and one that can't be read gives an empty
+    string.
+
+    :param nextflow.models.ProcessExecution process_execution: the process execution.
+    :rtype: ``str``"""
+
+    if not process_execution.path: return ""
+    path = os.path.join(process_execution.full_path, ".command.run")
+    text = get_file_text(path, process_execution.io)
+    if not text: return ""
+    for line in text.splitlines():
+        if line and not line.startswith("#"): break
+        for directive, executor in EXECUTOR_DIRECTIVES.items():
+            if line.startswith(directive + " "): return executor
+    return "local"
+
+
+def get_latency_statistics(executions, by="process", percentiles=PERCENTILES):
+    """Summarises how long process executions spent queued, and how long
+    they spent running, grouped by process or by executor. A long queue wait
+    with a normal run time points to a congested cluster, whereas a long run
+    time with a normal queue wait points to a slow tool.
+
+    Each group maps ``"queue"`` and ``"run"`` to the distribution of those
+    times.
+
+    :param executions: an execution, or a list of executions.
+    :param str by: ``"process"``, ``"executor"`` or ``None`` for one group of everything.
+    :param tuple percentiles: the percentiles to calculate.
+    :rtype: ``dict``"""
+
+    groups = group_timings(get_timings(executions, executors=by == "executor"), by)
+    return {key: {
+        "queue": get_duration_statistics([t[3] for t in timings], percentiles),
+        "run": get_duration_statistics([t[4] for t in timings], percentiles),
+    } for key, timings in groups.items()}
+
+
+def get_latency_histograms(executions, by="process", buckets=DURATION_BUCKETS):
+    """Counts how many process executions had queue waits and run times in
+    each of a set of duration buckets, grouped by process or by executor.
+    Each histogram is a list of counts, one for each bucket's upper bound in
+    seconds and a final one for everything longer.
+
+    :param executions: an execution, or a list of executions.
+    :param str by: ``"process"``, ``"executor"`` or ``None`` for one group of everything.
+    :param tuple buckets: the upper bounds of the buckets, in seconds.
+    :rtype: ``dict``"""
+
+    groups = group_timings(get_timings(executions, executors=by == "executor"), by)
+    return {key: {
+        "queue": get_histogram([t[3] for t in timings], buckets),
+        "run": get_histogram([t[4] for t in timings], buckets),
+    } for key, timings in groups.items()}
+
+
+def get_latency_timeline(executions, interval=timedelta(minutes=10), percentiles=PERCENTILES):
+    """Summarises queue waits and run times over the course of one or more
+    executions, grouping process executions by when they were submitted. A
+    rise in queue wait at a particular time, across all processes, shows
+    when the cluster was congested.
+
+    The returned dictionary maps the start of each interval to the
+    distributions of queue wait and run time for that interval.
+
+    :param executions: an execution, or a list of executions.
+    :param datetime.timedelta interval: the length of each interval.
+    :param tuple percentiles: the percentiles to calculate.
+    :rtype: ``dict``"""
+
+    step = interval.total_seconds()
+    groups = {}
+    for timing in get_timings(executions):
+        seconds = (timing[2] - datetime.min).total_seconds()
+        start = datetime.min + timedelta(seconds=seconds - seconds % step)
+        groups.setdefault(start, []).append(timing)
+    return {start: {
+        "queue": get_duration_statistics([t[3] for t in groups[start]], percentiles),
+        "run": get_duration_statistics([t[4] for t in groups[start]], percentiles),
+    } for start in sorted(groups)}
+
+
+def group_timings(timings, by):
+    """Groups timings by process or executor.
+
+    :param list timings: the timings from :py:func:`get_timings`.
+    :param str by: ``"process"``, ``"executor"`` or ``None``.
+    :rtype: ``dict``"""
+
+    if by not in ("process", "executor", None):
+        raise ValueError(f"Cannot group by {by!r}")
+    index = {"process": 0, "executor": 1, None: None}[by]
+    groups = {}
+    for timing in timings:
+        groups.setdefault(None if index is None else timing[index], []).append(timing)
+    return groups
+
+
+def get_duration_statistics(values, percentiles=PERCENTILES):
+    """Gets the count, mean, minimum, maximum and percentiles of a list of
+    durations in seconds. Percentiles are interpolated linearly between the
+    closest values. NumPy is used if it is installed, which is much faster
+    for large lists, otherwise the same values are calculated in Python.
+
+    :param list values: the durations in seconds.
+    :param tuple percentiles: the percentiles to calculate.
+    :rtype: ``nextflow.models.DurationStatistics``"""
+
+    if not values:
+        return DurationStatistics(0, None, None, None, {p: None for p in percentiles})
+    numpy = _get_numpy()
+    if numpy:
+        array = numpy.asarray(values, dtype=float)
+        return DurationStatistics(
+            count=len(array), mean=float(array.mean()),
+            minimum=float(array.min()), maximum=float(array.max()),
+            percentiles=dict(zip(percentiles, (
+                float(v) for v in numpy.percentile(array, percentiles)
+            )))
+        )
+    ordered = sorted(values)
+    return DurationStatistics(
+        count=len(ordered), mean=math.fsum(ordered) / len(ordered),
+        minimum=ordered[0], maximum=ordered[-1],
+        percentiles={p: get_percentile(ordered, p) for p in percentiles}
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_numpy():
+    """Imports NumPy the first time it is needed, so that importing the
+    package stays quick, and returns it - or ``None`` if it isn't installed.
+
+    :rtype: ``module``"""
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def get_percentile(ordered, percentile):
+    """Gets a percentile of a sorted list, interpolating linearly between the
+    two closest values, as NumPy does by default.
+
+    :param list ordered: the sorted values.
+    :param float percentile: the percentile, from 0 to 100.
+    :rtype: ``float``"""
+
+    rank = (len(ordered) - 1) * percentile / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def get_histogram(values, buckets=DURATION_BUCKETS):
+    """Counts how many values fall into each bucket. A value belongs to the
+    first bucket whose upper bound it doesn't exceed, and values above the
+    last bound are counted in a final extra bucket.
+
+    :param list values: the values.
+    :param tuple buckets: the upper bounds of the buckets, in order.
+    :rtype: ``list``"""
+
+    numpy = _get_numpy()
+    if numpy:
+        indices = numpy.searchsorted(numpy.asarray(buckets, dtype=float), values, side="left")
+        return [int(c) for c in numpy.bincount(indices, minlength=len(buckets) + 1)]
+    counts = [0] * (len(buckets) + 1)
+    for value in values: counts[bisect.bisect_left(buckets, value)] += 1
+    return counts
+
+
+def get_task_dependencies(execution):
+    """Works out which process executions each process execution depends on,
+    from the files staged into its work directory - an input which is a
+    link to a file in another process execution's work directory means that
+    process execution produced it. Inputs from outside the work directory
+    are ignored. This uses the execution's :py:class:`.Lineage`.
+
+    The returned dictionary maps each process execution's identifier to the
+    identifiers of the process executions it depends on.
+
+    :param nextflow.models.Execution execution: the execution.
+    :rtype: ``dict``"""
+
+    lineage = get_lineage(execution)
+    return {identifier: list(upstream) for identifier, upstream in lineage.upstream.items()}
+
+
+def get_critical_path(execution, dependencies=None, include_queue=False):
+    """Finds the chain of dependent process executions which took the
+    longest in total - the critical path which determined how long the
+    execution took. Shortening any process execution on it (with more
+    resources, or by splitting it into parallel tasks) would shorten the
+    execution, whereas shortening anything else would not.
+
+    Each process execution counts for its run time (started to finished),
+    or, if ``include_queue`` is ``True``, for the time from being submitted
+    to finishing. Unfinished and cached process executions count for
+    nothing. The dependencies are found with :py:func:`get_task_dependencies`
+    if they aren't given, and the path is found in time proportional to the
+    number of process executions and dependencies.
+
+    The process executions are returned in the order they ran.
+
+    :param nextflow.models.Execution execution: the execution.
+    :param dict dependencies: the dependencies of each process execution, if already known.
+    :param bool include_queue: whether to count the time spent queued.
+    :rtype: ``list``"""
+
+    if dependencies is None: dependencies = get_task_dependencies(execution)
+    lookup = {pe.identifier: pe for pe in execution.process_executions}
+    downstream = {identifier: [] for identifier in lookup}
+    waiting = {}
+    for identifier in lookup:
+        upstream = [u for u in dependencies.get(identifier, []) if u in lookup]
+        waiting[identifier] = len(upstream)
+        for u in upstream: downstream[u].append(identifier)
+    totals, previous = {}, {}
+    ready = deque(identifier for identifier, count in waiting.items() if not count)
+    while ready:
+        identifier = ready.popleft()
+        best = None
+        for u in dependencies.get(identifier, []):
+            if u in totals and (best is None or totals[u] > totals[best]): best = u
+        previous[identifier] = best
+        totals[identifier] = get_task_weight(lookup[identifier], include_queue) + (
+            totals[best] if best else 0
+        )
+        for d in downstream[identifier]:
+            waiting[d] -= 1
+            if not waiting[d]: ready.append(d)
+    if not totals: return []
+    identifier = max(totals, key=totals.get)
+    path = []
+    while identifier:
+        path.append(lookup[identifier])
+        identifier = previous[identifier]
+    return path[::-1]
+
+
+def get_task_weight(process_execution, include_queue=False):
+    """Gets the number of seconds a process execution counts for on a
+    critical path.
+
+    :param nextflow.models.ProcessExecution process_execution: the process execution.
+    :param bool include_queue: whether to count the time spent queued.
+    :rtype: ``float``"""
+
+    if process_execution.cached or not process_execution.finished: return 0
+    start = process_execution.submitted if include_queue else process_execution.started
+    if not start: start = process_execution.started or process_execution.submitted
+    if not start: return 0
+    return max((process_execution.finished - start).total_seconds(), 0)
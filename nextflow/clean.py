@@ -0,0 +1,90 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+def clean_execution(execution, keep=(), published_path=None, threads=None):
+    """Deletes the work directories of an execution's finished process
+    executions, in parallel, and returns the number of bytes freed. Process
+    executions that haven't finished are always left alone.
+
+    Process executions with one of the statuses in ``keep`` (such as
+    ``"FAILED"``) are kept. If the path the pipeline publishes its outputs to
+    is given, any work directory which a published file links to is also
+    kept, so that symlinked outputs aren't broken.
+
+    :param nextflow.models.Execution execution: the execution to clean.
+    :param keep: the statuses of process executions to keep.
+    :param str published_path: the location of the published outputs.
+    :param int threads: the maximum number of threads to delete with.
+    :rtype: ``int``"""
+
+    linked = get_linked_paths(published_path) if published_path else set()
+    paths = {}
+    for process_execution in execution.process_executions:
+        if process_execution.status == "-" or process_execution.status in keep:
+            continue
+        full_path = process_execution.full_path
+        if not full_path: continue
+        path = os.path.realpath(full_path)
+        if path in linked: continue
+        paths[path] = None
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return sum(executor.map(remove_directory, paths))
+
+
+def get_linked_paths(path):
+    """Finds every symlink under a directory and returns the set of paths they
+    point to, along with every directory containing those paths.
+
+    :param str path: the directory to search.
+    :rtype: ``set``"""
+
+    linked = set()
+    for root, directories, files in os.walk(path):
+        for name in directories + files:
+            full_path = os.path.join(root, name)
+            if not os.path.islink(full_path): continue
+            target = os.path.realpath(full_path)
+            while target not in linked:
+                linked.add(target)
+                target = os.path.dirname(target)
+    return linked
+
+
+def remove_directory(path):
+    """Deletes a directory and everything in it, and returns the total size
+    in bytes of the files that were deleted. Symlinks are deleted but not
+    followed. If the directory doesn't exist, 0 is returned. Anything which
+    couldn't be deleted (such as files without permission) is left in place
+    and isn't counted.
+
+    :param str path: the directory to delete.
+    :rtype: ``int``"""
+
+    size = get_directory_size(path)
+    shutil.rmtree(path, ignore_errors=True)
+    if os.path.lexists(path): size -= get_directory_size(path)
+    return size
+
+
+def get_directory_size(path):
+    """Gets the total size in bytes of the files in a directory, without
+    following symlinks.
+
+    :param str path: the directory to measure.
+    :rtype: ``int``"""
+
+    size = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                size += get_directory_size(entry.path)
+            else:
+                size += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return size
@@ -1,9 +1,15 @@
 import os
 import re
+import json
 import time
 import weakref
 import subprocess
+from shutil import which
+from itertools import repeat
+from contextlib import nullcontext
 from datetime import datetime
+from nextflow.exceptions import NextflowNotInstalledError
+from nextflow.trace import update_process_executions_from_trace
 from nextflow.io import get_file_text, get_process_ids_to_paths, get_file_creation_time
 from nextflow.models import Execution, ProcessExecution, ExecutionSubmission
 from nextflow.log import (
@@ -14,8 +20,16 @@ from nextflow.log import (
     parse_cached_line,
     parse_submitted_line,
     parse_completed_line,
+    get_log_chunks,
+    get_log_ends,
+    parse_log_chunk,
 )
 
+PARAMS_FILE_THRESHOLD = 16384
+PARAMS_FILE = ".nextflow.params.json"
+
+_nextflow_path_cache = {}
+
 def run(*args, **kwargs):
     """Runs a pipeline and returns the execution.
 
@@ -29,12 +43,20 @@ def run(*args, **kwargs):
     :param str java_home: the path to the Java installation to use.
     :param list configs: any config files to be applied.
     :param dict params: the parameters to pass.
+    :param params_file: whether to pass the parameters in a JSON file.
     :param list profiles: any profiles to be applied.
     :param str timezone: the timezone to use for the log.
     :param str report: the filename to use for the execution report.
     :param str timeline: the filename to use for the timeline report.
     :param str dag: the filename to use for the DAG report.
     :param str trace: the filename to use for the trace report.
+    :param bool progress: whether to estimate progress on the execution.
+    :param dict durations: historical process durations for the estimate.
+    :param bool push: whether to receive updates from Nextflow by weblog, on 127.0.0.1.
+    :param function on_phase: a callback to profile each poll with.
+    :param nextflow.store.ExecutionStore store: a database to save the execution to.
+    :param nextflow.metrics.MetricsExporter metrics: metrics to update from each poll.
+    :param nextflow.spans.SpanExporter spans: an exporter to send trace spans to.
     :rtype: ``nextflow.models.Execution``"""
 
     return list(_run(*args, poll=False, **kwargs))[0]
@@ -55,6 +77,7 @@ def run_and_poll(*args, **kwargs):
     :param str java_home: the path to the Java installation to use.
     :param list configs: any config files to be applied.
     :param dict params: the parameters to pass.
+    :param params_file: whether to pass the parameters in a JSON file.
     :param list profiles: any profiles to be applied.
     :param str timezone: the timezone to use for the log.
     :param str report: the filename to use for the execution report.
@@ -62,6 +85,13 @@ def run_and_poll(*args, **kwargs):
     :param str dag: the filename to use for the DAG report.
     :param str trace: the filename to use for the trace report.
     :param int sleep: the number of seconds to wait between polls.
+    :param bool progress: whether to estimate progress on each execution.
+    :param dict durations: historical process durations for the estimate.
+    :param bool push: whether to receive updates from Nextflow by weblog, on 127.0.0.1.
+    :param function on_phase: a callback to profile each poll with.
+    :param nextflow.store.ExecutionStore store: a database to save the execution to.
+    :param nextflow.metrics.MetricsExporter metrics: metrics to update from each poll.
+    :param nextflow.spans.SpanExporter spans: an exporter to send trace spans to.
     :rtype: ``nextflow.models.Execution``"""
 
     for execution in _run(*args, poll=True, **kwargs):
@@ -72,39 +102,119 @@ def _run(
         pipeline_path, resume=False, poll=False, run_path=None, output_path=None,
         log_path=None, runner=None, io=None, java_home=None,
         version=None, configs=None, params=None, profiles=None, timezone=None,
-        report=None, timeline=None, dag=None, trace=None, sleep=1
+        report=None, timeline=None, dag=None, trace=None, sleep=1,
+        progress=False, durations=None, params_file=None, push=False,
+        on_phase=None, store=None, metrics=None, spans=None
 ):
-    submission = submit_execution(
-        pipeline_path=pipeline_path,
-        resume=resume,
-        run_path=run_path,
-        output_path=output_path,
-        log_path=log_path,
-        runner=runner,
-        io=io,
-        version=version,
-        java_home=java_home,
-        configs=configs,
-        dag=dag,
-        trace=trace,
-        timeline=timeline,
-        report=report,
-        profiles=profiles,
-        timezone=timezone,
-        params=params
-    )
+    receiver = None
+    if push:
+        from nextflow.weblog import WeblogReceiver
+        receiver = WeblogReceiver()
+        receiver.start()
+    try:
+        submission = submit_execution(
+            pipeline_path=pipeline_path,
+            resume=resume,
+            run_path=run_path,
+            output_path=output_path,
+            log_path=log_path,
+            runner=runner,
+            io=io,
+            version=version,
+            java_home=java_home,
+            configs=configs,
+            dag=dag,
+            trace=trace,
+            timeline=timeline,
+            report=report,
+            profiles=profiles,
+            timezone=timezone,
+            params=params,
+            params_file=params_file,
+            weblog=receiver.url if receiver else None
+        )
+
+        if progress:
+            from nextflow.progress import get_progress, get_expected_process_names
+            process_names = get_expected_process_names(pipeline_path, submission.run_path)
+        if receiver:
+            for execution in poll_weblog(receiver, submission, poll, sleep, timezone, io):
+                if progress:
+                    execution.progress = get_progress(execution, process_names, durations)
+                if store: store.save(execution)
+                if metrics: metrics.update(execution, active=True)
+                if spans: spans.update(execution)
+                yield execution
+            return
+        execution, log_start, trace_offset, trace_pending = None, 0, 0, {}
+        while True:
+            time.sleep(sleep)
+            if metrics: started = time.perf_counter()
+            execution, diff = get_execution(
+                submission.output_path, submission.log_path, submission.nextflow_command, execution, log_start, timezone, io, on_phase
+            )
+            log_start += diff
+            if metrics: metrics.update(execution, time.perf_counter() - started, log_start if execution else 0)
+            if execution and trace:
+                trace_offset = update_process_executions_from_trace(
+                    execution.process_executions,
+                    os.path.join(submission.output_path, trace), trace_offset,
+                    trace_pending, io
+                )
+            if execution and progress:
+                execution.progress = get_progress(execution, process_names, durations)
+            if execution and store: store.save(execution)
+            if execution and spans: spans.update(execution)
+            if execution and poll: yield execution
+            if execution and execution.return_code and execution.finished:
+                if not poll: yield execution
+                break
+    finally:
+        if receiver: receiver.stop()
+
+
+def poll_weblog(receiver, submission, poll, sleep, timezone=None, io=None):
+    """Follows a running execution from the events Nextflow sends to a weblog
+    receiver, rather than by reading its log and work directory. If polling,
+    the execution is yielded whenever new events arrive.
+
+    The only file checked while running is ``rc.txt``, in case Nextflow exits
+    before it can send any events. Once the execution has finished, it is
+    loaded in full from its log and work directory as usual, keeping the
+    resource metrics received, and yielded a final time.
+
+    :param nextflow.weblog.WeblogReceiver receiver: the running receiver.
+    :param nextflow.models.ExecutionSubmission submission: the submission.
+    :param bool poll: whether to yield the execution after each update.
+    :param int sleep: the number of seconds to wait between checks.
+    :param str timezone: the timezone to use.
+    :param io: an optional custom io object to handle file operations.
+    :rtype: ``nextflow.models.Execution``"""
 
-    execution, log_start = None, 0
+    from nextflow.weblog import apply_weblog_events, copy_weblog_metrics
+    execution = make_or_update_execution(
+        "", submission.output_path, submission.nextflow_command, None, io
+    )
+    rc_path = os.path.join(submission.output_path, "rc.txt")
     while True:
         time.sleep(sleep)
-        execution, diff = get_execution(
-            submission.output_path, submission.log_path, submission.nextflow_command, execution, log_start, timezone, io
-        )
-        log_start += diff
-        if execution and poll: yield execution
-        if execution and execution.return_code and execution.finished:
-            if not poll: yield execution
+        events = receiver.get_events()
+        if events: apply_weblog_events(execution, events, timezone)
+        return_code = get_file_text(rc_path, io).rstrip()
+        if return_code or (execution.finished and execution.return_code):
+            final, _ = get_execution(
+                submission.output_path, submission.log_path,
+                submission.nextflow_command, None, 0, timezone, io
+            )
+            if final:
+                copy_weblog_metrics(execution, final)
+                final.return_code = final.return_code or execution.return_code
+                final.finished = final.finished or execution.finished
+                execution = final
+            execution.return_code = execution.return_code or return_code
+            yield execution
             break
+        if events and poll: yield execution
 
 
 def submit_execution(
@@ -125,6 +235,8 @@ def submit_execution(
         timeline=None,
         dag=None,
         trace=None,
+        params_file=None,
+        weblog=None,
 ):
     """Submits an execution and returns information about that submission as an
     `ExecutionSubmission` object.
@@ -140,26 +252,32 @@ def submit_execution(
     :param str java_home: the path to the Java installation to use.
     :param list configs: any config files to be applied.
     :param dict params: the parameters to pass.
+    :param params_file: whether to pass the parameters in a JSON file.
     :param list profiles: any profiles to be applied.
     :param str timezone: the timezone to use for the log.
     :param str report: the filename to use for the execution report.
     :param str timeline: the filename to use for the timeline report.
     :param str dag: the filename to use for the DAG report.
     :param str trace: the filename to use for the trace report.
+    :param str weblog: a URL for Nextflow to send weblog events to.
     :rtype: ``nextflow.models.ExecutionSubmission``"""
 
     if not run_path and not io: run_path = os.path.abspath(".")
     if not run_path and io: run_path = io.abspath(".")
     if not output_path: output_path = run_path
     if not log_path: log_path = output_path
+    params_file = use_params_file(params, params_file)
+    if params_file: write_params_file(params, output_path, io)
     nextflow_command = make_nextflow_command(
         run_path, output_path, log_path, pipeline_path, resume, version, java_home,
-        configs, params, profiles, timezone, report, timeline, dag, trace, io
+        configs, params, profiles, timezone, report, timeline, dag, trace, io,
+        params_file, weblog
     )
     start = datetime.now()
     if runner:
         runner(nextflow_command)
     else:
+        check_nextflow_installed()
         process = subprocess.Popen(
             nextflow_command, universal_newlines=True, shell=True
         )
@@ -173,7 +291,41 @@ def submit_execution(
     return submission
 
 
-def make_nextflow_command(run_path, output_path, log_path, pipeline_path, resume, version, java_home, configs, params, profiles, timezone, report, timeline, dag, trace, io):
+def check_nextflow_installed():
+    """Raises an error if there is no Nextflow executable on the system. This
+    is checked the first time a pipeline is run without a custom runner,
+    rather than when the package is imported.
+
+    :raises NextflowNotInstalledError: if Nextflow can't be found."""
+
+    if not get_nextflow_path():
+        raise NextflowNotInstalledError(
+            "Nextflow is either not installed, not in PATH, or is not executable."
+        )
+
+
+def get_nextflow_path():
+    """Finds the full path to the Nextflow executable, or ``None`` if there
+    isn't one. Once found, the path is cached for the rest of the session,
+    but if Nextflow isn't found the PATH is searched again next time, so
+    that installing it later in the session works.
+
+    :rtype: ``str``"""
+
+    if "nextflow" in _nextflow_path_cache: return _nextflow_path_cache["nextflow"]
+    path = which("nextflow")
+    if path: _nextflow_path_cache["nextflow"] = path
+    return path
+
+
+def clear_nextflow_path_cache():
+    """Forgets the cached path to the Nextflow executable, so that the PATH
+    is searched again."""
+
+    _nextflow_path_cache.clear()
+
+
+def make_nextflow_command(run_path, output_path, log_path, pipeline_path, resume, version, java_home, configs, params, profiles, timezone, report, timeline, dag, trace, io, params_file=None, weblog=None):
     """Generates the `nextflow run` commmand.
 
     :param str run_path: the location to run the pipeline in.
@@ -192,6 +344,8 @@ def make_nextflow_command(run_path, output_path, log_path, pipeline_path, resume
     :param str dag: the filename to use for the DAG report.
     :param str trace: the filename to use for the trace report.
     :param io: an optional custom io object to handle file operations.
+    :param params_file: whether to pass the parameters in a JSON file.
+    :param str weblog: a URL for Nextflow to send weblog events to.
     :rtype: ``str``"""
 
     env = make_nextflow_command_env_string(version, timezone, output_path, run_path, java_home)
@@ -203,9 +357,13 @@ def make_nextflow_command(run_path, output_path, log_path, pipeline_path, resume
     if configs: configs += " "
     resume = make_nextflow_command_resume_string(resume)
     if resume: resume = f"{resume} "
-    params = make_nextflow_command_params_string(params)
+    if use_params_file(params, params_file):
+        params = make_nextflow_command_params_file_string(output_path)
+    else:
+        params = make_nextflow_command_params_string(params)
     profiles = make_nextflow_command_profiles_string(profiles)
     reports = make_reports_string(output_path, report, timeline, dag, trace)
+    if weblog: reports = f"{reports} -with-weblog {weblog}".lstrip()
     command = f"{env}{nf} {log}{configs}run {pipeline_path} {resume}{params} {profiles} {reports}"
     abspath = io.abspath if io else os.path.abspath
     if run_path != abspath("."): command = f"cd {run_path}; {command}"
@@ -278,13 +436,70 @@ def make_nextflow_command_params_string(params):
     for key, value in params.items():
         if not value:
             param_list.append(f"--{key}=")
-        elif value[0] in "'\"":
+            continue
+        if not isinstance(value, str): value = json.dumps(value)
+        if value[0] in "'\"":
             param_list.append(f"--{key}={value}")
         else:
             param_list.append(f"--{key}='{value}'")
     return " ".join(param_list)
 
 
+def use_params_file(params, params_file=None):
+    """Decides whether parameters should be passed in a JSON file rather than
+    on the command line. If ``params_file`` is ``None``, a file is used if the
+    parameters would make a very long command, or if any of them is a
+    non-empty value which isn't a string, such as a nested list or
+    dictionary. Empty values like ``None`` and ``0`` are passed as ``--key=``
+    as they always have been.
+
+    :param dict params: the parameters to pass.
+    :param params_file: whether to pass the parameters in a JSON file.
+    :rtype: ``bool``"""
+
+    if not params: return False
+    if params_file is not None: return bool(params_file)
+    return any(value and not isinstance(value, str) for value in params.values()) or \
+        len(make_nextflow_command_params_string(params)) > PARAMS_FILE_THRESHOLD
+
+
+def write_params_file(params, output_path, io=None):
+    """Writes the parameters to a JSON file in the output directory, to be
+    passed to Nextflow with ``-params-file``. Unlike command-line parameters,
+    these can be of any size, and can be nested lists and dictionaries. Any
+    quotes around string values, which would be removed by the shell on the
+    command line, are removed.
+
+    :param dict params: the parameters to pass.
+    :param str output_path: the location to store the output in.
+    :param io: an optional custom io object to handle writing.
+    :rtype: ``str``"""
+
+    values = {}
+    for key, value in params.items():
+        if isinstance(value, str) and len(value) > 1 and \
+            value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        values[key] = value
+    path = os.path.join(output_path, PARAMS_FILE)
+    text = json.dumps(values)
+    if io:
+        io.write(path, text)
+    else:
+        with open(path, "w") as f: f.write(text)
+    return path
+
+
+def make_nextflow_command_params_file_string(output_path):
+    """Creates the portion of the nextflow run command string which passes
+    the parameters file written by :py:func:`write_params_file`.
+
+    :param str output_path: the location to store the output in.
+    :rtype: ``str``"""
+
+    return f"-params-file '{os.path.join(output_path, PARAMS_FILE)}'"
+
+
 def make_nextflow_command_profiles_string(profiles):
     """Creates the profile setting portion of the nextflow run command string.
 
@@ -331,10 +546,16 @@ def wait_for_log_creation(output_path, start, io):
         time.sleep(0.1)
 
 
-def get_execution(execution_path, log_path, nextflow_command, execution=None, log_start=0, timezone=None, io=None):
+def get_execution(execution_path, log_path, nextflow_command, execution=None, log_start=0, timezone=None, io=None, on_phase=None):
     """Creates an execution object from a location. If you are polling, you can
     pass in the previous execution to update it with new information.
 
+    If a profiling callback is given, it is called after each phase of the
+    update with the phase's name and the number of seconds it took. The
+    phases are ``read_log``, ``make_or_update_execution``,
+    ``get_initial_process_executions``, ``get_process_ids_to_paths`` and
+    ``update_process_execution_from_path`` (all process executions together).
+
     :param str execution_path: the location of the execution.
     :param str log_path: the location of the log.
     :param str nextflow_command: the command used to run the pipeline.
@@ -342,25 +563,126 @@ def get_execution(execution_path, log_path, nextflow_command, execution=None, lo
     :param int log_start: the number of lines already read from the log.
     :param str timezone: the timezone to use for the log.
     :param io: an optional custom io object to handle file operations.
+    :param function on_phase: an optional callback to profile each phase with.
     :rtype: ``nextflow.models.Execution``"""
 
+    if on_phase: start = time.perf_counter()
     log = get_file_text(os.path.join(log_path, ".nextflow.log"), io)
+    if on_phase: start = report_phase(on_phase, "read_log", start)
     if not log: return None, 0
     log = log[log_start:]
     execution = make_or_update_execution(log, execution_path, nextflow_command, execution, io)
+    if on_phase: start = report_phase(on_phase, "make_or_update_execution", start)
     process_executions, changed = get_initial_process_executions(log, execution, io)
+    if on_phase: start = report_phase(on_phase, "get_initial_process_executions", start)
     no_path = [k for k, v in process_executions.items() if not v.path]
     process_ids_to_paths = get_process_ids_to_paths(no_path, execution_path, io)
     for process_id, path in process_ids_to_paths.items():
         process_executions[process_id].path = path
+    if on_phase: start = report_phase(on_phase, "get_process_ids_to_paths", start)
     for process_execution in process_executions.values():
         if not process_execution.finished or not process_execution.started or \
          process_execution.identifier in changed:
             update_process_execution_from_path(process_execution, execution_path, timezone, io)
+    if on_phase: report_phase(on_phase, "update_process_execution_from_path", start)
     execution.process_executions = list(process_executions.values())
     return execution, len(log)
 
 
+def report_phase(on_phase, name, start):
+    """Passes the time since a phase started to a profiling callback, and
+    returns the time after the callback so that the next phase can be timed
+    from it without including the callback's own time.
+
+    :param function on_phase: the profiling callback.
+    :param str name: the name of the phase.
+    :param float start: the ``time.perf_counter`` value the phase started at.
+    :rtype: ``float``"""
+
+    on_phase(name, time.perf_counter() - start)
+    return time.perf_counter()
+
+
+def load_execution(execution_path, log_path=None, nextflow_command="", timezone=None, processes=None):
+    """Creates an execution object from the files of an execution which has
+    already taken place. The log file is split into chunks which are parsed in
+    separate processes, making this suitable for very large log files.
+
+    Only the start and end of the log are read in this process, for the
+    execution's own details, so the execution's ``log`` is just the end of the
+    log file (see :py:func:`.get_log_ends`) rather than all of it.
+
+    :param str execution_path: the location of the execution.
+    :param str log_path: the location of the log (if not execution path).
+    :param str nextflow_command: the command used to run the pipeline.
+    :param str timezone: the timezone to use for the log.
+    :param int processes: the number of processes to parse the log with.
+    :rtype: ``nextflow.models.Execution``"""
+
+    path = os.path.join(log_path or execution_path, ".nextflow.log")
+    head, tail = get_log_ends(path)
+    if not head: return None
+    execution = make_or_update_execution(head, execution_path, nextflow_command, None, None)
+    execution.finished = execution.finished or get_finished_from_log(tail)
+    execution.log = tail
+    process_executions = get_process_executions_from_log_file(path, execution, processes)
+    process_ids_to_paths = get_process_ids_to_paths(list(process_executions), execution_path)
+    for process_id, path in process_ids_to_paths.items():
+        process_executions[process_id].path = path
+    for process_execution in process_executions.values():
+        update_process_execution_from_path(process_execution, execution_path, timezone)
+    execution.process_executions = list(process_executions.values())
+    return execution
+
+
+def get_process_executions_from_log_file(path, execution, processes=None):
+    """Parses a complete log file across several processes and creates the
+    process executions it reports. The events found in each chunk of the file
+    are applied in file order, so that a completion is always matched to its
+    submission even when the two are parsed by different processes. If there
+    is only one process or one chunk, the file is parsed in this process.
+
+    :param str path: the location of the log file.
+    :param nextflow.models.Execution execution: the containing execution.
+    :param int processes: the number of processes to use.
+    :rtype: ``dict``"""
+
+    processes = processes or os.cpu_count() or 1
+    chunks = get_log_chunks(path, processes)
+    args = (repeat(path), [c[0] for c in chunks], [c[1] for c in chunks])
+    process_executions = {}
+    if processes == 1 or len(chunks) < 2:
+        executor = nullcontext()
+        results = map(parse_log_chunk, *args)
+    else:
+        # multiprocessing is slow to import, and only needed here
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=processes)
+        results = executor.map(parse_log_chunk, *args)
+    with executor:
+        for events in results:
+            for event in events:
+                if event.type == "completed":
+                    process_execution = process_executions.get(event.identifier)
+                    if not process_execution: continue
+                    process_execution.finished = event.timestamp
+                    process_execution.return_code = event.return_code
+                    process_execution.status = event.status
+                else:
+                    cached = event.type == "cached"
+                    process_execution = ProcessExecution(
+                        identifier=event.identifier, name=event.name,
+                        process=event.process,
+                        submitted=None if cached else event.timestamp, path="",
+                        stdout="", stderr="", bash="", started=None,
+                        finished=None, return_code=event.return_code,
+                        status=event.status or "-", cached=cached, io=None
+                    )
+                    process_execution.execution = execution
+                    process_executions[event.identifier] = process_execution
+    return process_executions
+
+
 def make_or_update_execution(log, execution_path, nextflow_command, execution, io):
     """Creates an Execution object from a log file, or updates an existing one
     from a previous poll.
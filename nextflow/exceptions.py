@@ -1,3 +1,9 @@
 class NextflowNotInstalledError(Exception):
-    """Error raised if nextflow.py is imported but there is no Nextflow
-    executable on the system."""
\ No newline at end of file
+    """Error raised if nextflow.py is asked to run a pipeline but there is no
+    Nextflow executable on the system."""
+
+
+
+class SQLiteNotSupportedError(Exception):
+    """Error raised if an execution store is created but the SQLite library
+    Python is using lacks a feature the store needs."""
@@ -0,0 +1,248 @@
+import os
+import hashlib
+from types import SimpleNamespace
+from datetime import datetime
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from nextflow.models import FileEntry
+
+_hash_cache = {}
+
+def get_output_files(process_execution, recursive=False, hashes=False, algorithm="sha256", threads=None):
+    """Finds the files and directories a process execution produced in its
+    work directory, with their sizes, modification times and types. Nextflow's
+    own ``.command.*`` and ``.exitcode`` files, and the inputs staged into the
+    directory, are left out.
+
+    If ``recursive`` is ``True``, the contents of output directories are
+    included too (symlinked directories are not followed). If ``hashes`` is
+    ``True``, each file's contents are hashed, in parallel - see
+    :py:func:`hash_entries`.
+
+    If the process execution has a custom io object, its ``scandir`` method
+    is used to list directories if it has one - otherwise its ``listdir``,
+    ``abspath`` and ``ctime`` methods are used (see :py:class:`IOEntry`).
+    Files are hashed by reading them through it.
+
+    :param nextflow.models.ProcessExecution process_execution: the process execution.
+    :param bool recursive: whether to look inside output directories.
+    :param bool hashes: whether to calculate a hash of each file's contents.
+    :param str algorithm: the ``hashlib`` algorithm to hash with.
+    :param int threads: the maximum number of threads to hash with.
+    :rtype: ``list``"""
+
+    if not process_execution.path: return []
+    exclude = set(process_execution.input_data(include_path=False))
+    io = process_execution.io
+    entries = scan_directory(
+        str(process_execution.full_path), recursive, exclude, get_scandir(io)
+    )
+    if hashes: entries = hash_entries(entries, algorithm, threads, io)
+    return entries
+
+
+def get_execution_output_files(execution, recursive=False, hashes=False, algorithm="sha256", threads=None):
+    """Finds the output files of every process execution in an execution,
+    scanning their work directories in parallel, and then hashing all of
+    their files together if asked to (in one pool for each io object they
+    use). Process executions whose work
+    directory isn't known are left out.
+
+    The returned dictionary maps each process execution's identifier to its
+    output files.
+
+    :param nextflow.models.Execution execution: the execution.
+    :param bool recursive: whether to look inside output directories.
+    :param bool hashes: whether to calculate a hash of each file's contents.
+    :param str algorithm: the ``hashlib`` algorithm to hash with.
+    :param int threads: the maximum number of threads to use.
+    :rtype: ``dict``"""
+
+    process_executions = [pe for pe in execution.process_executions if pe.path]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        scanned = list(executor.map(
+            lambda pe: get_output_files(pe, recursive), process_executions
+        ))
+    if hashes:
+        groups = {}
+        for index, pe in enumerate(process_executions):
+            groups.setdefault(id(pe.io), (pe.io, []))[1].append(index)
+        for io, indices in groups.values():
+            flat = hash_entries(
+                [e for index in indices for e in scanned[index]], algorithm, threads, io
+            )
+            position = 0
+            for index in indices:
+                scanned[index] = flat[position:position + len(scanned[index])]
+                position += len(scanned[index])
+    return {pe.identifier: entries for pe, entries in zip(process_executions, scanned)}
+
+
+def get_scandir(io=None):
+    """Gets the function to list directories with - ``os.scandir``, a custom
+    io object's own ``scandir`` method if it has one, or else a function
+    which lists directories with the io object's ``listdir`` method.
+
+    :param io: an optional custom io object.
+    :rtype: ``function``"""
+
+    if io is None: return os.scandir
+    if hasattr(io, "scandir"): return io.scandir
+    return lambda path: [
+        IOEntry(io, name, io.abspath(os.path.join(path, name)))
+        for name in io.listdir(path)
+    ]
+
+
+def scan_directory(path, recursive=False, exclude=(), scandir=os.scandir):
+    """Lists the contents of a directory with ``os.scandir``, which gets each
+    entry's type without a separate call per entry. Nextflow's own files,
+    and any names in ``exclude``, are left out of the top level. The
+    entries are sorted by name, and each name is relative to the directory.
+
+    :param str path: the directory to scan.
+    :param bool recursive: whether to scan subdirectories too.
+    :param exclude: names at the top level to leave out.
+    :param function scandir: the function to list a directory with, which
+     may return any iterable of entries.
+    :rtype: ``list``"""
+
+    entries, directories = [], [(path, "")]
+    while directories:
+        directory, prefix = directories.pop()
+        try:
+            listing = scandir(directory)
+        except FileNotFoundError:
+            continue
+        if scandir is os.scandir:
+            with listing: listing = list(listing)
+        for entry in listing:
+            if not prefix and (
+                entry.name.startswith(".command") or
+                entry.name == ".exitcode" or entry.name in exclude
+            ): continue
+            name = prefix + entry.name
+            file_entry = make_file_entry(entry, name)
+            entries.append(file_entry)
+            if recursive and file_entry.type == "directory":
+                directories.append((entry.path, name + "/"))
+    return sorted(entries, key=lambda e: e.name)
+
+
+def make_file_entry(entry, name):
+    """Creates a file entry from an ``os.scandir`` entry. The size and
+    modification time of a symlink are those of the file it points to, if
+    it exists.
+
+    :param os.DirEntry entry: the entry.
+    :param str name: the name of the entry relative to the scanned directory.
+    :rtype: ``nextflow.models.FileEntry``"""
+
+    if entry.is_symlink():
+        type = "symlink"
+        try:
+            stat = entry.stat()
+        except OSError:
+            stat = entry.stat(follow_symlinks=False)
+    else:
+        type = "directory" if entry.is_dir() else "file"
+        stat = entry.stat()
+    return FileEntry(
+        path=entry.path, name=name, type=type, size=stat.st_size,
+        modified=None if stat.st_mtime is None else datetime.fromtimestamp(stat.st_mtime)
+    )
+
+
+
+class IOEntry:
+    """A directory entry found with a custom io object which has no
+    ``scandir`` method, standing in for an ``os.DirEntry``. Only the methods
+    every io object has are used - an entry is a directory if ``listdir``
+    can list it, its modification time is its ``ctime``, and its size isn't
+    known, so is ``None``. Symlinks can't be told apart from files.
+
+    :param io: the custom io object.
+    :param str name: the entry's name.
+    :param str path: the entry's full path."""
+
+    def __init__(self, io, name, path):
+        self.io, self.name, self.path = io, name, path
+
+
+    def is_symlink(self):
+        return False
+
+
+    def is_dir(self):
+        try:
+            self.io.listdir(self.path)
+        except OSError:
+            return False
+        return True
+
+
+    def stat(self):
+        try:
+            modified = self.io.ctime(self.path).timestamp()
+        except OSError:
+            modified = None
+        return SimpleNamespace(st_size=None, st_mtime=modified)
+
+
+def hash_entries(entries, algorithm="sha256", threads=None, io=None):
+    """Calculates the hash of each file's contents, in a thread pool. Hashes
+    are cached in memory against each file's path, size and modification
+    time, so a file is only read again if it has changed. Directories, and
+    symlinks which don't point to a file, are not hashed.
+
+    New entries are returned, with their ``hash`` attributes set.
+
+    :param list entries: the file entries.
+    :param str algorithm: the ``hashlib`` algorithm to hash with.
+    :param int threads: the maximum number of threads to use.
+    :param io: an optional custom io object to read the files with.
+    :rtype: ``list``"""
+
+    keys = [(e.path, e.size, e.modified, algorithm) for e in entries]
+    needed = list(dict.fromkeys(
+        key for key, entry in zip(keys, entries)
+        if entry.type != "directory" and key not in _hash_cache
+    ))
+    if needed:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for key, digest in zip(needed, executor.map(
+                lambda key: hash_file(key[0], algorithm, io), needed
+            )):
+                if digest: _hash_cache[key] = digest
+    return [
+        replace(entry, hash=_hash_cache.get(key)) for key, entry in zip(keys, entries)
+    ]
+
+
+def hash_file(path, algorithm="sha256", io=None):
+    """Calculates the hex digest of a file's contents, reading it in chunks -
+    or all at once, through a custom io object's ``read`` method. If the file
+    can't be read (such as a broken symlink, or a directory), ``None`` is
+    returned.
+
+    :param str path: the location of the file.
+    :param str algorithm: the ``hashlib`` algorithm to hash with.
+    :param io: an optional custom io object to read the file with.
+    :rtype: ``str``"""
+
+    digest = hashlib.new(algorithm)
+    try:
+        if io:
+            digest.update(io.read(path, "rb"))
+            return digest.hexdigest()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024): digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def clear_hash_cache():
+    """Removes all hashes from the in-memory cache."""
+
+    _hash_cache.clear()
@@ -0,0 +1,169 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+WORK_DIRECTORY = re.compile(r"(?:^|/)([0-9a-f]{2}/[0-9a-f]{30})(?=/|$)")
+STAGE_FUNCTION = re.compile(r"nxf_stage\(\)([^}]+)}")
+LINKED_INPUT = re.compile(r"ln -s (.+?) ")
+COPIED_INPUT = re.compile(r"cp -fRL (.+?) ")
+
+class Lineage:
+    """An index of which process executions produced and used which files in
+    an execution, built from the files each process execution staged into
+    its work directory. A staged input which is in another process
+    execution's work directory was produced by that process execution.
+
+    It can be queried in both directions - from a file to the process
+    execution that produced it and those that used it, and from a process
+    execution to its inputs, the process executions it depends on, and the
+    process executions which consume its outputs.
+
+    Lineages are usually created with :py:func:`get_lineage`, which keeps
+    them up to date as process executions are added to an execution."""
+
+    def __init__(self):
+        self.process_executions = {}
+        self.inputs = {}
+        self.directories = {}
+        self.users = {}
+        self.upstream = {}
+        self.downstream = {}
+        self.unresolved = {}
+
+
+    def add(self, process_execution, inputs):
+        """Adds a process execution and its staged inputs to the index.
+
+        :param nextflow.models.ProcessExecution process_execution: the process execution.
+        :param list inputs: the paths of the files it staged."""
+
+        identifier = process_execution.identifier
+        self.process_executions[identifier] = process_execution
+        self.inputs[identifier] = inputs
+        self.upstream.setdefault(identifier, [])
+        self.downstream.setdefault(identifier, [])
+        for path in inputs:
+            self.users.setdefault(os.path.normpath(path), []).append(identifier)
+            match = WORK_DIRECTORY.search(path)
+            if not match: continue
+            if match[1] in self.directories:
+                self.link(self.directories[match[1]], identifier)
+            else:
+                self.unresolved.setdefault(match[1], []).append(identifier)
+        match = WORK_DIRECTORY.search(str(process_execution.path or ""))
+        if match:
+            self.directories[match[1]] = identifier
+            for consumer in self.unresolved.pop(match[1], []):
+                self.link(identifier, consumer)
+
+
+    def link(self, producer, consumer):
+        """Records that one process execution consumes the output of another.
+
+        :param str producer: the identifier of the producing process execution.
+        :param str consumer: the identifier of the consuming process execution."""
+
+        if producer == consumer or producer in self.upstream[consumer]: return
+        self.upstream[consumer].append(producer)
+        self.downstream.setdefault(producer, []).append(consumer)
+
+
+    def get_producer(self, path):
+        """Gets the process execution which produced a file - any file in a
+        process execution's work directory, whether or not another process
+        execution used it. Files from outside the work directory give
+        ``None``.
+
+        :param str path: the location of the file.
+        :rtype: ``nextflow.models.ProcessExecution``"""
+
+        match = WORK_DIRECTORY.search(str(path))
+        identifier = self.directories.get(match[1]) if match else None
+        return self.process_executions.get(identifier)
+
+
+    def get_users(self, path):
+        """Gets the process executions which staged a file as an input.
+
+        :param str path: the location of the file.
+        :rtype: ``list``"""
+
+        return [self.process_executions[identifier] for identifier in
+         self.users.get(os.path.normpath(str(path)), [])]
+
+
+    def get_inputs(self, process_execution):
+        """Gets the paths of the files a process execution staged.
+
+        :param nextflow.models.ProcessExecution process_execution: the process execution.
+        :rtype: ``list``"""
+
+        return self.inputs.get(process_execution.identifier, [])
+
+
+    def get_upstream(self, process_execution):
+        """Gets the process executions whose outputs a process execution
+        used.
+
+        :param nextflow.models.ProcessExecution process_execution: the process execution.
+        :rtype: ``list``"""
+
+        return [self.process_executions[identifier] for identifier in
+         self.upstream.get(process_execution.identifier, [])]
+
+
+    def get_consumers(self, process_execution):
+        """Gets the process executions which used a process execution's
+        outputs.
+
+        :param nextflow.models.ProcessExecution process_execution: the process execution.
+        :rtype: ``list``"""
+
+        return [self.process_executions[identifier] for identifier in
+         self.downstream.get(process_execution.identifier, [])]
+
+
+
+def get_lineage(execution, workers=8):
+    """Gets the lineage of an execution's files and process executions. The
+    ``.command.run`` files of the process executions are read and parsed in
+    parallel, and the lineage is cached on the execution - calling this
+    again, such as after a later poll, only reads the files of process
+    executions which have been added since. Process executions whose work
+    directory isn't known yet, or whose ``.command.run`` file hasn't been
+    written yet, are left until they are.
+
+    :param nextflow.models.Execution execution: the execution.
+    :param int workers: the number of files to read at once.
+    :rtype: ``Lineage``"""
+
+    lineage = execution.lineage or Lineage()
+    new = [
+        process_execution for process_execution in execution.process_executions
+        if process_execution.path and process_execution.identifier not in lineage.inputs
+    ]
+    if workers > 1 and len(new) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            inputs = list(executor.map(lambda pe: pe.input_data(), new))
+    else:
+        inputs = [process_execution.input_data() for process_execution in new]
+    for process_execution, paths in zip(new, inputs):
+        if process_execution.staged_inputs is None: continue
+        lineage.add(process_execution, paths)
+    execution.lineage = lineage
+    return lineage
+
+
+def parse_staged_inputs(run):
+    """Gets the paths of the files staged by a ``.command.run`` script, from
+    its ``nxf_stage`` function - symlinked, or copied if the stage-in mode
+    copies them.
+
+    :param str run: the contents of the ``.command.run`` file.
+    :rtype: ``list``"""
+
+    stage = STAGE_FUNCTION.search(run)
+    if not stage: return []
+    inputs = LINKED_INPUT.findall(stage[1])
+    if not inputs: inputs = COPIED_INPUT.findall(stage[1])
+    return inputs
@@ -1,5 +1,7 @@
+import os
 import re
 from datetime import datetime
+from nextflow.models import LogEvent
 
 def get_started_from_log(log):
     """Gets the time the pipeline was started from the log file.
@@ -28,7 +30,10 @@ def get_finished_from_log(log):
 
 
 def log_is_finished(log):
-    """Checks if the log file indicates the pipeline has finished.
+    """Checks if the log file indicates the pipeline has finished - either
+    with Nextflow's closing line, or with a stack trace whose exception line
+    names a Java exception or error, such as
+    ``java.lang.OutOfMemoryError: Java heap space``.
     
     :param str log: the contents of the log file.
     :rtype: ``bool``"""
@@ -37,11 +42,32 @@ def log_is_finished(log):
     lines = log.strip().splitlines()
     if lines[-1].endswith(" - > Execution complete -- Goodbye"): return True
     if lines[-1].startswith("    at ") or lines[-1].startswith("\tat "):
-        last_unindented = [l for l in lines if not l.startswith("	at ")][-1]
-        if "Exception" in last_unindented: return True
+        last_unindented = [
+            l for l in lines if not l.startswith("    at ") and not l.startswith("\tat ")
+        ][-1]
+        if re.search(r"\b\w+(Exception|Error)(:|$)", last_unindented): return True
     return False
 
 
+def get_exception_from_log(log):
+    """Gets the exception that ended the pipeline, if the log file ends with
+    one - the final log entry, such as ``ERROR nextflow.cli.Launcher``, along
+    with the exception and stack trace which follow it. If the pipeline did
+    not end with an exception, an empty string is returned.
+
+    :param str log: the contents of the log file.
+    :rtype: ``str``"""
+
+    if not log: return ""
+    lines = log.strip().splitlines()
+    if lines[-1].endswith(" - > Execution complete -- Goodbye"): return ""
+    if not log_is_finished(log): return ""
+    for index in range(len(lines) - 1, -1, -1):
+        if get_datetime_from_line(lines[index]):
+            return "\n".join(lines[index:])
+    return "\n".join(lines)
+
+
 def get_identifier_from_log(log):
     """Gets the nextflow adjective_name identifier from the log file.
     
@@ -144,4 +170,159 @@ def parse_completed_line(line):
     exit_code = match.group("exit_code")
     status = match.group("status") or "-"
     if exit_code != "0": status = "FAILED"
-    return identifier, finished, exit_code, status
\ No newline at end of file
+    return identifier, finished, exit_code, status
+
+
+def get_log_ends(path, size=1024 * 1024):
+    """Reads the start and end of a log file, without reading the rest of it.
+    Each is up to ``size`` bytes long and made of whole lines. A file smaller
+    than twice that size is read in full, and returned as both. A missing
+    file gives two empty strings.
+
+    :param str path: the location of the log file.
+    :param int size: the maximum number of bytes to read from each end.
+    :rtype: ``tuple``"""
+
+    try:
+        with open(path, "rb") as f:
+            total = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            if total <= size * 2:
+                text = f.read().decode(errors="replace")
+                return text, text
+            head = f.read(size)
+            f.seek(total - size)
+            tail = f.read()
+    except FileNotFoundError:
+        return "", ""
+    head = head[:head.rfind(b"\n") + 1]
+    tail = tail[tail.find(b"\n") + 1:]
+    return head.decode(errors="replace"), tail.decode(errors="replace")
+
+
+def get_log_chunks(path, count):
+    """Splits a log file into a number of byte ranges of roughly equal size,
+    each of which starts at the beginning of a line and ends at the end of one.
+
+    :param str path: the location of the log file.
+    :param int count: the number of chunks to split the file into.
+    :rtype: ``list``"""
+
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, count):
+            f.seek(max(size * i // count, boundaries[-1]))
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+    boundaries.append(size)
+    return [(s, e) for s, e in zip(boundaries, boundaries[1:]) if e > s]
+
+
+def parse_log_chunk(path, start, end):
+    """Reads a byte range of a log file and parses the lines in it which report
+    a process execution being cached, submitted or completed.
+
+    :param str path: the location of the log file.
+    :param int start: the byte offset to start reading from.
+    :param int end: the byte offset to stop reading at.
+    :rtype: ``list``"""
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    events, offset = [], start
+    for line in data.splitlines(keepends=True):
+        offset += len(line)
+        if b"Submitted process" in line or b"Cached process" in line or \
+         b"Task completed" in line:
+            text = line.decode(errors="replace").rstrip("\r\n")
+            event = parse_log_line(text, offset)
+            if event: events.append(event)
+    return events
+
+
+def iter_log_events(path_or_stream, offset=0):
+    """Yields the events reported in a log file, reading it one line at a time
+    so that memory use does not grow with the size of the log. Lines which do
+    not report an event are skipped.
+
+    Each event records the byte offset of the end of its line, which can be
+    passed back in as ``offset`` to resume reading after it. A final line with
+    no newline is assumed to still be being written, and is not read.
+
+    :param path_or_stream: the location of the log file, or a binary stream.
+    :param int offset: the byte offset to start reading from.
+    :rtype: ``nextflow.models.LogEvent``"""
+
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        with open(path_or_stream, "rb") as f:
+            yield from iter_log_events(f, offset)
+        return
+    if offset: path_or_stream.seek(offset)
+    for line in path_or_stream:
+        if isinstance(line, str): line = line.encode()
+        if not line.endswith(b"\n"): break
+        offset += len(line)
+        event = parse_log_line(line.decode(errors="replace").rstrip("\r\n"), offset)
+        if event: yield event
+
+
+def parse_log_line(line, offset=0):
+    """Parses a line from the log file into a typed event, if it reports one.
+    The events recognised are task submission, caching, starting, completion
+    and retrying, the start of the session, the end of the execution, and
+    errors.
+
+    :param str line: a line from the log file.
+    :param int offset: the byte offset of the end of the line.
+    :rtype: ``nextflow.models.LogEvent``"""
+
+    if "Submitted process" in line:
+        identifier, name, process, submitted = parse_submitted_line(line)
+        if identifier:
+            return LogEvent(
+                "submitted", submitted, offset, identifier, name, process
+            )
+    elif "Cached process" in line:
+        identifier, name, process = parse_cached_line(line)
+        if identifier:
+            return LogEvent(
+                "cached", get_datetime_from_line(line), offset, identifier,
+                name, process, status="COMPLETED", return_code="0"
+            )
+    elif "Task completed" in line:
+        identifier, finished, return_code, status = parse_completed_line(line)
+        if identifier:
+            name = m[1] if (m := re.search(r"name: (.+?); status:", line)) else ""
+            return LogEvent(
+                "completed", finished, offset, identifier, name,
+                status=status, return_code=return_code
+            )
+    elif "Task started" in line:
+        pattern = r"Task started > TaskHandler\[.*?name: (.+?);.*?/work/([\w/]{9})"
+        if (m := re.search(pattern, line)):
+            return LogEvent(
+                "started", get_datetime_from_line(line), offset, m[2], m[1]
+            )
+    elif "Execution is retried" in line:
+        pattern = (
+            r"\[(?P<id>[\w/]+)\] NOTE: .*?`(?P<name>.+?)` terminated with an "
+            r"error exit status \((?P<exit_code>\d+)\)"
+        )
+        if (m := re.search(pattern, line)):
+            return LogEvent(
+                "retried", get_datetime_from_line(line), offset, m["id"],
+                m["name"], status="FAILED", return_code=m["exit_code"],
+                message=line[line.find("NOTE: ") + 6:]
+            )
+    elif "Session UUID: " in line:
+        uuid = get_session_uuid_from_log(line)
+        if uuid:
+            return LogEvent(
+                "session", get_datetime_from_line(line), offset, uuid
+            )
+    elif line.endswith(" - > Execution complete -- Goodbye"):
+        return LogEvent("complete", get_datetime_from_line(line), offset)
+    elif (m := re.match(r"\S+ \S+ \[.*?\] ERROR +\S+ - (.*)", line)):
+        return LogEvent("error", get_datetime_from_line(line), offset, message=m[1])
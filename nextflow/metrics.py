@@ -0,0 +1,289 @@
+import os
+import time
+import bisect
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TASK_DURATION_BUCKETS = (1, 5, 10, 30, 60, 300, 600, 1800, 3600, 7200, 21600, 86400)
+POLL_DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class MetricsExporter:
+    """Keeps a set of metrics about polled executions up to date, and exposes
+    them in the OpenMetrics/Prometheus text format - either from a small HTTP
+    server, listening on localhost, which Prometheus can scrape, or by
+    writing them to a file for node_exporter's textfile collector.
+
+    The metrics are updated from each poll with :py:meth:`update`, and only
+    the process executions whose status has changed since the last poll
+    affect them, so they are never recomputed from scratch.
+
+    :param str host: the address to listen on.
+    :param int port: the port to serve metrics on (0 for any free port, or ``None`` not to serve them).
+    :param str path: a file to write the metrics to after every update."""
+
+    def __init__(self, host="127.0.0.1", port=None, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.statuses = {}
+        self.tasks = Counter()
+        self.task_durations = {}
+        self.observed = set()
+        self.poll_durations = Histogram(POLL_DURATION_BUCKETS)
+        self.polls = 0
+        self.log_read_bytes = 0
+        self.log_read_bytes_total = 0
+        self.log_sizes = {}
+        self.log_growths = {}
+        self.server, self.thread = None, None
+        if port is not None:
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                    body = exporter.render(openmetrics).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            self.server = ThreadingHTTPServer((host, port), Handler)
+            self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+    @property
+    def url(self):
+        """The URL the metrics are served at, if they are being served.
+
+        :rtype: ``str``"""
+
+        if not self.server: return None
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+
+    def start(self):
+        """Starts serving the metrics in a background thread, if a port was
+        given."""
+
+        if self.thread: self.thread.start()
+
+
+    def stop(self):
+        """Stops serving the metrics and closes the server."""
+
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+    def update(self, execution, poll_seconds=None, log_read_bytes=None, active=False):
+        """Updates the metrics from the latest state of an execution. Only
+        process executions which are new or have changed status since the
+        last update change the task counts, and each finished process
+        execution's duration is observed once.
+
+        When following an execution from weblog events, there is no log to
+        watch grow, so ``active`` should be ``True`` whenever new events have
+        arrived - the log lag is then the time since the last events.
+
+        An execution without an identifier yet (before Nextflow has logged
+        the run name) only has its poll recorded, as its series couldn't be
+        labelled with the execution they belong to.
+
+        :param nextflow.models.Execution execution: the execution, if there is one yet.
+        :param float poll_seconds: how long the poll took, if it was a poll.
+        :param int log_read_bytes: how much of the log the poll read.
+        :param bool active: whether new weblog events have just arrived."""
+
+        with self.lock:
+            if poll_seconds is not None:
+                self.polls += 1
+                self.poll_durations.observe(poll_seconds)
+            if log_read_bytes is not None:
+                self.log_read_bytes = log_read_bytes
+                self.log_read_bytes_total += log_read_bytes
+            if execution and execution.identifier:
+                self.update_execution(execution, active)
+        if self.path: self.write(self.path)
+
+
+    def update_execution(self, execution, active=False):
+        """Updates the task counts, task durations and log growth for an
+        execution. The lock must already be held.
+
+        :param nextflow.models.Execution execution: the execution.
+        :param bool active: whether new weblog events have just arrived."""
+
+        name = execution.identifier
+        for process_execution in execution.process_executions:
+            key = (name, process_execution.identifier)
+            state = (process_execution.process, process_execution.status)
+            previous = self.statuses.get(key)
+            if previous != state:
+                if previous: self.tasks[(name, *previous)] -= 1
+                self.tasks[(name, *state)] += 1
+                self.statuses[key] = state
+            if key in self.observed or process_execution.cached: continue
+            duration = process_execution.duration
+            if duration is not None:
+                self.observed.add(key)
+                self.task_durations.setdefault(
+                    process_execution.process, Histogram(TASK_DURATION_BUCKETS)
+                ).observe(duration.total_seconds())
+        size = len(execution.log or "")
+        if active or self.log_sizes.get(name) != size or name not in self.log_growths:
+            self.log_sizes[name] = size
+            self.log_growths[name] = time.monotonic()
+        if execution.finished: self.log_growths[name] = None
+
+
+    def render(self, openmetrics=True):
+        """Renders the current metrics in the OpenMetrics text format, or in
+        the older Prometheus text format that the textfile collector reads.
+
+        :param bool openmetrics: whether to use the OpenMetrics format.
+        :rtype: ``str``"""
+
+        with self.lock:
+            lines = []
+            add_family(lines, "nextflow_tasks", "gauge", "Process executions by execution, process and status.", [
+                ("", {"execution": e, "process": p, "status": s}, count)
+                for (e, p, s), count in sorted(self.tasks.items())
+            ], openmetrics)
+            add_family(lines, "nextflow_task_duration_seconds", "histogram", "Durations of finished process executions.", [
+                sample for process, histogram in sorted(self.task_durations.items())
+                for sample in histogram.samples({"process": process})
+            ], openmetrics)
+            add_family(lines, "nextflow_polls", "counter", "Polls of executions made.", [
+                ("_total", {}, self.polls)
+            ], openmetrics)
+            add_family(lines, "nextflow_poll_duration_seconds", "histogram", "Time taken by each poll.", [
+                *self.poll_durations.samples({})
+            ], openmetrics)
+            add_family(lines, "nextflow_poll_log_read_bytes", "gauge", "Size of the log read by the last poll.", [
+                ("", {}, self.log_read_bytes)
+            ], openmetrics)
+            add_family(lines, "nextflow_log_read_bytes", "counter", "Size of the logs read by all polls.", [
+                ("_total", {}, self.log_read_bytes_total)
+            ], openmetrics)
+            now = time.monotonic()
+            add_family(lines, "nextflow_log_lag_seconds", "gauge", "Time since an execution's log last grew, or its last weblog events arrived (0 once it has finished).", [
+                ("", {"execution": e}, 0 if grown is None else now - grown)
+                for e, grown in sorted(self.log_growths.items())
+            ], openmetrics)
+        if openmetrics: lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+    def write(self, path):
+        """Writes the metrics to a file in the Prometheus text format. The
+        file is replaced atomically, so a collector never reads it half
+        written.
+
+        :param str path: the location of the file."""
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f: f.write(self.render(openmetrics=False))
+        os.replace(temp_path, path)
+
+
+
+class Histogram:
+    """A histogram of observed values, with cumulative bucket counts.
+
+    :param tuple buckets: the upper bounds of the buckets, in order."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+
+    def observe(self, value):
+        """Adds a value to the histogram.
+
+        :param float value: the value."""
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+    def samples(self, labels):
+        """Gets the ``_bucket``, ``_sum`` and ``_count`` samples of the
+        histogram, with the labels given added to each.
+
+        :param dict labels: the labels of the histogram.
+        :rtype: ``list``"""
+
+        samples, total = [], 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            samples.append(("_bucket", {**labels, "le": format_value(bound)}, total))
+        samples.append(("_sum", labels, self.sum))
+        samples.append(("_count", labels, self.count))
+        return samples
+
+
+
+def add_family(lines, name, type, help, samples, openmetrics=True):
+    """Adds the lines for a metric family to a list of exposition lines. In
+    the Prometheus format, counters are declared with their ``_total``
+    suffix, whereas in OpenMetrics they are declared without it.
+
+    :param list lines: the lines to add to.
+    :param str name: the name of the metric family.
+    :param str type: ``gauge``, ``counter`` or ``histogram``.
+    :param str help: a description of the metric.
+    :param list samples: (suffix, labels, value) tuples.
+    :param bool openmetrics: whether to use the OpenMetrics format."""
+
+    declared = f"{name}_total" if type == "counter" and not openmetrics else name
+    lines.append(f"# HELP {declared} {help}")
+    lines.append(f"# TYPE {declared} {type}")
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+        label_text = f"{{{label_text}}}" if label_text else ""
+        lines.append(f"{name}{suffix}{label_text} {format_value(value)}")
+
+
+def escape_label(value):
+    """Escapes a label value for the text format.
+
+    :param str value: the label value.
+    :rtype: ``str``"""
+
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value):
+    """Formats a sample value or bucket bound for the text format.
+
+    :param value: the value.
+    :rtype: ``str``"""
+
+    if value == float("inf"): return "+Inf"
+    if isinstance(value, float) and value.is_integer(): return str(int(value)) + ".0"
+    return str(value)
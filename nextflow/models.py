@@ -1,8 +1,7 @@
-import re
 import os
 from pathlib import Path
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from typing import Any
 from nextflow.io import get_file_text
 
@@ -19,6 +18,85 @@ class ExecutionSubmission:
 
 
 
+@dataclass
+class Script:
+    """A class to represent the structure of a Nextflow DSL2 script - the
+    modules it includes, and the processes and workflows it defines."""
+
+    path: str
+    includes: dict
+    processes: list
+    workflows: dict
+
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    """A class to represent a single event reported in a Nextflow log file."""
+
+    type: str
+    timestamp: datetime | None
+    offset: int
+    identifier: str = ""
+    name: str = ""
+    process: str = ""
+    status: str = ""
+    return_code: str = ""
+    message: str = ""
+
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    """A class to represent a single row of a Nextflow trace file."""
+
+    identifier: str
+    name: str
+    status: str
+    exit: str
+    realtime: timedelta | None
+    cpu: float | None
+    peak_rss: int | None
+    rchar: int | None
+    wchar: int | None
+    offset: int
+    fields: dict
+
+
+
+@dataclass(frozen=True)
+class ExecutionProgress:
+    """A class to represent an estimate of how far through its pipeline an
+    execution is."""
+
+    completed: int
+    expected: int
+    eta: timedelta | None
+
+    @property
+    def fraction(self):
+        """The proportion of expected tasks which have completed, from 0 to 1.
+
+        :rtype: ``float``"""
+
+        if not self.expected: return 0.0
+        return min(self.completed / self.expected, 1.0)
+
+
+
+@dataclass(frozen=True)
+class DurationStatistics:
+    """A class to represent the distribution of a set of durations, such as
+    the time process executions spent queued, in seconds."""
+
+    count: int
+    mean: float | None
+    minimum: float | None
+    maximum: float | None
+    percentiles: dict
+
+
+
 @dataclass
 class Execution:
     """A class to represent the execution of a Nextflow pipeline."""
@@ -34,6 +112,9 @@ class Execution:
     path: str
     session_uuid: str
     process_executions: list
+    progress: Any = None
+    lineage: Any = field(default=None, repr=False, compare=False)
+    database_id: int | None = field(default=None, repr=False, compare=False)
 
     def __repr__(self):
         return f"<Execution: {self.identifier}>"
@@ -79,6 +160,13 @@ class ProcessExecution:
     status: str
     cached: bool
     io: Any
+    realtime: timedelta | None = None
+    cpu: float | None = None
+    peak_rss: int | None = None
+    rchar: int | None = None
+    wchar: int | None = None
+    staged_inputs: list | None = field(default=None, repr=False, compare=False)
+    database_id: int | None = field(default=None, repr=False, compare=False)
 
 
     def __repr__(self):
@@ -107,23 +195,36 @@ class ProcessExecution:
 
 
     def input_data(self, include_path=True):
-        """A list of files passed to the process execution as inputs.
+        """A list of files passed to the process execution as inputs. The
+        ``.command.run`` file is only read the first time.
 
         :param bool include_path: if ``False``, only filenames returned.
         :type: ``list``"""
 
-        inputs = []
         if not self.path: return []
-        run = get_file_text(self.full_path / ".command.run")
-        stage = re.search(r"nxf_stage\(\)((.|\n|\r)+?)}", run)
-        if not stage: return []
-        contents = stage[1]
-        inputs = re.findall(r"ln -s (.+?) ", contents)
-        if not inputs: inputs = re.findall(r"cp -fRL (.+?) ", contents)
+        if self.staged_inputs is None:
+            run = get_file_text(self.full_path / ".command.run", self.io)
+            if not run: return []
+            from nextflow.lineage import parse_staged_inputs
+            self.staged_inputs = parse_staged_inputs(run)
         if include_path:
-            return inputs
+            return list(self.staged_inputs)
         else:
-            return [os.path.basename(f) for f in inputs]
+            return [os.path.basename(f) for f in self.staged_inputs]
+
+
+    def output_files(self, recursive=False, hashes=False, threads=None):
+        """The files and directories the process execution produced, with
+        their sizes, modification times and types. See
+        :py:func:`.get_output_files`.
+
+        :param bool recursive: whether to look inside output directories.
+        :param bool hashes: whether to calculate a hash of each file's contents.
+        :param int threads: the number of threads to hash files with.
+        :rtype: ``list``"""
+
+        from nextflow.files import get_output_files
+        return get_output_files(self, recursive, hashes, threads=threads)
 
 
     def all_output_data(self, include_path=True):
@@ -143,3 +244,32 @@ class ProcessExecution:
                 if f not in inputs:
                     outputs.append(str(full_path) if include_path else f)
         return outputs
+
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """A class to represent a file or directory found in a process
+    execution's work directory."""
+
+    path: str
+    name: str
+    type: str
+    size: int
+    modified: datetime
+    hash: str | None = None
+
+
+
+@dataclass(frozen=True)
+class ErrorMatch:
+    """A class to represent a match found when searching the errors recorded
+    in an execution store - the output of a failed process execution, or the
+    exception which ended an execution."""
+
+    execution: Execution
+    process_execution: ProcessExecution | None
+    source: str
+    text: str
+    snippet: str
+    rank: float
@@ -1,15 +1,32 @@
-import re
 import os
+import json
+from dataclasses import asdict
 from nextflow.io import get_file_text
+from nextflow.models import Script
+from nextflow.script import parse_script
 
-def get_pipeline_process_names(path):
+_parse_cache = {}
+
+def get_pipeline_process_names(path, cache_path=None, threads=None):
     """Takes a path to a nextflow script and returns a list of the full process
     names in the pipeline, following imports where necessary.
+
+    Parsed files are cached in memory between calls. If a cache path is given,
+    the cache is also loaded from and saved to that file, so that it persists
+    between Python sessions.
+
+    If a number of threads is given, every file in the pipeline is first
+    parsed concurrently (see :py:func:`.parse_pipeline_files`).
     
     :param str path: the path to the nextflow script.
+    :param str cache_path: the path to an optional on-disk cache file.
+    :param int threads: the number of threads to parse files with.
     :rtype: ``list``"""
     
+    if cache_path: load_parse_cache(cache_path)
+    if threads: parse_pipeline_files(path, threads=threads)
     file_process_paths = get_file_process_paths(path)
+    if cache_path: save_parse_cache(cache_path)
     return list(file_process_paths.keys())
 
 
@@ -21,57 +38,188 @@ def get_file_process_paths(path):
     :param str path: the path to the nextflow script.
     :rtype: ``dict``"""
 
-    text = get_file_text(path)
-    lines = text.splitlines()
-    names_to_paths = get_import_names_to_paths(text, path)
-    workflows = {}
-    for name, subpath in names_to_paths.items():
-        if sub := get_file_process_paths(subpath): workflows[name] = sub
-    paths, workflow_name, pre_workflow = {}, None, True
-    for line in lines:
-        if line.lstrip().startswith("include"): continue
-        match = re.match(r"workflow *(.+?) *\{", line.lstrip())
-        if match:
-            workflow_name = match.group(1)
-            pre_workflow = False
-        match = re.match(r"workflow *\{", line.lstrip())
-        if match:
-            workflow_name = None
-            pre_workflow = False
-        if pre_workflow: continue
-        for name, path in names_to_paths.items():
-            if name in line:
-                full = f"{workflow_name}:{name}" if workflow_name else name
-                if name in workflows:
-                    for k, v in workflows[name].items():
-                        if v["has_workflow_name"]: k = ":".join(k.split(":")[1:])
-                        paths[f"{full}:{k}"] = {
-                            "path": v["path"],
-                            "has_workflow_name": bool(workflow_name)
-                        }
-                else:
-                    paths[full] = {
-                        "path": os.path.normpath(names_to_paths[name]),
-                        "has_workflow_name": bool(workflow_name)
-                    }
+    script = parse_file(path)
+    paths = {}
+    for workflow_name in script.workflows:
+        process_paths = get_workflow_process_paths(script, workflow_name)
+        for name, process_path in process_paths.items():
+            full = f"{workflow_name}:{name}" if workflow_name else name
+            paths.setdefault(full, {
+                "path": process_path,
+                "has_workflow_name": bool(workflow_name)
+            })
+    return paths
+
+
+def parse_pipeline_files(path, threads=None):
+    """Discovers the files of a pipeline breadth-first, starting from its main
+    script and following include statements, and parses each level of files
+    concurrently in a thread pool. Each file is only parsed once, however many
+    times it is included, and include cycles are not followed more than once.
+    The parsed scripts are returned as a mapping of normalised paths to
+    scripts, and are also added to the parse cache.
+
+    :param str path: the path to the main nextflow script.
+    :param int threads: the maximum number of threads to use.
+    :rtype: ``dict``"""
+
+    # concurrent.futures is slow to import, and only needed here
+    from concurrent.futures import ThreadPoolExecutor
+    scripts, level = {}, [os.path.normpath(path)]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while level:
+            for module_path, script in zip(level, executor.map(parse_file, level)):
+                scripts[module_path] = script
+            level = list(dict.fromkeys(
+                os.path.normpath(include["path"])
+                for module_path in level
+                for include in scripts[module_path].includes.values()
+            ))
+            level = [p for p in level if p not in scripts]
+    return scripts
+
+
+def get_workflow_process_paths(script, workflow_name, stack=()):
+    """Takes a parsed nextflow script and the name of one of its workflows, and
+    returns a mapping of the names of the processes that workflow invokes to
+    the full paths of their modules. Invoked workflows, whether included or
+    defined in the same script, are followed, and their processes named
+    relative to the workflow. A workflow which is already being followed
+    further up the stack is not followed again, so that include cycles
+    terminate.
+
+    If an included name is neither a workflow nor a process in its module,
+    but the module does define workflows, the module is still followed (see
+    :py:func:`get_module_process_paths`), as the line-based resolver this
+    replaced did.
+
+    :param nextflow.models.Script script: the parsed nextflow script.
+    :param str workflow_name: the workflow's name (empty for the entry workflow).
+    :param tuple stack: the files and workflows currently being followed.
+    :rtype: ``dict``"""
+
+    stack += ((os.path.normpath(script.path), workflow_name),)
+    paths = {}
+    for name in script.workflows[workflow_name]:
+        if name in script.includes:
+            include = script.includes[name]
+            module = parse_file(include["path"])
+            if include["name"] in module.workflows:
+                entry = (os.path.normpath(module.path), include["name"])
+                if entry in stack: continue
+                sub = get_workflow_process_paths(module, include["name"], stack)
+                for k, v in sub.items(): paths[f"{name}:{k}"] = v
+            elif include["name"] not in module.processes and (
+                sub := get_module_process_paths(module, stack)
+            ):
+                for k, v in sub.items(): paths[f"{name}:{k}"] = v
+            else:
+                paths[name] = os.path.normpath(include["path"])
+        elif name in script.workflows:
+            if (stack[-1][0], name) in stack: continue
+            sub = get_workflow_process_paths(script, name, stack)
+            for k, v in sub.items(): paths[f"{name}:{k}"] = v
+        elif name in script.processes:
+            paths[name] = os.path.normpath(script.path)
+    return paths
+
+
+def get_module_process_paths(script, stack=()):
+    """Takes a parsed nextflow script which was included under a name it
+    doesn't define, and returns a mapping of the names of the processes all
+    of its workflows invoke to the full paths of their modules. Processes
+    from named workflows are named without the workflow's name, and local
+    workflows invoked by the entry workflow are left out, since their
+    processes are already included.
+
+    :param nextflow.models.Script script: the parsed nextflow script.
+    :param tuple stack: the files and workflows currently being followed.
+    :rtype: ``dict``"""
+
+    paths = {}
+    for workflow_name in script.workflows:
+        if (os.path.normpath(script.path), workflow_name) in stack: continue
+        sub = get_workflow_process_paths(script, workflow_name, stack)
+        for k, v in sub.items():
+            if not workflow_name and k.split(":")[0] in script.workflows: continue
+            paths.setdefault(k, v)
     return paths
 
 
+def parse_file(path):
+    """Reads and parses a nextflow script.
+
+    The result is cached against the file's path, modification time and size,
+    so a file included from several places is only parsed once.
+
+    :param str path: the path to the nextflow script.
+    :rtype: ``nextflow.models.Script``"""
+
+    key = get_file_cache_key(path)
+    cached = _parse_cache.get(os.path.normpath(path))
+    if key and cached and cached[0] == key: return cached[1]
+    script = parse_script(get_file_text(path), path)
+    if key: _parse_cache[os.path.normpath(path)] = (key, script)
+    return script
+
+
+def get_file_cache_key(path):
+    """Gets the modification time and size of a file, which together identify
+    a particular version of it for caching purposes. If the file can't be
+    found, ``None`` is returned.
+
+    :param str path: the path to the file.
+    :rtype: ``tuple``"""
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_parse_cache(cache_path):
+    """Loads parsed files from an on-disk cache into the in-memory cache.
+    Entries for files which have changed since will simply not be used.
+
+    :param str cache_path: the path to the cache file."""
+
+    try:
+        with open(cache_path) as f: data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return
+    for path, entry in data.items():
+        _parse_cache.setdefault(
+            path, (tuple(entry["key"]), Script(**entry["script"]))
+        )
+
+
+def save_parse_cache(cache_path):
+    """Saves the in-memory cache of parsed files to disk.
+
+    :param str cache_path: the path to the cache file."""
+
+    data = {path: {
+        "key": key, "script": asdict(script)
+    } for path, (key, script) in _parse_cache.items()}
+    temp_path = f"{cache_path}.tmp"
+    with open(temp_path, "w") as f: json.dump(data, f)
+    os.replace(temp_path, cache_path)
+
+
+def clear_parse_cache():
+    """Removes all parsed files from the in-memory cache."""
+
+    _parse_cache.clear()
+
+
 def get_import_names_to_paths(text, path):
-    """Finds all the import lines in a nextflow script and returns a mapping of
-    the module names to the full paths of the modules.
+    """Finds all the include statements in a nextflow script and returns a
+    mapping of the module names to the full paths of the modules.
     
     :param str text: the text of the nextflow script.
     :param str path: the path to the nextflow script.
     :rtype: ``dict``"""
 
-    pattern = r'include\s+?\{(.*?)\}\s+?from\s+[\'"](.+?)[\'"]'
-    imports = re.findall(pattern, text, re.DOTALL)
-    names_to_paths = {}
-    for imp in imports:
-        module_name = imp[0].strip().split()[-1]
-        module_path = imp[1].strip()
-        if not module_path.endswith(".nf"): module_path += ".nf"
-        full_module_path = os.path.join(os.path.dirname(path), module_path)
-        names_to_paths[module_name] = full_module_path
-    return names_to_paths
\ No newline at end of file
+    includes = parse_script(text, path).includes
+    return {name: include["path"] for name, include in includes.items()}
\ No newline at end of file
@@ -0,0 +1,150 @@
+import os
+from datetime import datetime, timedelta
+from nextflow.models import ExecutionProgress
+from nextflow.outputs import get_pipeline_process_names
+
+def get_progress(execution, process_names, durations=None, now=None):
+    """Estimates how far through a pipeline an execution is, by joining the
+    full list of processes in the pipeline with the process executions seen
+    so far.
+
+    Every process in the pipeline is expected to run at least once - a
+    process that has run more than once is expected to run as many times as
+    it has been seen. Every process execution that has finished counts as
+    completed, whether it succeeded or failed, since a failed task that is
+    retried is seen again as a new process execution.
+
+    The ETA is the estimated remaining task time divided by the number of
+    tasks currently running (or one, if none are), so it assumes the tasks
+    left will run with the same parallelism as now. Each task's duration is taken from
+    the historical durations given if there are any for its process,
+    otherwise from completed tasks of the same process in this execution,
+    otherwise from all completed tasks in this execution. If there is nothing
+    to estimate durations from, the ETA is ``None``.
+
+    Once the execution has finished, nothing more is expected - processes
+    which were never run (such as those skipped by a condition) are no
+    longer counted, and the ETA is zero.
+
+    :param nextflow.models.Execution execution: the execution to check.
+    :param list process_names: the full process names in the pipeline.
+    :param dict durations: mean historical task durations in seconds.
+    :param datetime.datetime now: the current time, if not the actual time.
+    :rtype: ``nextflow.models.ExecutionProgress``"""
+
+    completed = sum(
+        pe.status != "-" for pe in execution.process_executions
+    )
+    if execution.finished:
+        return ExecutionProgress(completed=completed, expected=completed, eta=timedelta())
+    durations, now = durations or {}, now or datetime.now()
+    names, lookup = {name: [] for name in process_names}, {}
+    for process_execution in execution.process_executions:
+        process = process_execution.process
+        if process not in lookup:
+            lookup[process] = get_static_process_name(process, names) or process
+        names.setdefault(lookup[process], []).append(process_execution)
+    expected = sum(max(len(executions), 1) for executions in names.values())
+    durations = {
+        get_static_process_name(process, names) or process: seconds
+        for process, seconds in durations.items()
+    }
+    eta = get_eta(names, durations, now)
+    return ExecutionProgress(completed=completed, expected=expected, eta=eta)
+
+
+def get_expected_process_names(pipeline_path, run_path=None):
+    """Gets the full process names of a pipeline about to be run, for use in
+    progress estimates. A relative path is taken to be relative to the
+    directory the pipeline is run in, and a directory is taken to contain a
+    ``main.nf`` script.
+
+    If the script can't be read - such as for a remote pipeline like
+    ``nf-core/rnaseq`` - an empty list is returned, and progress is then
+    estimated from the processes seen in the log.
+
+    :param str pipeline_path: the pipeline path passed to Nextflow.
+    :param str run_path: the directory the pipeline is run in.
+    :rtype: ``list``"""
+
+    path = os.path.join(run_path, pipeline_path) if run_path else pipeline_path
+    if os.path.isdir(path): path = os.path.join(path, "main.nf")
+    if not os.path.isfile(path): return []
+    try:
+        return get_pipeline_process_names(path)
+    except OSError:
+        return []
+
+
+def get_static_process_name(process, process_names):
+    """Finds the name in a pipeline's list of process names which corresponds
+    to the process of a process execution. The process may have extra leading
+    workflow names (from the entry workflow for example) which the static name
+    lacks. ``None`` is returned if there is no match.
+
+    :param str process: the process name reported in the log.
+    :param process_names: the full process names in the pipeline.
+    :rtype: ``str``"""
+
+    parts = process.split(":")
+    for i in range(len(parts)):
+        name = ":".join(parts[i:])
+        if name in process_names: return name
+
+
+def get_eta(names, durations, now):
+    """Estimates the time remaining for an execution, from a mapping of each
+    process name to the process executions seen for it.
+
+    :param dict names: process names mapped to lists of process executions.
+    :param dict durations: mean historical task durations in seconds.
+    :param datetime.datetime now: the current time.
+    :rtype: ``datetime.timedelta``"""
+
+    observed, all_observed = {}, []
+    for name, executions in names.items():
+        for process_execution in executions:
+            duration = process_execution.duration
+            if duration is None: continue
+            seconds = duration.total_seconds()
+            observed.setdefault(name, []).append(seconds)
+            all_observed.append(seconds)
+    fallback = sum(all_observed) / len(all_observed) if all_observed else None
+    remaining, running = 0, 0
+    for name, executions in names.items():
+        if name in durations:
+            estimate = durations[name]
+        elif name in observed:
+            estimate = sum(observed[name]) / len(observed[name])
+        else:
+            estimate = fallback
+        if not executions: executions = [None]
+        for process_execution in executions:
+            if process_execution and process_execution.status != "-": continue
+            if estimate is None: return None
+            elapsed = 0
+            if process_execution and process_execution.started:
+                running += 1
+                elapsed = (now - process_execution.started).total_seconds()
+            remaining += max(estimate - elapsed, 0)
+    return timedelta(seconds=remaining / max(running, 1))
+
+
+def get_process_durations(executions):
+    """Takes previous executions of a pipeline and returns the mean duration
+    of each process's completed tasks, in seconds, for use in progress
+    estimates. Cached tasks are ignored.
+
+    :param list executions: the previous executions.
+    :rtype: ``dict``"""
+
+    totals = {}
+    for execution in executions:
+        for process_execution in execution.process_executions:
+            if process_execution.cached: continue
+            if process_execution.status != "COMPLETED": continue
+            if process_execution.duration is None: continue
+            total = totals.setdefault(process_execution.process, [0, 0])
+            total[0] += process_execution.duration.total_seconds()
+            total[1] += 1
+    return {process: total / count for process, (total, count) in totals.items()}
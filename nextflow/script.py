@@ -0,0 +1,159 @@
+import re
+import os
+from nextflow.models import Script
+
+COMMENT = r"//[^\n]*|/\*.*?\*/"
+STRING = (
+    r"'''.*?'''|\"\"\".*?\"\"\"|"
+    r"'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\""
+)
+TOKEN_PATTERN = re.compile(
+    rf"(?P<comment>{COMMENT})|(?P<string>{STRING})|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<symbol>[^\s\w])", re.DOTALL
+)
+OUTLINE_PATTERN = re.compile(
+    rf"(?=[/'\"{{}}ipw])(?:{COMMENT}|{STRING}"
+    r"|(?P<keyword>\b(?:include|process|workflow)\b)|(?P<brace>[{}]))", re.DOTALL
+)
+BLOCK_PATTERN = re.compile(
+    rf"(?=[/'\"{{}}])(?:{COMMENT}|{STRING}|(?P<brace>[{{}}]))", re.DOTALL
+)
+NAME_PATTERN = re.compile(
+    rf"(?=[/'\".A-Za-z_])(?:{COMMENT}|{STRING}"
+    r"|\.\s*[A-Za-z_]\w*|([A-Za-z_]\w*))", re.DOTALL
+)
+
+def tokenize(text, pos=0):
+    """Yields the tokens of a Nextflow script, each as a tuple of its kind
+    (``name``, ``string`` or ``symbol``), its value, and the position in the
+    text where it ends. Comments and whitespace are discarded, and strings
+    have their quotes removed.
+
+    :param str text: the text of the nextflow script.
+    :param int pos: the position in the text to start from.
+    :rtype: ``tuple``"""
+
+    for match in TOKEN_PATTERN.finditer(text, pos):
+        kind = match.lastgroup
+        if kind == "comment": continue
+        value = match.group()
+        if kind == "string":
+            quote = 3 if value[:3] in ("'''", '"""') else 1
+            value = value[quote:-quote]
+        yield kind, value, match.end()
+
+
+def parse_script(text, path=""):
+    """Parses the text of a Nextflow DSL2 script into the modules it includes,
+    the processes it defines, and the workflows it defines along with the
+    names each of them invokes. The entry workflow has the empty string as its
+    name. Only names which are included or defined in the script are reported
+    as invoked.
+
+    The script is read in a single pass. Outside of include statements only
+    braces and the ``include``, ``process`` and ``workflow`` keywords are
+    matched, and comments and strings are skipped over wherever they are.
+
+    :param str text: the text of the nextflow script.
+    :param str path: the path to the nextflow script.
+    :rtype: ``nextflow.models.Script``"""
+
+    includes, processes, workflows = {}, [], {}
+    depth, pos = 0, 0
+    while match := OUTLINE_PATTERN.search(text, pos):
+        kind, pos = match.lastgroup, match.end()
+        if kind == "brace":
+            depth = depth + 1 if text[pos - 1] == "{" else max(depth - 1, 0)
+        elif kind == "keyword" and depth == 0:
+            if match.group() == "include":
+                pos = parse_include(text, pos, path, includes)
+            else:
+                pos = parse_definition(
+                    text, pos, match.group(), processes, workflows
+                )
+    known = set(includes) | set(processes) | set(workflows)
+    for name, invoked in workflows.items():
+        workflows[name] = [n for n in invoked if n in known and n != name]
+    return Script(
+        path=path, includes=includes, processes=processes, workflows=workflows
+    )
+
+
+def parse_include(text, pos, path, includes):
+    """Parses an include statement of the form ``include { A; B as C } from
+    'path'``, adding each name it makes available to a mapping of names to the
+    name in the included module and the full path to that module. The position
+    of the end of the statement is returned, or the starting position if it
+    isn't a valid include statement.
+
+    :param str text: the text of the nextflow script.
+    :param int pos: the position of the end of the ``include`` keyword.
+    :param str path: the path to the nextflow script.
+    :param dict includes: the mapping to add to.
+    :rtype: ``int``"""
+
+    tokens, names = tokenize(text, pos), []
+    if next(tokens, ("",))[:2] != ("symbol", "{"): return pos
+    for kind, value, _ in tokens:
+        if value == "}" and kind == "symbol": break
+        if kind == "name": names.append(value)
+    if next(tokens, ("",))[:2] != ("name", "from"): return pos
+    kind, module_path, end = next(tokens, ("", "", pos))
+    if kind != "string": return pos
+    module_path = module_path.strip()
+    if not module_path.endswith(".nf"): module_path += ".nf"
+    module_path = os.path.join(os.path.dirname(path), module_path)
+    i = 0
+    while i < len(names):
+        name = alias = names[i]
+        if i + 2 < len(names) and names[i + 1].lower() == "as":
+            alias = names[i + 2]
+            i += 2
+        includes[alias] = {"name": name, "path": module_path}
+        i += 1
+    return end
+
+
+def parse_definition(text, pos, keyword, processes, workflows):
+    """Parses a process or workflow definition, adding its name to the list of
+    processes, or its name and the names it uses to the mapping of workflows.
+    Names which follow a ``.`` are method or property accesses and are not
+    counted. The position of the end of the definition is returned, or the
+    starting position if it isn't a definition.
+
+    :param str text: the text of the nextflow script.
+    :param int pos: the position of the end of the keyword.
+    :param str keyword: ``process`` or ``workflow``.
+    :param list processes: the process names to add to.
+    :param dict workflows: the workflow mapping to add to.
+    :rtype: ``int``"""
+
+    tokens, name = tokenize(text, pos), ""
+    kind, value, start = next(tokens, ("", "", pos))
+    if kind == "name": name, (kind, value, start) = value, next(tokens, ("", "", pos))
+    if (kind, value) != ("symbol", "{"): return pos
+    end = get_block_end(text, start)
+    if keyword == "process":
+        if name: processes.append(name)
+    else:
+        names = dict.fromkeys(NAME_PATTERN.findall(text, start, end - 1))
+        workflows[name] = [n for n in names if n]
+    return end
+
+
+def get_block_end(text, pos):
+    """Takes the position just inside an opening brace and returns the
+    position just after the brace which closes it, skipping over anything in
+    comments or strings.
+
+    :param str text: the text of the nextflow script.
+    :param int pos: the position just after the opening brace.
+    :rtype: ``int``"""
+
+    depth = 1
+    while match := BLOCK_PATTERN.search(text, pos):
+        pos = match.end()
+        if match.lastgroup != "brace": continue
+        depth += 1 if text[pos - 1] == "{" else -1
+        if depth == 0: return pos
+    return len(text)
@@ -0,0 +1,238 @@
+import json
+import hashlib
+import urllib.request
+from zoneinfo import ZoneInfo
+
+class SpanExporter:
+    """Exports executions as OpenTelemetry traces, in the OTLP JSON format.
+    Each execution is a trace, with a span for the execution as a whole, a
+    span for each process execution nested under it, and two spans nested
+    under each of those - one for the time it spent queued (submitted to
+    started) and one for the time it spent running (started to finished).
+
+    Spans are exported as soon as the process execution they are for has
+    finished, either by appending them to a file as JSON lines (which the
+    OpenTelemetry Collector's ``otlpjsonfile`` receiver can read), or by
+    sending them to a collector's OTLP/HTTP endpoint. Span IDs are derived
+    from the execution and process execution, so a span exported twice will
+    have the same ID both times.
+
+    If the collector can't be reached, the spans are kept and sent with the
+    next update - up to ``max_pending`` of them, beyond which the oldest are
+    dropped, so that an unreachable collector doesn't use ever more memory.
+
+    :param str path: a file to append the spans to.
+    :param str url: the URL of an OTLP/HTTP collector, such as ``http://localhost:4318``.
+    :param str service_name: the service name to give the spans.
+    :param str timezone: the timezone the execution's times are in (if not local).
+    :param int max_pending: the most spans to keep while the collector can't be reached."""
+
+    def __init__(self, path=None, url=None, service_name="nextflow", timezone=None, max_pending=10000):
+        self.path = path
+        self.url = url
+        self.service_name = service_name
+        self.timezone = timezone
+        self.exported = set()
+        self.max_pending = max_pending
+        self.pending = []
+
+
+    def update(self, execution):
+        """Exports spans for any process executions which have finished since
+        the last update, and for the execution itself once it has finished.
+
+        :param nextflow.models.Execution execution: the execution.
+        :rtype: ``list``"""
+
+        spans = []
+        if not execution or not execution.identifier: return spans
+        trace_id = make_id(32, execution.path, execution.identifier)
+        root_id = make_id(16, trace_id)
+        for process_execution in execution.process_executions:
+            key = (trace_id, process_execution.identifier)
+            if key in self.exported: continue
+            if process_execution.cached or not process_execution.finished: continue
+            if process_execution.status in ("-", "SUBMITTED", "RUNNING"): continue
+            self.exported.add(key)
+            spans += make_process_execution_spans(
+                process_execution, trace_id, root_id, self.timezone
+            )
+        if execution.finished and execution.return_code and trace_id not in self.exported:
+            self.exported.add(trace_id)
+            spans.append(make_execution_span(execution, trace_id, root_id, self.timezone))
+        if spans: self.export(spans)
+        return spans
+
+
+    def export(self, spans):
+        """Writes spans to the file, or sends them to the collector, along
+        with any which previously failed to send.
+
+        :param list spans: the spans, as OTLP JSON dictionaries."""
+
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(make_request(spans, self.service_name)) + "\n")
+        if self.url:
+            self.pending += spans
+            if len(self.pending) > self.max_pending:
+                del self.pending[:len(self.pending) - self.max_pending]
+            request = urllib.request.Request(
+                self.url.rstrip("/") + "/v1/traces",
+                data=json.dumps(make_request(self.pending, self.service_name)).encode(),
+                headers={"Content-Type": "application/json"}, method="POST"
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=10): pass
+            except OSError:
+                return
+            self.pending = []
+
+
+
+def make_request(spans, service_name="nextflow"):
+    """Wraps spans in an OTLP JSON export request.
+
+    :param list spans: the spans.
+    :param str service_name: the service name to give them.
+    :rtype: ``dict``"""
+
+    return {"resourceSpans": [{
+        "resource": {"attributes": make_attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": "nextflow.py"}, "spans": spans}]
+    }]}
+
+
+def make_execution_span(execution, trace_id, span_id, timezone=None):
+    """Creates the root span of an execution's trace.
+
+    :param nextflow.models.Execution execution: the execution.
+    :param str trace_id: the trace ID.
+    :param str span_id: the ID to give the span.
+    :param str timezone: the timezone the execution's times are in.
+    :rtype: ``dict``"""
+
+    return make_span(
+        execution.identifier, trace_id, span_id, None,
+        execution.started or execution.finished, execution.finished, {
+            "nextflow.run_name": execution.identifier,
+            "nextflow.session_uuid": execution.session_uuid,
+            "nextflow.command": execution.command,
+            "nextflow.return_code": execution.return_code,
+        }, execution.return_code != "0", timezone
+    )
+
+
+def make_process_execution_spans(process_execution, trace_id, parent_id, timezone=None):
+    """Creates the spans for a finished process execution - one for the
+    whole process execution, and queue and run spans nested under it where
+    the times are known.
+
+    :param nextflow.models.ProcessExecution process_execution: the process execution.
+    :param str trace_id: the trace ID.
+    :param str parent_id: the ID of the execution's span.
+    :param str timezone: the timezone the times are in.
+    :rtype: ``list``"""
+
+    span_id = make_id(16, trace_id, process_execution.identifier)
+    attributes = {
+        "nextflow.task.identifier": process_execution.identifier,
+        "nextflow.task.name": process_execution.name,
+        "nextflow.process": process_execution.process,
+        "nextflow.task.status": process_execution.status,
+        "nextflow.task.return_code": process_execution.return_code,
+        "nextflow.task.path": str(process_execution.path or ""),
+        "nextflow.task.cpu": process_execution.cpu,
+        "nextflow.task.peak_rss": process_execution.peak_rss,
+    }
+    error = process_execution.status == "FAILED"
+    submitted, started = process_execution.submitted, process_execution.started
+    finished = process_execution.finished
+    spans = [make_span(
+        process_execution.name, trace_id, span_id, parent_id,
+        submitted or started or finished, finished, attributes, error, timezone
+    )]
+    if submitted and started:
+        spans.append(make_span(
+            "queue", trace_id, make_id(16, span_id, "queue"), span_id,
+            submitted, started, {"nextflow.process": process_execution.process},
+            False, timezone
+        ))
+    if started:
+        spans.append(make_span(
+            "run", trace_id, make_id(16, span_id, "run"), span_id,
+            started, finished, {"nextflow.process": process_execution.process},
+            error, timezone
+        ))
+    return spans
+
+
+def make_span(name, trace_id, span_id, parent_id, start, end, attributes, error=False, timezone=None):
+    """Creates a single OTLP JSON span. Attributes with no value are left
+    out.
+
+    :param str name: the name of the span.
+    :param str trace_id: the trace ID.
+    :param str span_id: the span ID.
+    :param str parent_id: the ID of the parent span, if there is one.
+    :param datetime.datetime start: when the span started.
+    :param datetime.datetime end: when the span ended.
+    :param dict attributes: the span's attributes.
+    :param bool error: whether the span represents a failure.
+    :param str timezone: the timezone the times are in.
+    :rtype: ``dict``"""
+
+    span = {
+        "traceId": trace_id, "spanId": span_id, "name": name, "kind": 1,
+        "startTimeUnixNano": str(to_unix_nano(start, timezone)),
+        "endTimeUnixNano": str(to_unix_nano(end, timezone)),
+        "attributes": make_attributes(attributes),
+        "status": {"code": 2 if error else 1},
+    }
+    if parent_id: span["parentSpanId"] = parent_id
+    return span
+
+
+def make_attributes(attributes):
+    """Converts a dictionary to OTLP JSON attributes, leaving out any with no
+    value.
+
+    :param dict attributes: the attributes.
+    :rtype: ``list``"""
+
+    converted = []
+    for key, value in attributes.items():
+        if value is None or value == "": continue
+        if isinstance(value, bool):
+            converted.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            converted.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            converted.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            converted.append({"key": key, "value": {"stringValue": str(value)}})
+    return converted
+
+
+def make_id(length, *parts):
+    """Derives a hex trace or span ID of the given length from some values,
+    so that the same values always give the same ID.
+
+    :param int length: the number of hex characters (32 for traces, 16 for spans).
+    :rtype: ``str``"""
+
+    text = "\0".join(str(part) for part in parts)
+    return hashlib.sha256(text.encode()).hexdigest()[:length]
+
+
+def to_unix_nano(dt, timezone=None):
+    """Converts a datetime to nanoseconds since the Unix epoch. Naive
+    datetimes are taken to be in the timezone given, or local time if there
+    isn't one.
+
+    :param datetime.datetime dt: the datetime.
+    :param str timezone: the timezone of naive datetimes.
+    :rtype: ``int``"""
+
+    if dt.tzinfo is None and timezone: dt = dt.replace(tzinfo=ZoneInfo(timezone))
+    return int(dt.timestamp()) * 1_000_000_000 + dt.microsecond * 1000
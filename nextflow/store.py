@@ -0,0 +1,490 @@
+import sqlite3
+from datetime import datetime, timedelta
+from nextflow.log import get_exception_from_log
+from nextflow.exceptions import SQLiteNotSupportedError
+from nextflow.models import Execution, ProcessExecution, ErrorMatch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    identifier TEXT NOT NULL,
+    session_uuid TEXT,
+    path TEXT NOT NULL,
+    command TEXT,
+    started TEXT,
+    finished TEXT,
+    return_code TEXT,
+    stdout TEXT,
+    stderr TEXT,
+    UNIQUE (path, identifier)
+);
+CREATE INDEX IF NOT EXISTS executions_session_uuid ON executions (session_uuid);
+CREATE INDEX IF NOT EXISTS executions_started ON executions (started);
+
+CREATE TABLE IF NOT EXISTS process_executions (
+    id INTEGER PRIMARY KEY,
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    identifier TEXT NOT NULL,
+    name TEXT,
+    process TEXT,
+    process_name TEXT,
+    path TEXT,
+    status TEXT,
+    return_code TEXT,
+    cached INTEGER,
+    submitted TEXT,
+    started TEXT,
+    finished TEXT,
+    duration REAL,
+    realtime REAL,
+    cpu REAL,
+    peak_rss INTEGER,
+    rchar INTEGER,
+    wchar INTEGER,
+    stdout TEXT,
+    stderr TEXT,
+    UNIQUE (execution_id, identifier)
+);
+CREATE INDEX IF NOT EXISTS process_executions_process ON process_executions (process, status, finished);
+CREATE INDEX IF NOT EXISTS process_executions_process_name ON process_executions (process_name, status, finished);
+CREATE INDEX IF NOT EXISTS process_executions_status ON process_executions (status, finished);
+CREATE INDEX IF NOT EXISTS process_executions_submitted ON process_executions (submitted);
+CREATE INDEX IF NOT EXISTS process_executions_finished ON process_executions (finished);
+
+CREATE TABLE IF NOT EXISTS errors (
+    id INTEGER PRIMARY KEY,
+    execution_id INTEGER NOT NULL REFERENCES executions (id),
+    identifier TEXT NOT NULL,
+    source TEXT NOT NULL,
+    process TEXT,
+    text TEXT NOT NULL,
+    UNIQUE (execution_id, identifier, source)
+);
+"""
+
+ERRORS_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS errors_index USING fts5 (
+    text, process, content='errors', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS errors_insert AFTER INSERT ON errors BEGIN
+    INSERT INTO errors_index (rowid, text, process) VALUES (new.id, new.text, new.process);
+END;
+CREATE TRIGGER IF NOT EXISTS errors_delete AFTER DELETE ON errors BEGIN
+    INSERT INTO errors_index (errors_index, rowid, text, process) VALUES ('delete', old.id, old.text, old.process);
+END;
+CREATE TRIGGER IF NOT EXISTS errors_update AFTER UPDATE ON errors BEGIN
+    INSERT INTO errors_index (errors_index, rowid, text, process) VALUES ('delete', old.id, old.text, old.process);
+    INSERT INTO errors_index (rowid, text, process) VALUES (new.id, new.text, new.process);
+END;
+"""
+
+PROCESS_EXECUTION_COLUMNS = [
+    "identifier", "name", "process", "process_name", "path", "status",
+    "return_code", "cached", "submitted", "started", "finished", "duration",
+    "realtime", "cpu", "peak_rss", "rchar", "wchar", "stdout", "stderr"
+]
+
+class ExecutionStore:
+    """A local SQLite database of executions and their process executions,
+    which can be written to on every poll and queried across all the runs it
+    has recorded. Only rows which have changed since they were last saved by
+    this store are written, so saving the same execution repeatedly while
+    polling is cheap.
+
+    The output of failed process executions, and the exception which ended
+    any execution that crashed, are also kept in a full-text index which can
+    be searched across every execution recorded.
+
+    The log text and bash scripts are not stored. The full-text index needs
+    SQLite's FTS5 extension, which most builds of Python include - if it is
+    missing, everything else still works, but searching the errors raises a
+    :py:class:`.SQLiteNotSupportedError`. SQLite 3.24 or later is needed.
+
+    :param str path: the location of the database file (by default, in memory)."""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.searchable = sqlite_has_fts5(self.connection)
+        if self.searchable: self.connection.executescript(ERRORS_INDEX_SCHEMA)
+        self.saved = {}
+        self.log_exceptions = {}
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def close(self):
+        """Closes the connection to the database, first letting SQLite update
+        the statistics it uses to plan queries if they are out of date."""
+
+        self.connection.execute("PRAGMA optimize")
+        self.connection.close()
+
+
+    def save(self, execution):
+        """Writes an execution and its process executions to the database,
+        creating or updating rows as needed. Executions are identified by their
+        path and Nextflow identifier, and one without an identifier yet (such
+        as one from the first poll of a run) is not saved. The log is only
+        checked for an exception once the execution has finished.
+
+        The database ID of the execution is returned.
+
+        :param nextflow.models.Execution execution: the execution to save.
+        :rtype: ``int``"""
+
+        if not execution or not execution.identifier: return None
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO executions (identifier, session_uuid, path, command, "
+                "started, finished, return_code, stdout, stderr) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path, identifier) DO UPDATE SET "
+                "session_uuid=excluded.session_uuid, command=excluded.command, "
+                "started=excluded.started, finished=excluded.finished, "
+                "return_code=excluded.return_code, stdout=excluded.stdout, "
+                "stderr=excluded.stderr", (
+                    execution.identifier, execution.session_uuid,
+                    str(execution.path), execution.command,
+                    serialize_value(execution.started),
+                    serialize_value(execution.finished),
+                    execution.return_code, execution.stdout, execution.stderr
+                )
+            )
+            execution_id = self.connection.execute(
+                "SELECT id FROM executions WHERE path = ? AND identifier = ?",
+                (str(execution.path), execution.identifier)
+            ).fetchone()[0]
+            saved = self.saved.setdefault(execution_id, {})
+            rows, errors = [], []
+            for process_execution in execution.process_executions:
+                row = make_process_execution_row(process_execution)
+                if saved.get(row[0]) == row: continue
+                saved[row[0]] = row
+                rows.append((execution_id, *row))
+                if process_execution.status == "FAILED":
+                    errors += make_error_rows(execution_id, process_execution)
+            if execution.finished and execution_id not in self.log_exceptions:
+                exception = get_exception_from_log(execution.log)
+                self.log_exceptions[execution_id] = exception
+                if exception: errors.append((execution_id, "", "log", "", exception))
+            if rows:
+                columns = ", ".join(PROCESS_EXECUTION_COLUMNS)
+                updates = ", ".join(f"{c}=excluded.{c}" for c in PROCESS_EXECUTION_COLUMNS[1:])
+                self.connection.executemany(
+                    f"INSERT INTO process_executions (execution_id, {columns}) "
+                    f"VALUES ({', '.join('?' * (len(PROCESS_EXECUTION_COLUMNS) + 1))}) "
+                    f"ON CONFLICT (execution_id, identifier) DO UPDATE SET {updates}",
+                    rows
+                )
+            if errors:
+                self.connection.executemany(
+                    "INSERT INTO errors (execution_id, identifier, source, process, text) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (execution_id, identifier, source) "
+                    "DO UPDATE SET process=excluded.process, text=excluded.text "
+                    "WHERE text != excluded.text", errors
+                )
+        return execution_id
+
+
+    def get_executions(self, session_uuid=None, since=None, until=None, process_executions=True):
+        """Gets the stored executions, most recently started first, optionally
+        filtered by session or by when they started.
+
+        :param str session_uuid: only get executions with this session UUID.
+        :param datetime.datetime since: only get executions started at or after this.
+        :param datetime.datetime until: only get executions started before this.
+        :param bool process_executions: whether to load their process executions.
+        :rtype: ``list``"""
+
+        clauses, values = [], []
+        if session_uuid:
+            clauses.append("session_uuid = ?")
+            values.append(session_uuid)
+        if since:
+            clauses.append("started >= ?")
+            values.append(serialize_value(since))
+        if until:
+            clauses.append("started < ?")
+            values.append(serialize_value(until))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connection.execute(
+            f"SELECT * FROM executions {where} ORDER BY started DESC, id DESC", values
+        ).fetchall()
+        executions = [make_execution(row) for row in rows]
+        if process_executions:
+            lookup = {e.database_id: e for e in executions}
+            for execution in executions:
+                execution.process_executions = self.query(
+                    "execution_id = ?", [execution.database_id], lookup
+                )
+        return executions
+
+
+    def get_process_executions(self, process=None, status=None, since=None, until=None, session_uuid=None, limit=None):
+        """Gets stored process executions, most recently finished first. The
+        process can be given in full (``WF:SUB:PROC``) or as just the final
+        process name (``PROC``), which matches it in any workflow. Times are
+        compared with when the process execution finished.
+
+        For example, all the failed tasks of a process in the last 30 days:
+
+            >>> store.get_process_executions(
+            ...     process="FASTQC", status="FAILED",
+            ...     since=datetime.now() - timedelta(days=30)
+            ... )
+
+        Each process execution is linked to its execution, which is loaded
+        without its other process executions.
+
+        :param str process: only get process executions of this process.
+        :param str status: only get process executions with this status.
+        :param datetime.datetime since: only get those finished at or after this.
+        :param datetime.datetime until: only get those finished before this.
+        :param str session_uuid: only get those in executions with this session.
+        :param int limit: the maximum number to return.
+        :rtype: ``list``"""
+
+        clauses, values = [], []
+        if process:
+            clauses.append("process = ?" if ":" in process else "process_name = ?")
+            values.append(process)
+        if status:
+            clauses.append("status = ?")
+            values.append(status)
+        if since:
+            clauses.append("finished >= ?")
+            values.append(serialize_value(since))
+        if until:
+            clauses.append("finished < ?")
+            values.append(serialize_value(until))
+        if session_uuid:
+            clauses.append(
+                "execution_id IN (SELECT id FROM executions WHERE session_uuid = ?)"
+            )
+            values.append(session_uuid)
+        return self.query(" AND ".join(clauses) or "1", values, limit=limit)
+
+
+    def search_errors(self, text, limit=20, raw=False):
+        """Searches the error output of failed process executions, and the
+        exceptions which ended crashed executions, across every execution in
+        the store. The best matches are returned first. If SQLite was built
+        without FTS5, there is no index to search and a
+        :py:class:`.SQLiteNotSupportedError` is raised.
+
+        By default every word in the text must appear, in any order, and
+        punctuation is ignored. Pass ``raw=True`` to use SQLite's full-text
+        query syntax instead, such as ``"exit status 137" OR Killed``, or
+        ``process: FASTQC AND memory``.
+
+            >>> for match in store.search_errors("OutOfMemoryError"):
+            ...     print(match.execution.path, match.process_execution, match.snippet)
+
+        :param str text: the text to search for.
+        :param int limit: the maximum number of matches to return.
+        :param bool raw: whether the text is a full-text query expression.
+        :rtype: ``list``"""
+
+        if not self.searchable:
+            raise SQLiteNotSupportedError(
+                f"SQLite {sqlite3.sqlite_version} was built without the FTS5 "
+                "extension, which searching the errors needs"
+            )
+        query = text if raw else " ".join(
+            '"' + word.replace('"', '""') + '"' for word in text.split()
+        )
+        if not query: return []
+        rows = self.connection.execute(
+            "SELECT errors.execution_id, errors.source, errors.text, "
+            "process_executions.id AS process_execution_id, "
+            "snippet(errors_index, 0, '[', ']', '...', 16) AS snippet, "
+            "errors_index.rank AS rank FROM errors_index "
+            "JOIN errors ON errors.id = errors_index.rowid "
+            "LEFT JOIN process_executions ON process_executions.execution_id = errors.execution_id "
+            "AND process_executions.identifier = errors.identifier "
+            "WHERE errors_index MATCH ? ORDER BY rank, errors.id DESC LIMIT ?",
+            (query, int(limit))
+        ).fetchall()
+        executions = self.get_executions_by_id({r["execution_id"] for r in rows})
+        ids = {r["process_execution_id"] for r in rows} - {None}
+        process_executions = {p.database_id: p for p in self.query(
+            f"id IN ({', '.join('?' * len(ids))})", list(ids), executions
+        )} if ids else {}
+        return [ErrorMatch(
+            execution=executions[row["execution_id"]],
+            process_execution=process_executions.get(row["process_execution_id"]),
+            source=row["source"], text=row["text"], snippet=row["snippet"],
+            rank=row["rank"]
+        ) for row in rows]
+
+
+    def get_executions_by_id(self, ids, executions=None):
+        """Gets executions from their database IDs, without their process
+        executions. Any already loaded can be given, and will not be loaded
+        again.
+
+        :param set ids: the database IDs.
+        :param dict executions: already loaded executions, by database ID.
+        :rtype: ``dict``"""
+
+        executions = {} if executions is None else executions
+        missing = set(ids) - set(executions)
+        if missing:
+            for row in self.connection.execute(
+                f"SELECT * FROM executions WHERE id IN ({', '.join('?' * len(missing))})",
+                list(missing)
+            ):
+                executions[row["id"]] = make_execution(row)
+        return executions
+
+
+    def query(self, where, values, executions=None, limit=None):
+        """Gets process executions matching an SQL condition on the
+        ``process_executions`` table, linked to their executions.
+
+        :param str where: the SQL condition.
+        :param list values: the values for any placeholders in the condition.
+        :param dict executions: already loaded executions, by database ID.
+        :param int limit: the maximum number to return.
+        :rtype: ``list``"""
+
+        sql = f"SELECT * FROM process_executions WHERE {where} ORDER BY finished DESC, id DESC"
+        if limit: sql += f" LIMIT {int(limit)}"
+        rows = self.connection.execute(sql, values).fetchall()
+        executions = self.get_executions_by_id(
+            {r["execution_id"] for r in rows}, executions
+        )
+        process_executions = []
+        for row in rows:
+            process_execution = make_process_execution(row)
+            process_execution.execution = executions[row["execution_id"]]
+            process_executions.append(process_execution)
+        return process_executions
+
+
+
+def sqlite_has_fts5(connection):
+    """Checks whether SQLite's FTS5 full-text search extension is available,
+    by trying to create a temporary table with it.
+
+    :param sqlite3.Connection connection: the database connection.
+    :rtype: ``bool``"""
+
+    try:
+        connection.execute("CREATE VIRTUAL TABLE temp.fts5_check USING fts5 (text)")
+    except sqlite3.OperationalError:
+        return False
+    connection.execute("DROP TABLE temp.fts5_check")
+    return True
+
+
+def make_process_execution_row(process_execution):
+    """Converts a process execution to the values stored for it, in the order
+    of ``PROCESS_EXECUTION_COLUMNS``.
+
+    :param nextflow.models.ProcessExecution process_execution: the process execution.
+    :rtype: ``tuple``"""
+
+    duration = process_execution.duration
+    return (
+        process_execution.identifier, process_execution.name,
+        process_execution.process, process_execution.process.split(":")[-1],
+        str(process_execution.path or ""), process_execution.status,
+        process_execution.return_code, int(bool(process_execution.cached)),
+        serialize_value(process_execution.submitted),
+        serialize_value(process_execution.started),
+        serialize_value(process_execution.finished),
+        serialize_value(duration), serialize_value(process_execution.realtime),
+        process_execution.cpu, process_execution.peak_rss,
+        process_execution.rchar, process_execution.wchar,
+        process_execution.stdout, process_execution.stderr
+    )
+
+
+def make_error_rows(execution_id, process_execution):
+    """Gets the rows of the ``errors`` table for a failed process execution -
+    one for each of its stderr and stdout which are not empty.
+
+    :param int execution_id: the database ID of its execution.
+    :param nextflow.models.ProcessExecution process_execution: the process execution.
+    :rtype: ``list``"""
+
+    return [(
+        execution_id, process_execution.identifier, source,
+        process_execution.process, text
+    ) for source, text in (
+        ("stderr", process_execution.stderr), ("stdout", process_execution.stdout)
+    ) if text and text.strip()]
+
+
+def serialize_value(value):
+    """Converts datetimes to sortable ISO strings, and timedeltas to seconds,
+    for storing. Other values are returned as they are.
+
+    :param value: the value to convert.
+    :rtype: ``str``"""
+
+    if isinstance(value, datetime): return value.isoformat(" ")
+    if isinstance(value, timedelta): return value.total_seconds()
+    return value
+
+
+def parse_datetime(value):
+    """Converts a stored ISO string back to a datetime.
+
+    :param str value: the stored value.
+    :rtype: ``datetime.datetime``"""
+
+    return datetime.fromisoformat(value) if value else None
+
+
+def make_execution(row):
+    """Creates an execution from a row of the ``executions`` table. Its
+    process executions are not loaded, and its log is empty.
+
+    :param sqlite3.Row row: the row.
+    :rtype: ``nextflow.models.Execution``"""
+
+    execution = Execution(
+        identifier=row["identifier"], stdout=row["stdout"] or "",
+        stderr=row["stderr"] or "", return_code=row["return_code"] or "",
+        started=parse_datetime(row["started"]),
+        finished=parse_datetime(row["finished"]), command=row["command"] or "",
+        log="", path=row["path"], session_uuid=row["session_uuid"] or "",
+        process_executions=[], database_id=row["id"]
+    )
+    return execution
+
+
+def make_process_execution(row):
+    """Creates a process execution from a row of the ``process_executions``
+    table. Its bash script is not stored, and is empty.
+
+    :param sqlite3.Row row: the row.
+    :rtype: ``nextflow.models.ProcessExecution``"""
+
+    process_execution = ProcessExecution(
+        identifier=row["identifier"], name=row["name"], process=row["process"],
+        path=row["path"], stdout=row["stdout"] or "", stderr=row["stderr"] or "",
+        return_code=row["return_code"] or "", bash="",
+        submitted=parse_datetime(row["submitted"]),
+        started=parse_datetime(row["started"]),
+        finished=parse_datetime(row["finished"]), status=row["status"],
+        cached=bool(row["cached"]), io=None,
+        realtime=timedelta(seconds=row["realtime"]) if row["realtime"] is not None else None,
+        cpu=row["cpu"], peak_rss=row["peak_rss"], rchar=row["rchar"],
+        wchar=row["wchar"], database_id=row["id"]
+    )
+    return process_execution
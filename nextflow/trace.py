@@ -0,0 +1,165 @@
+import os
+import re
+from io import BytesIO
+from datetime import timedelta
+from nextflow.models import TraceRecord
+
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+MEMORY_UNITS = {
+    "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3,
+    "TB": 1024 ** 4, "PB": 1024 ** 5
+}
+
+def iter_trace_records(path_or_stream, offset=0):
+    """Yields the rows of a Nextflow trace file (as produced by
+    ``-with-trace``), reading it one line at a time. The header row is always
+    read to find the columns, whatever the offset.
+
+    Each record stores the byte offset of the end of its line, which can be
+    passed back in as ``offset`` to resume reading after it. A final line with
+    no newline is assumed to still be being written, and is not read.
+
+    :param path_or_stream: the location of the trace file, or a binary stream.
+    :param int offset: the byte offset to start reading from.
+    :rtype: ``nextflow.models.TraceRecord``"""
+
+    if isinstance(path_or_stream, (str, os.PathLike)):
+        try:
+            with open(path_or_stream, "rb") as f:
+                yield from iter_trace_records(f, offset)
+        except FileNotFoundError:
+            pass
+        return
+    path_or_stream.seek(0)
+    header = path_or_stream.readline()
+    if not header.endswith(b"\n"): return
+    columns = header.decode().rstrip("\r\n").split("\t")
+    offset = max(offset, len(header))
+    path_or_stream.seek(offset)
+    for line in path_or_stream:
+        if not line.endswith(b"\n"): break
+        offset += len(line)
+        values = line.decode(errors="replace").rstrip("\r\n").split("\t")
+        yield parse_trace_row(dict(zip(columns, values)), offset)
+
+
+def parse_trace_row(fields, offset=0):
+    """Creates a trace record from the values of a row in a trace file, keyed
+    by column name. Metrics which are missing or not yet known are ``None``.
+
+    :param dict fields: the column names mapped to values.
+    :param int offset: the byte offset of the end of the row.
+    :rtype: ``nextflow.models.TraceRecord``"""
+
+    return TraceRecord(
+        identifier=fields.get("hash", ""),
+        name=fields.get("name", ""),
+        status=fields.get("status", ""),
+        exit=fields.get("exit", "-"),
+        realtime=parse_trace_duration(fields.get("realtime", "-")),
+        cpu=parse_trace_percentage(fields.get("%cpu", "-")),
+        peak_rss=parse_trace_memory(fields.get("peak_rss", "-")),
+        rchar=parse_trace_memory(fields.get("rchar", "-")),
+        wchar=parse_trace_memory(fields.get("wchar", "-")),
+        offset=offset,
+        fields=fields
+    )
+
+
+def parse_trace_duration(value):
+    """Parses a duration from a trace file, such as ``1m 4s`` or ``250ms``.
+    Plain numbers (from ``trace.raw``) are milliseconds.
+
+    :param str value: the duration text.
+    :rtype: ``datetime.timedelta``"""
+
+    value = value.strip()
+    if value in ("", "-"): return None
+    if re.fullmatch(r"\d+(\.\d+)?", value):
+        return timedelta(milliseconds=float(value))
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)\b", value)
+    if not parts: return None
+    return timedelta(seconds=sum(float(n) * DURATION_UNITS[u] for n, u in parts))
+
+
+def parse_trace_memory(value):
+    """Parses an amount of memory or data from a trace file, such as
+    ``12.5 MB``, into a number of bytes. Plain numbers are bytes.
+
+    :param str value: the memory text.
+    :rtype: ``int``"""
+
+    value = value.strip()
+    if value in ("", "-"): return None
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMGTP]?B)?", value)
+    if not match: return None
+    return int(float(match[1]) * MEMORY_UNITS[match[2] or "B"])
+
+
+def parse_trace_percentage(value):
+    """Parses a percentage from a trace file, such as ``95.3%``.
+
+    :param str value: the percentage text.
+    :rtype: ``float``"""
+
+    value = value.strip().rstrip("%")
+    if value in ("", "-"): return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def update_process_executions_from_trace(process_executions, path, offset=0, pending=None, io=None):
+    """Reads any new rows of a trace file and copies their metrics onto the
+    matching process executions, returning the offset to read from next time.
+    Process executions are matched on their ``xx/yyyyyy`` identifier. Return
+    codes are only filled in if not already known.
+
+    A row for a process execution not yet known doesn't stop the reading. If
+    a ``pending`` dictionary is given, the row is kept in it by identifier,
+    and applied on a later call once the process execution is known -
+    otherwise it is skipped.
+
+    With a custom io object, the whole file is read through its ``read``
+    method on each call, and only the rows after the offset are used.
+
+    :param list process_executions: the process executions to update.
+    :param str path: the location of the trace file.
+    :param int offset: the byte offset to start reading from.
+    :param dict pending: rows waiting for their process executions.
+    :param io: an optional custom io object to read the file with.
+    :rtype: ``int``"""
+
+    lookup = {pe.identifier: pe for pe in process_executions}
+    if pending:
+        for identifier in [i for i in pending if i in lookup]:
+            copy_trace_record(pending.pop(identifier), lookup[identifier])
+    if io:
+        try:
+            path = BytesIO(io.read(path, "rb"))
+        except FileNotFoundError:
+            return offset
+    for record in iter_trace_records(path, offset):
+        offset = record.offset
+        process_execution = lookup.get(record.identifier)
+        if process_execution:
+            copy_trace_record(record, process_execution)
+        elif pending is not None:
+            pending[record.identifier] = record
+    return offset
+
+
+def copy_trace_record(record, process_execution):
+    """Copies the metrics of a trace record onto a process execution.
+
+    :param nextflow.models.TraceRecord record: the trace record.
+    :param nextflow.models.ProcessExecution process_execution: the process execution."""
+
+    process_execution.realtime = record.realtime
+    process_execution.cpu = record.cpu
+    process_execution.peak_rss = record.peak_rss
+    process_execution.rchar = record.rchar
+    process_execution.wchar = record.wchar
+    if not process_execution.return_code and record.exit != "-":
+        process_execution.return_code = record.exit
@@ -0,0 +1,212 @@
+import json
+import queue
+import threading
+from datetime import datetime, timedelta, timezone as tz
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from zoneinfo import ZoneInfo
+from nextflow.models import ProcessExecution
+
+class WeblogReceiver:
+    """A small HTTP server, listening on localhost, which Nextflow can send
+    its ``-with-weblog`` events to. The events are queued as they arrive and
+    collected with :py:meth:`get_events`.
+
+    :param str host: the address to listen on.
+    :param int port: the port to listen on (by default, any free port)."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.queue = queue.Queue()
+        events = self.queue
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    events.put(json.loads(self.rfile.read(length)))
+                except ValueError:
+                    pass
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+    @property
+    def url(self):
+        """The URL to pass to Nextflow.
+
+        :rtype: ``str``"""
+
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def start(self):
+        """Starts listening for events in a background thread."""
+
+        self.thread.start()
+
+
+    def stop(self):
+        """Stops listening for events and closes the server."""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    def get_events(self):
+        """Returns every event received since the last call, in the order they
+        were received.
+
+        :rtype: ``list``"""
+
+        events = []
+        while True:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                return events
+
+
+
+def apply_weblog_events(execution, events, timezone=None):
+    """Updates an execution and its process executions from a list of
+    weblog events. Process executions are created when they are submitted,
+    and updated when they start and complete. The execution's return code is
+    set when the workflow completes.
+
+    :param nextflow.models.Execution execution: the execution to update.
+    :param list events: the weblog events, as decoded JSON.
+    :param str timezone: the timezone to give times in.
+    :rtype: ``nextflow.models.Execution``"""
+
+    process_executions = {p.identifier: p for p in execution.process_executions}
+    for event in events:
+        kind = event.get("event", "")
+        if kind == "started":
+            if not execution.identifier: execution.identifier = event.get("runName", "")
+            if not execution.session_uuid: execution.session_uuid = event.get("runId", "")
+            execution.started = parse_weblog_time(event.get("utcTime"), timezone)
+        elif kind == "completed":
+            execution.finished = parse_weblog_time(event.get("utcTime"), timezone)
+            workflow = event.get("metadata", {}).get("workflow", {})
+            if "exitStatus" in workflow:
+                execution.return_code = str(workflow["exitStatus"])
+        elif kind.startswith("process_"):
+            update_process_execution_from_weblog(
+                process_executions, event.get("trace", {}), execution, timezone
+            )
+    execution.process_executions = list(process_executions.values())
+    return execution
+
+
+def update_process_execution_from_weblog(process_executions, trace, execution, timezone=None):
+    """Creates or updates a process execution from the trace of a weblog
+    process event.
+
+    :param dict process_executions: process executions by identifier.
+    :param dict trace: the trace values of the event.
+    :param nextflow.models.Execution execution: the containing execution.
+    :param str timezone: the timezone to give times in."""
+
+    identifier = trace.get("hash", "")
+    if not identifier: return
+    process_execution = process_executions.get(identifier)
+    if not process_execution:
+        workdir = trace.get("workdir") or ""
+        process_execution = ProcessExecution(
+            identifier=identifier, name=trace.get("name", ""),
+            process=trace.get("process", ""),
+            path=workdir.rstrip("/"),
+            stdout="", stderr="", return_code="", bash="",
+            submitted=parse_weblog_timestamp(trace.get("submit"), timezone),
+            started=None, finished=None, status="-", cached=False, io=None
+        )
+        process_execution.execution = execution
+        process_executions[identifier] = process_execution
+    if trace.get("start") and not process_execution.started:
+        process_execution.started = parse_weblog_timestamp(trace["start"], timezone)
+    status = trace.get("status", "")
+    if status in ("COMPLETED", "FAILED", "ABORTED", "CACHED"):
+        process_execution.status = "COMPLETED" if status == "CACHED" else status
+        process_execution.cached = status == "CACHED"
+        process_execution.finished = parse_weblog_timestamp(trace.get("complete"), timezone)
+        if trace.get("exit") is not None:
+            process_execution.return_code = str(trace["exit"])
+        if trace.get("realtime") is not None:
+            process_execution.realtime = timedelta(milliseconds=trace["realtime"])
+        process_execution.cpu = trace.get("%cpu")
+        process_execution.peak_rss = trace.get("peak_rss")
+        process_execution.rchar = trace.get("rchar")
+        process_execution.wchar = trace.get("wchar")
+
+
+def parse_weblog_timestamp(value, timezone=None):
+    """Converts a weblog timestamp in milliseconds since the epoch to a naive
+    datetime in the given timezone, or local time.
+
+    :param int value: the timestamp.
+    :param str timezone: the timezone to give the time in.
+    :rtype: ``datetime.datetime``"""
+
+    if not value: return None
+    dt = datetime.fromtimestamp(value / 1000, tz.utc)
+    return to_naive(dt, timezone)
+
+
+def parse_weblog_time(value, timezone=None):
+    """Converts a weblog ``utcTime`` string to a naive datetime in the given
+    timezone, or local time.
+
+    :param str value: the time string.
+    :param str timezone: the timezone to give the time in.
+    :rtype: ``datetime.datetime``"""
+
+    if not value: return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None: dt = dt.replace(tzinfo=tz.utc)
+    return to_naive(dt, timezone)
+
+
+def to_naive(dt, timezone=None):
+    """Converts an aware datetime to a naive one in the given timezone, or
+    local time.
+
+    :param datetime.datetime dt: the aware datetime.
+    :param str timezone: the timezone to convert to.
+    :rtype: ``datetime.datetime``"""
+
+    dt = dt.astimezone(ZoneInfo(timezone)) if timezone else dt.astimezone()
+    return dt.replace(tzinfo=None)
+
+
+def copy_weblog_metrics(source, target):
+    """Copies the resource metrics received by weblog from one execution's
+    process executions onto another's, matching them by identifier.
+
+    :param nextflow.models.Execution source: the execution built from weblog.
+    :param nextflow.models.Execution target: the execution to copy onto."""
+
+    lookup = {p.identifier: p for p in source.process_executions}
+    for process_execution in target.process_executions:
+        other = lookup.get(process_execution.identifier)
+        if not other: continue
+        for attribute in ("realtime", "cpu", "peak_rss", "rchar", "wchar"):
+            if getattr(process_execution, attribute, None) is None:
+                setattr(process_execution, attribute, getattr(other, attribute))
@@ -22,8 +22,8 @@ class RnaSeqTests(TestCase):
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:UNTAR_BBSPLIT_INDEX",
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:BBMAP_BBSPLIT",
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:UNTAR_STAR_INDEX",
-            "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:STAR_GENOMEGENERATE",
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:STAR_GENOMEGENERATE_IGENOMES",
+            "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:STAR_GENOMEGENERATE",
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:UNTAR_RSEM_INDEX",
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:RSEM_PREPAREREFERENCE_GENOME",
             "NFCORE_RNASEQ:RNASEQ:PREPARE_GENOME:HISAT2_EXTRACTSPLICESITES",
@@ -37,16 +37,16 @@ class RnaSeqTests(TestCase):
             "NFCORE_RNASEQ:RNASEQ:FASTQ_SUBSAMPLE_FQ_SALMON:FQ_SUBSAMPLE",
             "NFCORE_RNASEQ:RNASEQ:FASTQ_SUBSAMPLE_FQ_SALMON:SALMON_QUANT",
             "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:FASTQC",
-            "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:TRIMGALORE",
             "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:UMITOOLS_EXTRACT",
-            "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTP",
+            "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:TRIMGALORE",
             "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTQC_RAW",
             "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:UMITOOLS_EXTRACT",
+            "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTP",
             "NFCORE_RNASEQ:RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTQC_TRIM",
             "NFCORE_RNASEQ:RNASEQ:BBMAP_BBSPLIT",
             "NFCORE_RNASEQ:RNASEQ:SORTMERNA",
-            "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN",
             "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN_IGENOMES",
+            "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN",
             "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_SORT",
             "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_INDEX",
             "NFCORE_RNASEQ:RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
@@ -99,7 +99,6 @@ class RnaSeqTests(TestCase):
             "NFCORE_RNASEQ:RNASEQ:BAM_MARKDUPLICATES_PICARD:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
             "NFCORE_RNASEQ:RNASEQ:STRINGTIE_STRINGTIE",
             "NFCORE_RNASEQ:RNASEQ:SUBREAD_FEATURECOUNTS",
-            "NFCORE_RNASEQ:RNASEQ:MULTIQC",
             "NFCORE_RNASEQ:RNASEQ:MULTIQC_CUSTOM_BIOTYPE",
             "NFCORE_RNASEQ:RNASEQ:BEDTOOLS_GENOMECOV",
             "NFCORE_RNASEQ:RNASEQ:BEDGRAPH_BEDCLIP_BEDGRAPHTOBIGWIG_FORWARD:UCSC_BEDCLIP",
@@ -125,125 +124,7 @@ class RnaSeqTests(TestCase):
             "NFCORE_RNASEQ:RNASEQ:QUANTIFY_SALMON:SALMON_SE_TRANSCRIPT",
             "NFCORE_RNASEQ:RNASEQ:DESEQ2_QC_SALMON",
             "NFCORE_RNASEQ:RNASEQ:CUSTOM_DUMPSOFTWAREVERSIONS",
-            "RNASEQ:PREPARE_GENOME:GUNZIP_FASTA",
-            "RNASEQ:PREPARE_GENOME:GUNZIP_GTF",
-            "RNASEQ:PREPARE_GENOME:GUNZIP_GFF",
-            "RNASEQ:PREPARE_GENOME:GFFREAD",
-            "RNASEQ:PREPARE_GENOME:GUNZIP_ADDITIONAL_FASTA",
-            "RNASEQ:PREPARE_GENOME:CAT_ADDITIONAL_FASTA",
-            "RNASEQ:PREPARE_GENOME:GUNZIP_GENE_BED",
-            "RNASEQ:PREPARE_GENOME:GTF2BED",
-            "RNASEQ:PREPARE_GENOME:GUNZIP_TRANSCRIPT_FASTA",
-            "RNASEQ:PREPARE_GENOME:PREPROCESS_TRANSCRIPTS_FASTA_GENCODE",
-            "RNASEQ:PREPARE_GENOME:GTF_GENE_FILTER",
-            "RNASEQ:PREPARE_GENOME:MAKE_TRANSCRIPTS_FASTA",
-            "RNASEQ:PREPARE_GENOME:CUSTOM_GETCHROMSIZES",
-            "RNASEQ:PREPARE_GENOME:UNTAR_BBSPLIT_INDEX",
-            "RNASEQ:PREPARE_GENOME:BBMAP_BBSPLIT",
-            "RNASEQ:PREPARE_GENOME:UNTAR_STAR_INDEX",
-            "RNASEQ:PREPARE_GENOME:STAR_GENOMEGENERATE",
-            "RNASEQ:PREPARE_GENOME:STAR_GENOMEGENERATE_IGENOMES",
-            "RNASEQ:PREPARE_GENOME:UNTAR_RSEM_INDEX",
-            "RNASEQ:PREPARE_GENOME:RSEM_PREPAREREFERENCE_GENOME",
-            "RNASEQ:PREPARE_GENOME:HISAT2_EXTRACTSPLICESITES",
-            "RNASEQ:PREPARE_GENOME:UNTAR_HISAT2_INDEX",
-            "RNASEQ:PREPARE_GENOME:HISAT2_BUILD",
-            "RNASEQ:PREPARE_GENOME:UNTAR_SALMON_INDEX",
-            "RNASEQ:PREPARE_GENOME:SALMON_INDEX",
-            "RNASEQ:INPUT_CHECK:SAMPLESHEET_CHECK",
-            "RNASEQ:CAT_FASTQ",
-            "RNASEQ:FASTQ_SUBSAMPLE_FQ_SALMON:SALMON_INDEX",
-            "RNASEQ:FASTQ_SUBSAMPLE_FQ_SALMON:FQ_SUBSAMPLE",
-            "RNASEQ:FASTQ_SUBSAMPLE_FQ_SALMON:SALMON_QUANT",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:FASTQC",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:TRIMGALORE",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_TRIMGALORE:UMITOOLS_EXTRACT",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTP",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTQC_RAW",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:UMITOOLS_EXTRACT",
-            "RNASEQ:FASTQ_FASTQC_UMITOOLS_FASTP:FASTQC_TRIM",
-            "RNASEQ:BBMAP_BBSPLIT",
-            "RNASEQ:SORTMERNA",
-            "RNASEQ:ALIGN_STAR:STAR_ALIGN",
-            "RNASEQ:ALIGN_STAR:STAR_ALIGN_IGENOMES",
-            "RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_SORT",
-            "RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_INDEX",
-            "RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:ALIGN_STAR:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_GENOME:UMITOOLS_DEDUP",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_GENOME:SAMTOOLS_INDEX",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_GENOME:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_GENOME:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_GENOME:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_SORT",
-            "RNASEQ:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_INDEX",
-            "RNASEQ:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_TRANSCRIPTOME:UMITOOLS_DEDUP",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_TRANSCRIPTOME:SAMTOOLS_INDEX",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_TRANSCRIPTOME:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_TRANSCRIPTOME:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:BAM_DEDUP_STATS_SAMTOOLS_UMITOOLS_TRANSCRIPTOME:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:SAMTOOLS_SORT",
-            "RNASEQ:UMITOOLS_PREPAREFORSALMON",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_QUANT",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_TX2GENE",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_TXIMPORT",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_SE_GENE",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_SE_GENE_LENGTH_SCALED",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_SE_GENE_SCALED",
-            "RNASEQ:QUANTIFY_STAR_SALMON:SALMON_SE_TRANSCRIPT",
-            "RNASEQ:DESEQ2_QC_STAR_SALMON",
-            "RNASEQ:QUANTIFY_RSEM:RSEM_CALCULATEEXPRESSION",
-            "RNASEQ:QUANTIFY_RSEM:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_SORT",
-            "RNASEQ:QUANTIFY_RSEM:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_INDEX",
-            "RNASEQ:QUANTIFY_RSEM:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:QUANTIFY_RSEM:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:QUANTIFY_RSEM:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:QUANTIFY_RSEM:RSEM_MERGE_COUNTS",
-            "RNASEQ:DESEQ2_QC_RSEM",
-            "RNASEQ:FASTQ_ALIGN_HISAT2:HISAT2_ALIGN",
-            "RNASEQ:FASTQ_ALIGN_HISAT2:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_SORT",
-            "RNASEQ:FASTQ_ALIGN_HISAT2:BAM_SORT_STATS_SAMTOOLS:SAMTOOLS_INDEX",
-            "RNASEQ:FASTQ_ALIGN_HISAT2:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:FASTQ_ALIGN_HISAT2:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:FASTQ_ALIGN_HISAT2:BAM_SORT_STATS_SAMTOOLS:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:PRESEQ_LCEXTRAP",
-            "RNASEQ:BAM_MARKDUPLICATES_PICARD:PICARD_MARKDUPLICATES",
-            "RNASEQ:BAM_MARKDUPLICATES_PICARD:SAMTOOLS_INDEX",
-            "RNASEQ:BAM_MARKDUPLICATES_PICARD:BAM_STATS_SAMTOOLS:SAMTOOLS_STATS",
-            "RNASEQ:BAM_MARKDUPLICATES_PICARD:BAM_STATS_SAMTOOLS:SAMTOOLS_FLAGSTAT",
-            "RNASEQ:BAM_MARKDUPLICATES_PICARD:BAM_STATS_SAMTOOLS:SAMTOOLS_IDXSTATS",
-            "RNASEQ:STRINGTIE_STRINGTIE",
-            "RNASEQ:SUBREAD_FEATURECOUNTS",
-            "RNASEQ:MULTIQC",
-            "RNASEQ:MULTIQC_CUSTOM_BIOTYPE",
-            "RNASEQ:BEDTOOLS_GENOMECOV",
-            "RNASEQ:BEDGRAPH_BEDCLIP_BEDGRAPHTOBIGWIG_FORWARD:UCSC_BEDCLIP",
-            "RNASEQ:BEDGRAPH_BEDCLIP_BEDGRAPHTOBIGWIG_FORWARD:UCSC_BEDGRAPHTOBIGWIG",
-            "RNASEQ:BEDGRAPH_BEDCLIP_BEDGRAPHTOBIGWIG_REVERSE:UCSC_BEDCLIP",
-            "RNASEQ:BEDGRAPH_BEDCLIP_BEDGRAPHTOBIGWIG_REVERSE:UCSC_BEDGRAPHTOBIGWIG",
-            "RNASEQ:QUALIMAP_RNASEQ",
-            "RNASEQ:DUPRADAR",
-            "RNASEQ:BAM_RSEQC:RSEQC_BAMSTAT",
-            "RNASEQ:BAM_RSEQC:RSEQC_INNERDISTANCE",
-            "RNASEQ:BAM_RSEQC:RSEQC_INFEREXPERIMENT",
-            "RNASEQ:BAM_RSEQC:RSEQC_JUNCTIONANNOTATION",
-            "RNASEQ:BAM_RSEQC:RSEQC_JUNCTIONSATURATION",
-            "RNASEQ:BAM_RSEQC:RSEQC_READDISTRIBUTION",
-            "RNASEQ:BAM_RSEQC:RSEQC_READDUPLICATION",
-            "RNASEQ:BAM_RSEQC:RSEQC_TIN",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_QUANT",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_TX2GENE",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_TXIMPORT",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_SE_GENE",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_SE_GENE_LENGTH_SCALED",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_SE_GENE_SCALED",
-            "RNASEQ:QUANTIFY_SALMON:SALMON_SE_TRANSCRIPT",
-            "RNASEQ:DESEQ2_QC_SALMON",
-            "RNASEQ:CUSTOM_DUMPSOFTWAREVERSIONS"
+            "NFCORE_RNASEQ:RNASEQ:MULTIQC"
         ])
     
 
@@ -0,0 +1,88 @@
+"""Adds a real Nextflow log to the corpus in ``tests/logs`` - anonymizing it,
+copying it into the directory for its Nextflow version, and writing the
+``.json`` file of the run details and events that the parsers currently find
+in it.
+
+    $ python tests/logs/add_log.py ~/run/.nextflow.log local-cached --replace acme=org
+
+Home directories, user names, host names, IP addresses, email addresses and
+anything that looks like a token or password are replaced, along with any
+other text given with ``--replace``. Read the log and the ``.json`` file
+through before committing them - the events are what the parsers see now, so
+they need checking against the log by hand, and nothing private should be
+left in either.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from nextflow.log import (
+    iter_log_events, get_identifier_from_log, get_session_uuid_from_log,
+    log_is_finished
+)
+
+CORPUS = os.path.dirname(os.path.abspath(__file__))
+PATTERNS = [
+    (r"(/home|/Users)/[^/\s;:\]]+", r"\1/user"),
+    (r"(user(?:\.name)?[=:]\s*)[^\s;,\]]+", r"\1user"),
+    (r"(\d+@)[^\s\[\]]+", r"\1host"),
+    (r"\b(?:\d{1,3}\.){3}\d{1,3}\b", "192.0.2.1"),
+    (r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}\b", "user@example.com"),
+    (r"(?i)((?:token|password|secret|api_?key|access_?key)\w*\s*[=:]\s*)[^\s;,\]]+", r"\1[removed]"),
+]
+
+def anonymize(text, replacements=()):
+    """Replaces anything identifying in the text of a log.
+
+    :param str text: the log text.
+    :param replacements: further ``(old, new)`` pairs to replace.
+    :rtype: ``str``"""
+
+    for old, new in replacements:
+        text = text.replace(old, new)
+    for pattern, replacement in PATTERNS:
+        text = re.sub(pattern, replacement, text)
+    return text
+
+
+def get_version(text):
+    """Gets the major and minor Nextflow version a log was written by.
+
+    :param str text: the log text.
+    :rtype: ``str``"""
+
+    match = re.search(r"version (\d+\.\d+)\.\d+", text)
+    if not match: raise ValueError("The log doesn't say which Nextflow version wrote it")
+    return match[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log", help="the .nextflow.log file of a real run")
+    parser.add_argument("name", help="what to call it, such as slurm-failed")
+    parser.add_argument("--replace", action="append", default=[], help="OLD=NEW text to replace")
+    args = parser.parse_args()
+    with open(args.log) as f: text = f.read()
+    text = anonymize(text, [r.split("=", 1) for r in args.replace])
+    directory = os.path.join(CORPUS, get_version(text))
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, args.name + ".log")
+    with open(path, "w") as f: f.write(text)
+    expected = {
+        "identifier": get_identifier_from_log(text),
+        "session_uuid": get_session_uuid_from_log(text),
+        "finished": log_is_finished(text),
+        "events": [
+            [e.type, e.identifier, e.name, e.status, e.return_code]
+            for e in iter_log_events(path)
+        ]
+    }
+    with open(path[:-4] + ".json", "w") as f: f.write(json.dumps(expected, indent=4) + "\n")
+    print(f"Wrote {path} ({len(expected['events'])} events) - check it before committing")
+
+
+if __name__ == "__main__":
+    main()
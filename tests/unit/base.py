@@ -0,0 +1,29 @@
+from datetime import datetime
+from unittest import TestCase
+from nextflow.models import Execution, ProcessExecution
+
+START = datetime(2025, 1, 1, 12)
+
+class ModelTest(TestCase):
+
+    def make_execution(self, **kwargs):
+        kwargs = {
+            "identifier": "happy_turing", "stdout": "", "stderr": "", "return_code": "",
+            "started": START, "finished": None, "command": "nextflow run main.nf",
+            "log": "", "path": "/ex", "session_uuid": "1234", "process_executions": [],
+            **kwargs
+        }
+        execution = Execution(**kwargs)
+        for process_execution in execution.process_executions:
+            process_execution.execution = execution
+        return execution
+
+
+    def make_process_execution(self, **kwargs):
+        kwargs = {
+            "identifier": "aa/111111", "name": "FASTQC (1)", "process": "FASTQC",
+            "path": "aa/111111abc", "stdout": "", "stderr": "", "return_code": "",
+            "bash": "", "submitted": START, "started": None, "finished": None,
+            "status": "-", "cached": False, "io": None, **kwargs
+        }
+        return ProcessExecution(**kwargs)
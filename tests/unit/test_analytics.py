@@ -0,0 +1,221 @@
+import importlib.util
+from datetime import datetime, timedelta
+from unittest import TestCase, skipUnless
+from unittest.mock import Mock, patch
+from nextflow.analytics import *
+from nextflow.analytics import _get_numpy
+from .base import ModelTest, START
+
+class AnalyticsTest(ModelTest):
+
+    def make_timed_process_execution(self, process, submitted, queue, run, **kwargs):
+        submitted = START + timedelta(minutes=submitted)
+        started = submitted + timedelta(seconds=queue) if queue is not None else None
+        finished = started + timedelta(seconds=run) if started and run is not None else None
+        return self.make_process_execution(
+            process=process, submitted=submitted, started=started,
+            finished=finished, **kwargs
+        )
+
+
+    def make_task(self, identifier, path, queue, run, inputs=(), cached=False):
+        process_execution = self.make_timed_process_execution(
+            identifier, 0, queue, run, identifier=identifier, path=path,
+            cached=cached, staged_inputs=list(inputs)
+        )
+        process_execution.input_data = Mock(wraps=process_execution.input_data)
+        return process_execution
+
+
+
+class TimingsTests(AnalyticsTest):
+
+    def setUp(self):
+        self.execution = self.make_execution(process_executions=[
+            self.make_timed_process_execution("A", 0, 10, 100),
+            self.make_timed_process_execution("A", 5, 30, 50),
+            self.make_timed_process_execution("B", 12, 600, 20),
+            self.make_timed_process_execution("B", 13, 5, None),
+            self.make_timed_process_execution("B", 14, 5, 5, cached=True),
+        ])
+
+
+    def test_can_get_timings(self):
+        self.assertEqual(get_timings(self.execution), [
+            ("A", "", datetime(2025, 1, 1, 12), 10, 100),
+            ("A", "", datetime(2025, 1, 1, 12, 5), 30, 50),
+            ("B", "", datetime(2025, 1, 1, 12, 12), 600, 20),
+        ])
+
+
+    @patch("nextflow.analytics.get_executor")
+    def test_can_get_executors_once_per_process(self, mock_executor):
+        mock_executor.side_effect = ["slurm", "local", "slurm", "local"]
+        timings = get_timings([self.execution, self.execution], executors=True)
+        self.assertEqual([t[1] for t in timings], ["slurm"] * 2 + ["local"] + ["slurm"] * 2 + ["local"])
+        self.assertEqual(mock_executor.call_count, 4)
+
+
+
+class ExecutorTests(AnalyticsTest):
+
+    @patch("nextflow.analytics.get_file_text")
+    def test_can_get_executor_from_directives(self, mock_text):
+        process_execution = self.make_timed_process_execution("A", 0, 1, 1)
+        self.make_execution(process_executions=[process_execution])
+        for text, executor in (
+            ("#!/bin/bash\n#SBATCH -J nf-A\n#SBATCH -p short\nset -e", "slurm"),
+            ("#!/bin/bash\n### ---\n#PBS -N nf-A\n", "pbs"),
+            ("#!/bin/bash\n#$ -N nf-A\n", "sge"),
+            ("#!/bin/bash\n#BSUB -J nf-A\n", "lsf"),
+            ("#!/bin/bash\n### name: 'A'\nset -e\n#SBATCH not a directive", "local"),
+            ("", ""),
+        ):
+            mock_text.return_value = text
+            self.assertEqual(get_executor(process_execution), executor)
+        mock_text.assert_called_with("/ex/work/aa/111111abc/.command.run", None)
+
+
+    def test_no_executor_without_path(self):
+        self.assertEqual(get_executor(self.make_timed_process_execution("A", 0, 1, 1, path="")), "")
+
+
+
+class StatisticsTests(AnalyticsTest):
+
+    def setUp(self):
+        self.execution = self.make_execution(process_executions=[
+            self.make_timed_process_execution("A", 0, 10, 100),
+            self.make_timed_process_execution("A", 5, 30, 50),
+            self.make_timed_process_execution("A", 7, 20, 60),
+            self.make_timed_process_execution("B", 12, 600, 20),
+        ])
+
+
+    def test_can_get_statistics_by_process(self):
+        statistics = get_latency_statistics(self.execution, percentiles=(50, 90))
+        self.assertEqual(statistics["A"]["queue"], DurationStatistics(
+            count=3, mean=20, minimum=10, maximum=30, percentiles={50: 20, 90: 28}
+        ))
+        self.assertEqual(statistics["A"]["run"].percentiles, {50: 60, 90: 92})
+        self.assertEqual(statistics["B"]["queue"].count, 1)
+        self.assertEqual(statistics["B"]["queue"].percentiles, {50: 600, 90: 600})
+
+
+    @patch("nextflow.analytics.get_executor")
+    def test_can_get_statistics_by_executor(self, mock_executor):
+        mock_executor.side_effect = lambda pe: "slurm" if pe.process == "B" else "local"
+        statistics = get_latency_statistics(self.execution, by="executor")
+        self.assertEqual(set(statistics), {"slurm", "local"})
+        self.assertEqual(statistics["local"]["queue"].count, 3)
+
+
+    def test_can_get_statistics_of_everything(self):
+        statistics = get_latency_statistics([self.execution], by=None)
+        self.assertEqual(list(statistics), [None])
+        self.assertEqual(statistics[None]["queue"].maximum, 600)
+
+
+    def test_cannot_group_by_anything_else(self):
+        with self.assertRaises(ValueError):
+            get_latency_statistics(self.execution, by="status")
+
+
+    def test_can_get_histograms(self):
+        histograms = get_latency_histograms(self.execution, buckets=(10, 60, 300))
+        self.assertEqual(histograms["A"], {"queue": [1, 2, 0, 0], "run": [0, 2, 1, 0]})
+        self.assertEqual(histograms["B"], {"queue": [0, 0, 0, 1], "run": [0, 1, 0, 0]})
+
+
+    def test_can_get_timeline(self):
+        timeline = get_latency_timeline(self.execution, interval=timedelta(minutes=10))
+        self.assertEqual(list(timeline), [datetime(2025, 1, 1, 12), datetime(2025, 1, 1, 12, 10)])
+        self.assertEqual(timeline[datetime(2025, 1, 1, 12)]["queue"].count, 3)
+        self.assertEqual(timeline[datetime(2025, 1, 1, 12, 10)]["queue"].mean, 600)
+
+
+
+class DurationStatisticsTests(TestCase):
+
+    def test_can_handle_no_values(self):
+        self.assertEqual(get_duration_statistics([], (50,)), DurationStatistics(0, None, None, None, {50: None}))
+
+
+    def test_can_get_percentiles_without_numpy(self):
+        with patch("nextflow.analytics._get_numpy", return_value=None):
+            statistics = get_duration_statistics([4, 1, 3, 2], (0, 25, 50, 100))
+            self.assertEqual(get_histogram([0.5, 1, 2, 100], (1, 10)), [2, 1, 1])
+        self.assertEqual(statistics.percentiles, {0: 1, 25: 1.75, 50: 2.5, 100: 4})
+        self.assertEqual(statistics.mean, 2.5)
+
+
+    def test_numpy_is_imported_once(self):
+        _get_numpy.cache_clear()
+        with patch("builtins.__import__", side_effect=ImportError) as mock_import:
+            self.assertIsNone(_get_numpy())
+            self.assertIsNone(_get_numpy())
+        self.assertEqual(mock_import.call_count, 1)
+        _get_numpy.cache_clear()
+
+
+    @skipUnless(importlib.util.find_spec("numpy"), "NumPy is not installed")
+    def test_numpy_gives_same_results(self):
+        values = [i * 1.7 % 13 for i in range(101)]
+        with patch("nextflow.analytics._get_numpy", return_value=None):
+            python = get_duration_statistics(values), get_histogram(values, (1, 5, 10))
+        statistics, histogram = get_duration_statistics(values), get_histogram(values, (1, 5, 10))
+        self.assertEqual(histogram, python[1])
+        for p in PERCENTILES:
+            self.assertAlmostEqual(statistics.percentiles[p], python[0].percentiles[p])
+        self.assertAlmostEqual(statistics.mean, python[0].mean)
+
+
+
+class CriticalPathTests(AnalyticsTest):
+
+    def setUp(self):
+        a, b, c = "aa/" + "1" * 30, "bb/" + "2" * 30, "cc/" + "3" * 30
+        self.execution = self.make_execution(process_executions=[
+            self.make_task("aa/111111", a, 5, 10, ["/data/reads.fq"]),
+            self.make_task("bb/222222", b, 1, 100, [f"/ex/work/{a}/out.bam"]),
+            self.make_task("cc/333333", c, 500, 5, [f"/ex/work/{a}/out.bam", f"/ex/work/{a}/out.bai"]),
+            self.make_task("dd/444444", "dd/" + "4" * 30, 1, 1, [f"/ex/work/{b}/x", f"/ex/work/{c}/y"]),
+            self.make_task("ee/555555", "ee/" + "5" * 30, 1, 50, [f"/ex/work/{c}/z"], cached=True),
+        ])
+
+
+    def test_can_get_task_dependencies(self):
+        self.assertEqual(get_task_dependencies(self.execution), {
+            "aa/111111": [], "bb/222222": ["aa/111111"],
+            "cc/333333": ["aa/111111"], "dd/444444": ["bb/222222", "cc/333333"],
+            "ee/555555": ["cc/333333"],
+        })
+
+
+    def test_can_get_critical_path(self):
+        path = get_critical_path(self.execution)
+        self.assertEqual([p.identifier for p in path], ["aa/111111", "bb/222222", "dd/444444"])
+
+
+    def test_can_include_queue_time(self):
+        path = get_critical_path(self.execution, include_queue=True)
+        self.assertEqual([p.identifier for p in path], ["aa/111111", "cc/333333", "dd/444444"])
+
+
+    def test_can_use_known_dependencies(self):
+        path = get_critical_path(self.execution, {"cc/333333": ["bb/222222"], "zz/999999": ["cc/333333"]})
+        self.assertEqual([p.identifier for p in path], ["bb/222222", "cc/333333"])
+        for process_execution in self.execution.process_executions:
+            self.assertFalse(process_execution.input_data.called)
+
+
+    def test_can_handle_no_process_executions(self):
+        self.assertEqual(get_critical_path(self.make_execution(process_executions=[])), [])
+
+
+    def test_task_weights(self):
+        task = self.make_task("aa/111111", "", 5, 10)
+        self.assertEqual(get_task_weight(task), 10)
+        self.assertEqual(get_task_weight(task, include_queue=True), 15)
+        self.assertEqual(get_task_weight(self.make_task("aa/111111", "", 5, None)), 0)
+        self.assertEqual(get_task_weight(self.make_task("aa/111111", "", 5, 10, cached=True)), 0)
@@ -0,0 +1,80 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from nextflow.clean import *
+
+class CleanExecutionTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.work = os.path.join(self.directory.name, "work")
+        self.process_executions = []
+        for identifier, status, size in (
+            ("aa/111", "COMPLETED", 10), ("bb/222", "FAILED", 20),
+            ("cc/333", "COMPLETED", 30), ("dd/444", "-", 40)
+        ):
+            path = os.path.join(self.work, identifier)
+            os.makedirs(os.path.join(path, "sub"))
+            with open(os.path.join(path, "out.txt"), "w") as f: f.write("x" * size)
+            with open(os.path.join(path, "sub", "x.txt"), "w") as f: f.write("y")
+            os.symlink("/nonexistent", os.path.join(path, "link"))
+            self.process_executions.append(Mock(status=status, full_path=path))
+        self.execution = Mock(process_executions=self.process_executions)
+    
+
+    def tearDown(self):
+        self.directory.cleanup()
+    
+
+    def test_can_clean_finished_process_executions(self):
+        freed = clean_execution(self.execution, threads=2)
+        self.assertEqual(freed, 11 + 21 + 31 + 3 * len("/nonexistent"))
+        self.assertEqual(sorted(os.listdir(self.work)), ["aa", "bb", "cc", "dd"])
+        self.assertEqual(os.listdir(os.path.join(self.work, "aa")), [])
+        self.assertEqual(os.listdir(os.path.join(self.work, "dd")), ["444"])
+    
+
+    def test_can_keep_statuses(self):
+        freed = clean_execution(self.execution, keep=("FAILED",))
+        self.assertEqual(freed, 11 + 31 + 2 * len("/nonexistent"))
+        self.assertEqual(os.listdir(os.path.join(self.work, "bb")), ["222"])
+    
+
+    def test_can_keep_published_outputs(self):
+        published = os.path.join(self.directory.name, "results")
+        os.mkdir(published)
+        os.symlink(
+            os.path.join(self.work, "cc", "333", "sub", "x.txt"),
+            os.path.join(published, "x.txt")
+        )
+        freed = clean_execution(self.execution, published_path=published)
+        self.assertEqual(freed, 11 + 21 + 2 * len("/nonexistent"))
+        self.assertEqual(os.listdir(os.path.join(self.work, "cc")), ["333"])
+        self.assertEqual(os.listdir(os.path.join(self.work, "aa")), [])
+    
+
+    def test_can_handle_missing_paths(self):
+        self.process_executions[0].full_path = None
+        self.process_executions[1].full_path = os.path.join(self.work, "xx", "000")
+        freed = clean_execution(self.execution)
+        self.assertEqual(freed, 31 + len("/nonexistent"))
+
+
+
+class DirectorySizeTests(TestCase):
+
+    def test_can_handle_missing_directory(self):
+        self.assertEqual(get_directory_size("/nonexistent/directory"), 0)
+        self.assertEqual(remove_directory("/nonexistent/directory"), 0)
+    
+
+    def test_can_handle_partial_removal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "task", "locked"))
+            for name, size in (("out.txt", 10), ("locked/x.txt", 3)):
+                with open(os.path.join(directory, "task", name), "w") as f: f.write("x" * size)
+            with patch("shutil.rmtree", side_effect=lambda path, ignore_errors: os.remove(
+                os.path.join(path, "out.txt")
+            )):
+                self.assertEqual(remove_directory(os.path.join(directory, "task")), 10)
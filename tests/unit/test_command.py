@@ -1,3 +1,5 @@
+import json
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch, Mock, MagicMock, call
 from nextflow.command import *
@@ -16,16 +18,17 @@ class RunTests(TestCase):
         mock_ex.return_value = execution, 20
         executions = list(_run("main.nf"))
         mock_sleep.assert_called_with(1)
-        mock_ex.assert_called_with(submission.output_path, submission.log_path, submission.nextflow_command, None, 0, None, None)
+        mock_ex.assert_called_with(submission.output_path, submission.log_path, submission.nextflow_command, None, 0, None, None, None)
         self.assertEqual(executions, [execution])
     
 
     @patch("nextflow.command.submit_execution")
     @patch("time.sleep")
     @patch("nextflow.command.get_execution")
+    @patch("nextflow.command.update_process_executions_from_trace")
     @freeze_time("2025-01-01")
-    def test_can_run_with_custom_values(self, mock_ex, mock_sleep, mock_submit):
-        submission = Mock()
+    def test_can_run_with_custom_values(self, mock_trace, mock_ex, mock_sleep, mock_submit):
+        submission = Mock(output_path="/out")
         mock_submit.return_value = submission
         mock_executions = [Mock(return_code=""), Mock(return_code="0")]
         mock_ex.side_effect = [[None, 0], [mock_executions[0], 40], [mock_executions[1], 20]]
@@ -34,12 +37,14 @@ class RunTests(TestCase):
             "main.nf", run_path="/exdir", output_path="/out", log_path="/log", resume="a_b",
             version="21.10", java_home="/java", configs=["conf1"],
             params={"param": "2"}, profiles=["docker"], timezone="UTC", report="report.html",
-            timeline="time.html", dag="dag.html", trace="trace.html", sleep=4, io=io
+            timeline="time.html", dag="dag.html", trace="trace.html", sleep=4, io=io,
+            on_phase=print
         ))
         mock_sleep.assert_called_with(4)
         self.assertEqual(mock_sleep.call_count, 3)
-        mock_ex.assert_called_with(submission.output_path, submission.log_path, submission.nextflow_command, mock_executions[0], 40, "UTC", io)
+        mock_ex.assert_called_with(submission.output_path, submission.log_path, submission.nextflow_command, mock_executions[0], 40, "UTC", io, print)
         self.assertEqual(mock_ex.call_count, 3)
+        mock_trace.assert_called_with(mock_executions[1].process_executions, os.path.join("/out", "trace.html"), mock_trace.return_value, {}, io)
         self.assertEqual(executions, [mock_executions[1]])
 
 
@@ -54,11 +59,127 @@ class RunTests(TestCase):
         executions = list(_run("main.nf", poll=True, output_path="/out"))
         mock_sleep.assert_called_with(1)
         self.assertEqual(mock_sleep.call_count, 3)
-        mock_ex.assert_called_with(submission.output_path, submission.log_path, submission.nextflow_command, mock_executions[0], 60, None, None)
+        mock_ex.assert_called_with(submission.output_path, submission.log_path, submission.nextflow_command, mock_executions[0], 60, None, None, None)
         self.assertEqual(mock_ex.call_count, 3)
         self.assertEqual(executions, mock_executions)
     
 
+    @patch("nextflow.command.submit_execution")
+    @patch("time.sleep")
+    @patch("nextflow.command.get_execution")
+    @patch("nextflow.progress.get_expected_process_names")
+    @patch("nextflow.progress.get_progress")
+    def test_can_run_and_poll_with_progress(self, mock_progress, mock_names, mock_ex, mock_sleep, mock_submit):
+        submission = Mock()
+        mock_submit.return_value = submission
+        mock_executions = [Mock(finished=False), Mock(finished=True)]
+        mock_ex.side_effect = [[None, 20], [mock_executions[0], 40], [mock_executions[1], 20]]
+        mock_progress.side_effect = ["p1", "p2"]
+        executions = list(_run("main.nf", poll=True, progress=True, durations={"A": 1}))
+        self.assertEqual(executions, mock_executions)
+        mock_names.assert_called_once_with("main.nf", submission.run_path)
+        self.assertEqual(mock_progress.call_args_list, [
+            call(mock_executions[0], mock_names.return_value, {"A": 1}),
+            call(mock_executions[1], mock_names.return_value, {"A": 1}),
+        ])
+        self.assertEqual(mock_executions[0].progress, "p1")
+        self.assertEqual(mock_executions[1].progress, "p2")
+    
+
+    @patch("nextflow.command.submit_execution")
+    @patch("time.sleep")
+    @patch("nextflow.command.get_execution")
+    @patch("nextflow.command.update_process_executions_from_trace")
+    def test_can_run_and_poll_with_trace(self, mock_trace, mock_ex, mock_sleep, mock_submit):
+        submission = Mock(output_path="/out")
+        mock_submit.return_value = submission
+        mock_executions = [Mock(finished=False), Mock(finished=True)]
+        mock_ex.side_effect = [[None, 20], [mock_executions[0], 40], [mock_executions[1], 20]]
+        mock_trace.side_effect = [100, 150]
+        executions = list(_run("main.nf", poll=True, trace="trace.txt"))
+        self.assertEqual(executions, mock_executions)
+        self.assertEqual(mock_trace.call_args_list, [
+            call(mock_executions[0].process_executions, os.path.join("/out", "trace.txt"), 0, {}, None),
+            call(mock_executions[1].process_executions, os.path.join("/out", "trace.txt"), 100, {}, None),
+        ])
+    
+
+    @patch("nextflow.command.submit_execution")
+    @patch("time.sleep")
+    @patch("nextflow.command.get_execution")
+    @patch("nextflow.command.update_process_executions_from_trace")
+    def test_can_run_and_poll_with_trace_through_io(self, mock_trace, mock_ex, mock_sleep, mock_submit):
+        submission = Mock(output_path="/out")
+        mock_submit.return_value = submission
+        execution, io = Mock(finished=True), Mock()
+        mock_ex.side_effect = [[execution, 20]]
+        mock_trace.return_value = 100
+        self.assertEqual(list(_run("main.nf", poll=True, trace="trace.txt", io=io)), [execution])
+        mock_trace.assert_called_once_with(
+            execution.process_executions, os.path.join("/out", "trace.txt"), 0, {}, io
+        )
+    
+
+    @patch("nextflow.command.submit_execution")
+    @patch("time.sleep")
+    @patch("nextflow.command.get_execution")
+    def test_can_run_and_poll_with_store(self, mock_ex, mock_sleep, mock_submit):
+        mock_executions = [Mock(finished=False), Mock(finished=True)]
+        mock_ex.side_effect = [[None, 20], [mock_executions[0], 40], [mock_executions[1], 20]]
+        store = Mock()
+        executions = list(_run("main.nf", poll=True, store=store))
+        self.assertEqual(executions, mock_executions)
+        self.assertEqual(store.save.call_args_list, [call(mock_executions[0]), call(mock_executions[1])])
+    
+
+    @patch("nextflow.command.submit_execution")
+    @patch("time.sleep")
+    @patch("time.perf_counter")
+    @patch("nextflow.command.get_execution")
+    def test_can_run_and_poll_with_metrics_and_spans(self, mock_ex, mock_time, mock_sleep, mock_submit):
+        mock_executions = [Mock(finished=False), Mock(finished=True)]
+        mock_ex.side_effect = [[None, 0], [mock_executions[0], 40], [mock_executions[1], 20]]
+        mock_time.side_effect = [1, 1.5, 2, 2.25, 3, 3.5]
+        metrics, spans = Mock(), Mock()
+        executions = list(_run("main.nf", poll=True, metrics=metrics, spans=spans))
+        self.assertEqual(executions, mock_executions)
+        self.assertEqual(metrics.update.call_args_list, [
+            call(None, 0.5, 0), call(mock_executions[0], 0.25, 40),
+            call(mock_executions[1], 0.5, 60)
+        ])
+        self.assertEqual(spans.update.call_args_list, [call(mock_executions[0]), call(mock_executions[1])])
+    
+
+    @patch("nextflow.weblog.WeblogReceiver")
+    @patch("nextflow.command.submit_execution")
+    @patch("nextflow.command.poll_weblog")
+    @patch("nextflow.command.get_execution")
+    def test_can_run_and_poll_with_push(self, mock_ex, mock_poll, mock_submit, mock_receiver):
+        receiver = mock_receiver.return_value
+        receiver.url = "http://127.0.0.1:8000"
+        mock_poll.return_value = iter(["ex1", "ex2"])
+        store, metrics, spans = Mock(), Mock(), Mock()
+        executions = list(_run("main.nf", poll=True, push=True, sleep=2, timezone="UTC", store=store, metrics=metrics, spans=spans))
+        self.assertEqual(executions, ["ex1", "ex2"])
+        self.assertEqual(store.save.call_args_list, [call("ex1"), call("ex2")])
+        self.assertEqual(metrics.update.call_args_list, [call("ex1", active=True), call("ex2", active=True)])
+        self.assertEqual(spans.update.call_args_list, [call("ex1"), call("ex2")])
+        receiver.start.assert_called_with()
+        receiver.stop.assert_called_with()
+        self.assertEqual(mock_submit.call_args[1]["weblog"], "http://127.0.0.1:8000")
+        mock_poll.assert_called_with(receiver, mock_submit.return_value, True, 2, "UTC", None)
+        self.assertFalse(mock_ex.called)
+    
+
+    @patch("nextflow.weblog.WeblogReceiver")
+    @patch("nextflow.command.submit_execution")
+    def test_push_receiver_stopped_on_error(self, mock_submit, mock_receiver):
+        mock_submit.side_effect = NextflowNotInstalledError
+        with self.assertRaises(NextflowNotInstalledError):
+            list(_run("main.nf", push=True))
+        mock_receiver.return_value.stop.assert_called_with()
+    
+
     @patch("nextflow.command._run")
     def test_can_run_without_poll(self, mock_run):
         mock_run.return_value = [Mock(finished=True)]
@@ -76,15 +197,67 @@ class RunTests(TestCase):
 
 
 
+class PollWeblogTests(TestCase):
+
+    def setUp(self):
+        self.submission = Mock(output_path="/out", log_path="/log", nextflow_command="nf")
+        self.receiver = Mock()
+    
+
+    @patch("time.sleep")
+    @patch("nextflow.command.make_or_update_execution")
+    @patch("nextflow.command.get_file_text")
+    @patch("nextflow.weblog.apply_weblog_events")
+    @patch("nextflow.weblog.copy_weblog_metrics")
+    @patch("nextflow.command.get_execution")
+    def test_can_poll_weblog(self, mock_ex, mock_copy, mock_apply, mock_text, mock_make, mock_sleep):
+        execution = mock_make.return_value
+        execution.finished, execution.return_code = None, ""
+        self.receiver.get_events.side_effect = [[{"event": "a"}], [], [{"event": "b"}]]
+        mock_text.side_effect = ["", "", "0\n"]
+        final = Mock(return_code="0", finished="now")
+        mock_ex.return_value = (final, 100)
+        executions = list(poll_weblog(self.receiver, self.submission, True, 3, "UTC"))
+        self.assertEqual(executions, [execution, final])
+        mock_make.assert_called_with("", "/out", "nf", None, None)
+        mock_sleep.assert_called_with(3)
+        self.assertEqual(mock_sleep.call_count, 3)
+        self.assertEqual(mock_apply.call_args_list, [
+            call(execution, [{"event": "a"}], "UTC"), call(execution, [{"event": "b"}], "UTC")
+        ])
+        mock_text.assert_called_with(os.path.join("/out", "rc.txt"), None)
+        mock_ex.assert_called_once_with("/out", "/log", "nf", None, 0, "UTC", None)
+        mock_copy.assert_called_with(execution, final)
+    
+
+    @patch("time.sleep")
+    @patch("nextflow.command.make_or_update_execution")
+    @patch("nextflow.command.get_file_text")
+    @patch("nextflow.weblog.apply_weblog_events")
+    @patch("nextflow.command.get_execution")
+    def test_can_finish_from_weblog_without_log(self, mock_ex, mock_apply, mock_text, mock_make, mock_sleep):
+        execution = mock_make.return_value
+        execution.finished, execution.return_code = "now", "1"
+        self.receiver.get_events.return_value = [{"event": "completed"}]
+        mock_text.return_value = ""
+        mock_ex.return_value = (None, 0)
+        executions = list(poll_weblog(self.receiver, self.submission, False, 1))
+        self.assertEqual(executions, [execution])
+        self.assertEqual(execution.return_code, "1")
+
+
+
 class SubmitTests(TestCase):
 
     @patch("os.path.abspath")
     @patch("nextflow.command.make_nextflow_command")
+    @patch("nextflow.command.check_nextflow_installed")
     @patch("subprocess.Popen")
-    def test_can_submit_with_default_values(self, mock_run, mock_nc, mock_abs):
+    def test_can_submit_with_default_values(self, mock_run, mock_check, mock_nc, mock_abs):
         mock_abs.side_effect = ["/run", "/out", "/log"]
         submission = submit_execution("main.nf")
-        mock_nc.assert_called_with("/run", "/run", "/run", "main.nf", False, None, None, None, None, None, None, None, None, None, None, None)
+        mock_check.assert_called_with()
+        mock_nc.assert_called_with("/run", "/run", "/run", "main.nf", False, None, None, None, None, None, None, None, None, None, None, None, False, None)
         mock_abs.assert_called_once_with(".")
         mock_run.assert_called_with(
             mock_nc.return_value,
@@ -99,17 +272,18 @@ class SubmitTests(TestCase):
     
 
     @patch("nextflow.command.make_nextflow_command")
+    @patch("nextflow.command.check_nextflow_installed")
     @patch("subprocess.Popen")
     @patch("nextflow.command.wait_for_log_creation")
     @freeze_time("2025-01-01")
-    def test_can_submit_with_custom_values(self, mock_wait, mock_run, mock_nc):
+    def test_can_submit_with_custom_values(self, mock_wait, mock_run, mock_check, mock_nc):
         io = Mock()
         submission = submit_execution(
             "main.nf", run_path="/exdir", output_path="/out", log_path="/log", resume="a_b", version="21.10", configs=["conf1"],
             params={"param": "2"}, profiles=["docker"], timezone="UTC", report="report.html", java_home="/java",
             timeline="time.html", dag="dag.html", trace="trace.html", io=io
         )
-        mock_nc.assert_called_with("/exdir", "/out", "/log", "main.nf", "a_b", "21.10", "/java", ["conf1"], {"param": "2"}, ["docker"], "UTC", "report.html", "time.html", "dag.html", "trace.html", io)
+        mock_nc.assert_called_with("/exdir", "/out", "/log", "main.nf", "a_b", "21.10", "/java", ["conf1"], {"param": "2"}, ["docker"], "UTC", "report.html", "time.html", "dag.html", "trace.html", io, False, None)
         mock_run.assert_called_with(
             mock_nc.return_value,
             universal_newlines=True, shell=True
@@ -123,12 +297,28 @@ class SubmitTests(TestCase):
         self.assertEqual(submission.timezone, "UTC")
     
 
+    @patch("nextflow.command.write_params_file")
+    @patch("nextflow.command.make_nextflow_command")
+    @patch("nextflow.command.check_nextflow_installed")
+    @patch("subprocess.Popen")
+    def test_can_submit_with_params_file(self, mock_run, mock_check, mock_nc, mock_write):
+        io = Mock()
+        submit_execution("main.nf", run_path="/exdir", params={"s": [1]}, io=io)
+        mock_write.assert_called_with({"s": [1]}, "/exdir", io)
+        self.assertIs(mock_nc.call_args[0][16], True)
+        mock_write.reset_mock()
+        submit_execution("main.nf", run_path="/exdir", params={"s": None}, io=io)
+        self.assertFalse(mock_write.called)
+        self.assertIs(mock_nc.call_args[0][16], False)
+
+
     @patch("nextflow.command.make_nextflow_command")
+    @patch("nextflow.command.check_nextflow_installed")
     @patch("subprocess.Popen")
-    def test_can_submit_with_custom_io(self, mock_run, mock_nc):
+    def test_can_submit_with_custom_io(self, mock_run, mock_check, mock_nc):
         io = Mock()
         submission = submit_execution("main.nf", io=io)
-        mock_nc.assert_called_with(io.abspath.return_value, io.abspath.return_value, io.abspath.return_value, "main.nf", False, None, None, None, None, None, None, None, None, None, None, io)
+        mock_nc.assert_called_with(io.abspath.return_value, io.abspath.return_value, io.abspath.return_value, "main.nf", False, None, None, None, None, None, None, None, None, None, None, io, False, None)
         io.abspath.assert_called_once_with(".")
         mock_run.assert_called_with(
             mock_nc.return_value,
@@ -146,7 +336,7 @@ class SubmitTests(TestCase):
     def test_can_run_with_custom_runner(self, mock_nc):
         runner = MagicMock()
         submission = submit_execution("main.nf", runner=runner)
-        mock_nc.assert_called_with(os.path.abspath("."), os.path.abspath("."), os.path.abspath("."), "main.nf", False, None, None, None, None, None, None, None, None, None, None, None)
+        mock_nc.assert_called_with(os.path.abspath("."), os.path.abspath("."), os.path.abspath("."), "main.nf", False, None, None, None, None, None, None, None, None, None, None, None, False, None)
         runner.assert_called_with(mock_nc.return_value)
         self.assertEqual(submission.pipeline_path, "main.nf")
         self.assertEqual(submission.run_path, os.path.abspath("."))
@@ -157,6 +347,42 @@ class SubmitTests(TestCase):
 
 
 
+class NextflowInstalledTests(TestCase):
+
+    def setUp(self):
+        clear_nextflow_path_cache()
+    
+
+    def tearDown(self):
+        clear_nextflow_path_cache()
+    
+
+    @patch("nextflow.command.which")
+    def test_can_find_nextflow_once(self, mock_which):
+        mock_which.return_value = "/bin/nextflow"
+        check_nextflow_installed()
+        check_nextflow_installed()
+        mock_which.assert_called_once_with("nextflow")
+    
+
+    @patch("nextflow.command.which")
+    def test_can_raise_error_if_no_nextflow(self, mock_which):
+        mock_which.return_value = None
+        with self.assertRaises(NextflowNotInstalledError):
+            check_nextflow_installed()
+    
+
+    @patch("nextflow.command.which")
+    def test_missing_nextflow_is_searched_for_again(self, mock_which):
+        mock_which.side_effect = [None, "/bin/nextflow", "/bin/other"]
+        self.assertIsNone(get_nextflow_path())
+        self.assertEqual(get_nextflow_path(), "/bin/nextflow")
+        self.assertEqual(get_nextflow_path(), "/bin/nextflow")
+        clear_nextflow_path_cache()
+        self.assertEqual(get_nextflow_path(), "/bin/other")
+
+
+
 class NextflowCommandTests(TestCase):
 
     @patch("nextflow.command.make_nextflow_command_env_string")
@@ -236,6 +462,46 @@ class NextflowCommandTests(TestCase):
         mock_prof.assert_called_with(["docker"])
         mock_report.assert_called_with("/exdir", None, None, None, None)
         self.assertEqual(command, "nextflow -Duser.country=US run main.nf >stdout.txt 2>stderr.txt; echo $? >rc.txt")
+    
+
+    @patch("os.path.abspath")
+    def test_can_add_weblog_url(self, mock_abspath):
+        mock_abspath.return_value = "/exdir"
+        command = make_nextflow_command("/exdir", "/exdir", "/exdir", "main.nf", False, None, None, None, None, None, None, None, None, None, "trace.txt", None, None, "http://127.0.0.1:8000")
+        self.assertEqual(command, "NXF_ANSI_LOG=false nextflow -Duser.country=US run main.nf   -with-trace /exdir/trace.txt -with-weblog http://127.0.0.1:8000 >stdout.txt 2>stderr.txt; echo $? >rc.txt")
+    
+
+    @patch("nextflow.command.make_nextflow_command_params_file_string")
+    @patch("os.path.abspath")
+    def test_can_use_params_file_for_nested_params(self, mock_abspath, mock_file):
+        mock_abspath.return_value = "/exdir"
+        mock_file.return_value = "-params-file '/exdir/.nextflow.params.json'"
+        params = {"param": "2", "samples": [{"id": "s1"}]}
+        command = make_nextflow_command("/exdir", "/exdir", "/exdir", "main.nf", False, None, None, None, params, None, None, None, None, None, None, None)
+        mock_file.assert_called_with("/exdir")
+        self.assertEqual(command, "NXF_ANSI_LOG=false nextflow -Duser.country=US run main.nf -params-file '/exdir/.nextflow.params.json' >stdout.txt 2>stderr.txt; echo $? >rc.txt")
+    
+
+    @patch("nextflow.command.make_nextflow_command_params_file_string")
+    @patch("os.path.abspath")
+    def test_can_use_params_file_for_large_params(self, mock_abspath, mock_file):
+        mock_abspath.return_value = "/exdir"
+        params = {f"param{i}": "x" * 100 for i in range(200)}
+        make_nextflow_command("/exdir", "/out", "/exdir", "main.nf", False, None, None, None, params, None, None, None, None, None, None, None)
+        mock_file.assert_called_with("/out")
+    
+
+    @patch("nextflow.command.make_nextflow_command_params_file_string")
+    @patch("os.path.abspath")
+    def test_can_choose_whether_to_use_params_file(self, mock_abspath, mock_file):
+        mock_abspath.return_value = "/exdir"
+        mock_file.return_value = "-params-file '/exdir/.nextflow.params.json'"
+        command = make_nextflow_command("/exdir", "/exdir", "/exdir", "main.nf", False, None, None, None, {"param": "2"}, None, None, None, None, None, None, None, True)
+        self.assertIn("run main.nf -params-file '/exdir/.nextflow.params.json' ", command)
+        mock_file.reset_mock()
+        command = make_nextflow_command("/exdir", "/exdir", "/exdir", "main.nf", False, None, None, None, {"p": [1, 2]}, None, None, None, None, None, None, None, False)
+        self.assertFalse(mock_file.called)
+        self.assertIn("run main.nf --p='[1, 2]' ", command)
 
 
 
@@ -315,14 +581,63 @@ class ParamsStringTests(TestCase):
     )
         
 
+    def test_can_handle_params_with_other_types(self):
+        self.assertEqual(make_nextflow_command_params_string(
+            {"param": 2, "param2": {"a": [1]}}
+        ), "--param='2' --param2='{\"a\": [1]}'"
+    )
+    
+
     def test_can_handle_params_with_empty_values(self):
         self.assertEqual(make_nextflow_command_params_string(
-            {"param": "2", "param2": "",}
-        ), "--param='2' --param2="
+            {"param": "2", "param2": "", "param3": None, "param4": 0, "param5": False}
+        ), "--param='2' --param2= --param3= --param4= --param5="
     )
 
 
 
+class ParamsFileTests(TestCase):
+
+    def test_can_decide_whether_to_use_params_file(self):
+        self.assertFalse(use_params_file(None))
+        self.assertFalse(use_params_file({}, True))
+        self.assertFalse(use_params_file({"a": "1", "b": None, "c": 0, "d": False, "e": ""}))
+        self.assertTrue(use_params_file({"a": "1", "b": [1]}))
+        self.assertTrue(use_params_file({"a": 5}))
+        self.assertTrue(use_params_file({"a": "x" * (PARAMS_FILE_THRESHOLD + 1)}))
+        self.assertTrue(use_params_file({"a": None}, True))
+        self.assertFalse(use_params_file({"a": [1]}, False))
+
+
+    def test_can_write_params_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_params_file(
+                {"param": "2", "param2": "'3'", "param3": '"7"', "param4": "",
+                "samples": [{"id": "s1", "reads": ["a.fq", "b.fq"]}], "n": 5},
+                directory
+            )
+            self.assertEqual(path, os.path.join(directory, ".nextflow.params.json"))
+            with open(path) as f:
+                self.assertEqual(json.load(f), {
+                    "param": "2", "param2": "3", "param3": "7", "param4": "",
+                    "samples": [{"id": "s1", "reads": ["a.fq", "b.fq"]}], "n": 5
+                })
+    
+
+    def test_can_use_custom_io(self):
+        io = Mock()
+        self.assertEqual(write_params_file({"param": "2"}, "/out", io), "/out/.nextflow.params.json")
+        io.write.assert_called_with("/out/.nextflow.params.json", '{"param": "2"}')
+
+
+    def test_can_get_params_file_string(self):
+        self.assertEqual(
+            make_nextflow_command_params_file_string("/out"),
+            "-params-file '/out/.nextflow.params.json'"
+        )
+
+
+
 class ProfilesStringTests(TestCase):
 
     def test_can_handle_no_profiles(self):
@@ -469,6 +784,27 @@ class GetExecutionTests(TestCase):
         ])
     
 
+    @patch("nextflow.command.get_file_text")
+    @patch("nextflow.command.make_or_update_execution")
+    @patch("nextflow.command.get_initial_process_executions")
+    @patch("nextflow.command.get_process_ids_to_paths")
+    @patch("nextflow.command.update_process_execution_from_path")
+    @patch("time.perf_counter")
+    def test_can_profile_phases(self, mock_time, mock_update, mock_paths, mock_init, mock_make, mock_text):
+        mock_time.side_effect = [1, 1.5, 1.75, 2.25, 2.5, 4.5, 5, 5.25, 5.5, 8.25, 8.5]
+        mock_text.return_value = "LOG"
+        mock_init.return_value = ({"aa/bb": Mock(path="/ex/aa/bb", finished=None)}, [])
+        mock_paths.return_value = {}
+        on_phase = Mock()
+        get_execution("/ex", "/log", "nf run", on_phase=on_phase)
+        self.assertEqual(on_phase.call_args_list, [
+            call("read_log", 0.5), call("make_or_update_execution", 0.5),
+            call("get_initial_process_executions", 2),
+            call("get_process_ids_to_paths", 0.25),
+            call("update_process_execution_from_path", 2.75),
+        ])
+    
+
     @patch("nextflow.command.get_file_text")
     def test_can_handle_no_log_yet(self, mock_text):
         mock_text.return_value = ""
@@ -479,6 +815,104 @@ class GetExecutionTests(TestCase):
 
 
 
+class LoadExecutionTests(TestCase):
+
+    @patch("nextflow.command.get_log_ends")
+    @patch("nextflow.command.make_or_update_execution")
+    @patch("nextflow.command.get_finished_from_log")
+    @patch("nextflow.command.get_process_executions_from_log_file")
+    @patch("nextflow.command.get_process_ids_to_paths")
+    @patch("nextflow.command.update_process_execution_from_path")
+    def test_can_load_execution(self, mock_update, mock_paths, mock_parse, mock_finished, mock_make, mock_ends):
+        mock_ends.return_value = ("HEAD", "TAIL")
+        mock_execution = Mock(finished=None)
+        mock_make.return_value = mock_execution
+        process_executions = {
+            "aa/bb": Mock(identifier="aa/bb", path=""),
+            "cc/dd": Mock(identifier="cc/dd", path=""),
+        }
+        mock_parse.return_value = process_executions
+        mock_paths.return_value = {"cc/dd": "/ex/cc/dd"}
+        execution = load_execution("/ex", "/log", "nf run", timezone="UTC", processes=4)
+        self.assertEqual(execution, mock_execution)
+        log_path = os.path.join("/log", ".nextflow.log")
+        mock_ends.assert_called_with(log_path)
+        mock_make.assert_called_with("HEAD", "/ex", "nf run", None, None)
+        mock_finished.assert_called_with("TAIL")
+        self.assertEqual(execution.finished, mock_finished.return_value)
+        self.assertEqual(execution.log, "TAIL")
+        mock_parse.assert_called_with(log_path, mock_execution, 4)
+        mock_paths.assert_called_with(["aa/bb", "cc/dd"], "/ex")
+        self.assertEqual(process_executions["cc/dd"].path, "/ex/cc/dd")
+        self.assertEqual([c[0] for c in mock_update.call_args_list], [
+            (process_executions["aa/bb"], "/ex", "UTC"),
+            (process_executions["cc/dd"], "/ex", "UTC"),
+        ])
+        self.assertEqual(execution.process_executions, list(process_executions.values()))
+    
+
+    @patch("nextflow.command.get_log_ends")
+    def test_can_handle_no_log(self, mock_ends):
+        mock_ends.return_value = ("", "")
+        self.assertIsNone(load_execution("/ex"))
+        mock_ends.assert_called_with(os.path.join("/ex", ".nextflow.log"))
+
+
+
+class ProcessExecutionsFromLogFileTests(TestCase):
+
+    def test_can_parse_log_file_in_chunks(self):
+        lines = [
+            "Jun-01 16:45:55.000 [main] DEBUG nextflow.cli.Launcher - $> nextflow run main.nf",
+            "Jun-01 16:45:57.048 [Task submitter] INFO  nextflow.Session - [d6/31d530] Submitted process > SPLIT (file.csv)",
+            "Feb-26 20:52:39.165 [Actor Thread 9] INFO  nextflow.processor.TaskProcessor - [29/af9070] Cached process > LOWER",
+            *["Jun-01 16:45:58.000 [main] DEBUG nextflow.Session - padding"] * 20,
+            "Jun-01 16:46:00.365 [Task monitor] DEBUG n.processor.TaskPollingMonitor - Task completed > TaskHandler[id: 1; name: SPLIT (file.csv); status: COMPLETED; exit: 1; error: -; workDir: /work/d6/31d530a65ef23d1cb302940a782909]",
+            "Jun-01 16:46:00.365 [Task monitor] DEBUG n.processor.TaskPollingMonitor - Task completed > TaskHandler[id: 9; name: OTHER; status: COMPLETED; exit: 0; error: -; workDir: /work/ff/31d530a65ef23d1cb302940a782909]",
+        ]
+        execution = Mock()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, ".nextflow.log")
+            with open(path, "w") as f: f.write("\n".join(lines) + "\n")
+            process_executions = get_process_executions_from_log_file(path, execution, processes=3)
+        self.assertEqual(list(process_executions), ["d6/31d530", "29/af9070"])
+        submitted = process_executions["d6/31d530"]
+        self.assertEqual(submitted.name, "SPLIT (file.csv)")
+        self.assertEqual(submitted.process, "SPLIT")
+        self.assertEqual(submitted.submitted, datetime(datetime.now().year, 6, 1, 16, 45, 57, 48000))
+        self.assertEqual(submitted.finished, datetime(datetime.now().year, 6, 1, 16, 46, 0, 365000))
+        self.assertEqual(submitted.return_code, "1")
+        self.assertEqual(submitted.status, "FAILED")
+        self.assertFalse(submitted.cached)
+        self.assertIs(submitted.execution, execution)
+        cached = process_executions["29/af9070"]
+        self.assertEqual(cached.process, "LOWER")
+        self.assertIsNone(cached.submitted)
+        self.assertEqual(cached.return_code, "0")
+        self.assertEqual(cached.status, "COMPLETED")
+        self.assertTrue(cached.cached)
+
+
+    @patch("concurrent.futures.ProcessPoolExecutor")
+    def test_can_parse_log_file_in_this_process(self, mock_executor):
+        lines = [
+            "Jun-01 16:45:55.000 [main] DEBUG nextflow.cli.Launcher - $> nextflow run main.nf",
+            "Jun-01 16:45:57.048 [Task submitter] INFO  nextflow.Session - [d6/31d530] Submitted process > SPLIT (file.csv)",
+            "Jun-01 16:46:00.365 [Task monitor] DEBUG n.processor.TaskPollingMonitor - Task completed > TaskHandler[id: 1; name: SPLIT (file.csv); status: COMPLETED; exit: 0; error: -; workDir: /work/d6/31d530a65ef23d1cb302940a782909]",
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, ".nextflow.log")
+            with open(path, "w") as f: f.write("\n".join(lines) + "\n")
+            process_executions = get_process_executions_from_log_file(path, Mock(), processes=1)
+            self.assertEqual(list(process_executions), ["d6/31d530"])
+            self.assertEqual(process_executions["d6/31d530"].status, "COMPLETED")
+            with open(path, "w") as f: f.write(lines[1] + "\n")
+            process_executions = get_process_executions_from_log_file(path, Mock(), processes=4)
+            self.assertEqual(list(process_executions), ["d6/31d530"])
+        self.assertFalse(mock_executor.called)
+
+
+
 class MakeOrUpdateExecutionTests(TestCase):
 
     @patch("nextflow.command.get_identifier_from_log")
@@ -0,0 +1,165 @@
+import os
+import hashlib
+import tempfile
+from datetime import datetime
+from unittest.mock import Mock, patch
+from nextflow.files import *
+from .base import ModelTest
+
+class FileTest(ModelTest):
+
+    def setUp(self):
+        clear_hash_cache()
+        self.temp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp.name, "work", "aa", "111111")
+        for name, contents in (
+            (".command.run", "#!/bin/bash"), (".exitcode", "0"),
+            ("out.txt", "hello"), ("results/a.csv", "1,2"), ("results/deep/b.csv", "3"),
+            ("../reads.fq", "ACGT"),
+        ):
+            os.makedirs(os.path.dirname(os.path.join(self.directory, name)), exist_ok=True)
+            with open(os.path.join(self.directory, name), "w") as f: f.write(contents)
+        os.symlink(os.path.join(self.directory, "..", "reads.fq"), os.path.join(self.directory, "reads.fq"))
+        os.symlink(os.path.join(self.directory, "out.txt"), os.path.join(self.directory, "link.txt"))
+        os.symlink(os.path.join(self.directory, "missing"), os.path.join(self.directory, "broken"))
+        self.process_execution = self.make_process_execution(
+            path="aa/111111", staged_inputs=["reads.fq"]
+        )
+        self.execution = self.make_execution(
+            path=self.temp.name, process_executions=[self.process_execution]
+        )
+
+
+    def make_process_execution(self, **kwargs):
+        process_execution = super().make_process_execution(**kwargs)
+        process_execution.input_data = Mock(wraps=process_execution.input_data)
+        return process_execution
+
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+
+
+class OutputFilesTests(FileTest):
+
+    def test_can_get_output_files(self):
+        entries = get_output_files(self.process_execution)
+        self.assertEqual([(e.name, e.type) for e in entries], [
+            ("broken", "symlink"), ("link.txt", "symlink"),
+            ("out.txt", "file"), ("results", "directory"),
+        ])
+        self.assertEqual(entries[1].size, 5)
+        self.assertEqual(entries[2].path, os.path.join(self.directory, "out.txt"))
+        self.assertIsNone(entries[2].hash)
+        self.process_execution.input_data.assert_called_with(include_path=False)
+
+
+    def test_can_get_output_files_recursively(self):
+        entries = get_output_files(self.process_execution, recursive=True)
+        self.assertEqual([e.name for e in entries][3:], [
+            "results", "results/a.csv", "results/deep", "results/deep/b.csv"
+        ])
+        self.assertEqual(entries[-1].size, 1)
+
+
+    def test_can_get_hashes(self):
+        entries = get_output_files(self.process_execution, hashes=True, threads=2)
+        hashes = {e.name: e.hash for e in entries}
+        self.assertEqual(hashes["out.txt"], hashlib.sha256(b"hello").hexdigest())
+        self.assertEqual(hashes["link.txt"], hashes["out.txt"])
+        self.assertIsNone(hashes["broken"])
+        self.assertIsNone(hashes["results"])
+
+
+    def test_can_use_io_object(self):
+        self.process_execution.io = Mock(scandir=Mock(side_effect=os.scandir))
+        self.process_execution.io.read.return_value = b"remote"
+        entries = get_output_files(self.process_execution, recursive=True, hashes=True)
+        self.assertEqual(self.process_execution.io.scandir.call_count, 3)
+        self.assertEqual(entries[2].hash, hashlib.sha256(b"remote").hexdigest())
+        self.process_execution.io.read.assert_any_call(entries[2].path, "rb")
+
+
+    def test_can_use_io_object_without_scandir(self):
+        io = self.process_execution.io = Mock(spec=["abspath", "listdir", "read", "glob", "ctime"])
+        io.listdir.side_effect = lambda path: os.listdir(path.removeprefix("/remote"))
+        io.abspath.side_effect = lambda path: "/remote" + path.removeprefix("/remote")
+        io.ctime.return_value = datetime(2025, 1, 1, 12)
+        io.read.return_value = b"remote"
+        with patch("os.scandir") as mock_scandir:
+            entries = get_output_files(self.process_execution, recursive=True, hashes=True)
+        self.assertFalse(mock_scandir.called)
+        self.assertEqual([(e.name, e.type) for e in entries], [
+            ("broken", "file"), ("link.txt", "file"), ("out.txt", "file"),
+            ("results", "directory"), ("results/a.csv", "file"),
+            ("results/deep", "directory"), ("results/deep/b.csv", "file"),
+        ])
+        self.assertEqual(entries[2].path, "/remote" + os.path.join(self.directory, "out.txt"))
+        self.assertEqual(entries[2].modified, datetime(2025, 1, 1, 12))
+        self.assertIsNone(entries[2].size)
+        self.assertEqual(entries[2].hash, hashlib.sha256(b"remote").hexdigest())
+
+
+    def test_can_use_io_scandir_returning_list(self):
+        self.process_execution.io = Mock(scandir=lambda path: list(os.scandir(path)))
+        self.process_execution.io.read.return_value = b"remote"
+        entries = get_output_files(self.process_execution, recursive=True)
+        self.assertEqual([e.name for e in entries][3:], [
+            "results", "results/a.csv", "results/deep", "results/deep/b.csv"
+        ])
+
+
+    def test_can_handle_no_path_or_missing_directory(self):
+        self.process_execution.path = ""
+        self.assertEqual(get_output_files(self.process_execution), [])
+        self.process_execution.path = "aa/111111/nope"
+        self.assertEqual(get_output_files(self.process_execution), [])
+
+
+
+class ExecutionOutputFilesTests(FileTest):
+
+    def test_can_get_output_files_of_execution(self):
+        other = self.make_process_execution(
+            identifier="bb/222222", path="aa/111111/results", staged_inputs=[]
+        )
+        pending = self.make_process_execution(identifier="cc/333333", path="")
+        self.execution.process_executions += [other, pending]
+        other.execution = pending.execution = self.execution
+        files = get_execution_output_files(self.execution, hashes=True, threads=2)
+        self.assertEqual(list(files), ["aa/111111", "bb/222222"])
+        self.assertEqual([e.name for e in files["bb/222222"]], ["a.csv", "deep"])
+        self.assertEqual(files["bb/222222"][0].hash, hashlib.sha256(b"1,2").hexdigest())
+        self.assertEqual(len(files["aa/111111"]), 4)
+        self.assertFalse(pending.input_data.called)
+
+
+
+class HashTests(FileTest):
+
+    @patch("nextflow.files.hash_file")
+    def test_hashes_are_cached(self, mock_hash):
+        mock_hash.side_effect = lambda path, algorithm, io: path[-5:]
+        entries = scan_directory(self.directory, recursive=True)
+        first = hash_entries(entries + entries)
+        self.assertEqual(mock_hash.call_count, 6)
+        self.assertEqual(hash_entries(entries), first[:len(entries)])
+        self.assertEqual(mock_hash.call_count, 6)
+        hash_entries(entries, algorithm="md5")
+        self.assertEqual(mock_hash.call_count, 12)
+
+
+    def test_changed_files_are_hashed_again(self):
+        path = os.path.join(self.directory, "out.txt")
+        before = hash_entries(scan_directory(self.directory))
+        with open(path, "w") as f: f.write("goodbye!")
+        after = hash_entries(scan_directory(self.directory))
+        self.assertNotEqual(before[2].hash, after[2].hash)
+        self.assertEqual(after[2].hash, hash_file(path))
+
+
+    def test_can_hash_file(self):
+        path = os.path.join(self.directory, "out.txt")
+        self.assertEqual(hash_file(path, "md5"), hashlib.md5(b"hello").hexdigest())
+        self.assertIsNone(hash_file(self.directory))
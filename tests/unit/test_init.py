@@ -0,0 +1,30 @@
+import sys
+import subprocess
+from unittest import TestCase
+import nextflow
+
+class PackageAttributeTests(TestCase):
+
+    def test_can_get_run_functions(self):
+        from nextflow.command import run, run_and_poll
+        self.assertIs(nextflow.__getattr__("run"), run)
+        self.assertIs(nextflow.__getattr__("run_and_poll"), run_and_poll)
+
+
+    def test_can_get_submodules(self):
+        import nextflow.models
+        self.assertIs(nextflow.__getattr__("models"), nextflow.models)
+
+
+    def test_submodules_imported_on_first_access(self):
+        result = subprocess.run([sys.executable, "-c", (
+            "import sys, nextflow; assert 'nextflow.models' not in sys.modules; "
+            "print(nextflow.models.Execution.__name__)"
+        )], capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "Execution", result.stderr)
+
+
+    def test_unknown_attributes_raise_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            nextflow.__getattr__("nothing")
+        self.assertFalse(hasattr(nextflow, "nothing"))
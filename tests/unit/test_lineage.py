@@ -0,0 +1,117 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from nextflow.lineage import *
+from .base import ModelTest
+
+A, B, C = "aa/" + "1" * 30, "bb/" + "2" * 30, "cc/" + "3" * 30
+
+class LineageTest(ModelTest):
+
+    def make_process_execution(self, **kwargs):
+        kwargs = {"staged_inputs": [], **kwargs}
+        process_execution = super().make_process_execution(**kwargs)
+        process_execution.input_data = Mock(wraps=process_execution.input_data)
+        return process_execution
+
+
+
+class LineageTests(LineageTest):
+
+    def setUp(self):
+        self.a = self.make_process_execution(identifier="aa/111111", path=A)
+        self.b = self.make_process_execution(identifier="bb/222222", path=B)
+        self.c = self.make_process_execution(identifier="cc/333333", path=C)
+        self.lineage = Lineage()
+        self.lineage.add(self.a, ["/data/reads.fq"])
+        self.lineage.add(self.b, [f"/ex/work/{A}/out.bam", "/data/reads.fq"])
+        self.lineage.add(self.c, [f"/ex/work/{A}/out.bam", f"/ex/work/{A}/out.bai", f"/ex/work/{B}/x"])
+
+
+    def test_can_get_producer(self):
+        self.assertIs(self.lineage.get_producer(f"/ex/work/{A}/out.bam"), self.a)
+        self.assertIs(self.lineage.get_producer(f"/ex/work/{C}/unused.txt"), self.c)
+        self.assertIsNone(self.lineage.get_producer("/data/reads.fq"))
+        self.assertIsNone(self.lineage.get_producer(f"/ex/work/dd/{'4' * 30}/x"))
+
+
+    def test_can_get_users(self):
+        self.assertEqual(self.lineage.get_users(f"/ex/work/{A}/out.bam"), [self.b, self.c])
+        self.assertEqual(self.lineage.get_users("/data//reads.fq"), [self.a, self.b])
+        self.assertEqual(self.lineage.get_users("/data/other.fq"), [])
+
+
+    def test_can_get_upstream_and_consumers(self):
+        self.assertEqual(self.lineage.get_upstream(self.c), [self.a, self.b])
+        self.assertEqual(self.lineage.get_upstream(self.a), [])
+        self.assertEqual(self.lineage.get_consumers(self.a), [self.b, self.c])
+        self.assertEqual(self.lineage.get_consumers(self.c), [])
+        self.assertEqual(self.lineage.get_inputs(self.b), [f"/ex/work/{A}/out.bam", "/data/reads.fq"])
+
+
+    def test_consumers_added_before_producers_are_linked(self):
+        lineage = Lineage()
+        lineage.add(self.c, [f"/ex/work/{A}/out.bam"])
+        self.assertEqual(lineage.get_upstream(self.c), [])
+        lineage.add(self.a, [])
+        self.assertEqual(lineage.get_upstream(self.c), [self.a])
+        self.assertEqual(lineage.get_consumers(self.a), [self.c])
+        self.assertEqual(lineage.unresolved, {})
+
+
+
+class GetLineageTests(LineageTest):
+
+    def setUp(self):
+        self.a = self.make_process_execution(identifier="aa/111111", path=A)
+        self.b = self.make_process_execution(
+            identifier="bb/222222", path=B, staged_inputs=[f"/ex/work/{A}/out.bam"]
+        )
+        self.c = self.make_process_execution(
+            identifier="cc/333333", path="", staged_inputs=[f"/ex/work/{B}/x"]
+        )
+        self.execution = self.make_execution(process_executions=[self.a, self.b, self.c])
+
+
+    def test_can_get_lineage(self):
+        lineage = get_lineage(self.execution)
+        self.assertIs(self.execution.lineage, lineage)
+        self.assertEqual(lineage.get_consumers(self.a), [self.b])
+        self.assertNotIn("cc/333333", lineage.inputs)
+        self.assertFalse(self.c.input_data.called)
+
+
+    def test_unstaged_process_executions_are_read_again(self):
+        self.b.staged_inputs = None
+        lineage = get_lineage(self.execution)
+        self.assertNotIn("bb/222222", lineage.inputs)
+        self.assertEqual(lineage.get_consumers(self.a), [])
+        self.b.staged_inputs = [f"/ex/work/{A}/out.bam"]
+        get_lineage(self.execution)
+        self.assertEqual(lineage.get_upstream(self.b), [self.a])
+        self.assertEqual(self.b.input_data.call_count, 2)
+
+
+    def test_lineage_is_updated_incrementally(self):
+        lineage = get_lineage(self.execution, workers=1)
+        self.c.path = C
+        self.assertIs(get_lineage(self.execution), lineage)
+        self.assertEqual(lineage.get_consumers(self.b), [self.c])
+        for process_execution in (self.a, self.b, self.c):
+            self.assertEqual(process_execution.input_data.call_count, 1)
+
+
+
+class StagedInputParsingTests(TestCase):
+
+    def test_can_parse_linked_inputs(self):
+        run = "nxf_launch() {\n  x\n}\nnxf_stage() {\n    true\n    rm -f a.txt\n    ln -s /w/a.txt a.txt\n    ln -s /w/b.txt b.txt\n}\n"
+        self.assertEqual(parse_staged_inputs(run), ["/w/a.txt", "/w/b.txt"])
+
+
+    def test_can_parse_copied_inputs(self):
+        run = "nxf_stage() {\n    cp -fRL /w/a.txt a.txt\n}\n"
+        self.assertEqual(parse_staged_inputs(run), ["/w/a.txt"])
+
+
+    def test_can_handle_no_staging(self):
+        self.assertEqual(parse_staged_inputs("#!/bin/bash\necho"), [])
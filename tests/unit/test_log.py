@@ -1,3 +1,8 @@
+import io
+import os
+import glob
+import json
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch
 from nextflow.log import *
@@ -64,6 +69,57 @@ class LogIsFinishedTests(TestCase):
     def test_can_handle_java_error_with_tabs(self):
         text = "line1\nline2\njava.nio.file.NoSuchFileException: /media/\n\tat 1"
         self.assertTrue(log_is_finished(text))
+    
+
+    def test_can_handle_java_vm_error(self):
+        text = "line1\nline2\njava.lang.OutOfMemoryError: Java heap space\n\tat 1"
+        self.assertTrue(log_is_finished(text))
+    
+
+    def test_can_handle_exception_without_message(self):
+        text = "line1\nline2\njava.lang.NullPointerException\n\tat 1\n\tat 2"
+        self.assertTrue(log_is_finished(text))
+    
+
+    def test_can_ignore_lines_mentioning_errors(self):
+        text = "line1\nJan-08 17:40:59.021 [main] WARN  nextflow.processor.TaskProcessor - ErrorStrategy ignore\n    at 1"
+        self.assertFalse(log_is_finished(text))
+        text = "line1\nJan-08 17:40:59.021 [main] DEBUG nextflow.Session - Exception handler registered\n\tat 1"
+        self.assertFalse(log_is_finished(text))
+
+
+
+class LogExceptionTests(TestCase):
+
+    def test_can_handle_no_log_text(self):
+        self.assertEqual(get_exception_from_log(""), "")
+
+
+    def test_can_handle_unfinished_log(self):
+        self.assertEqual(get_exception_from_log("Jan-08 17:40:59.388 [main] DEBUG x\nline2"), "")
+
+
+    def test_can_handle_successful_log(self):
+        self.assertEqual(get_exception_from_log("line1\n - > Execution complete -- Goodbye\n"), "")
+
+
+    def test_can_get_final_entry_and_stack_trace(self):
+        text = (
+            "Jan-08 17:40:59.021 [Task submitter] INFO  nextflow.Session - Submitted\n"
+            "Jan-08 17:40:59.388 [main] ERROR nextflow.cli.Launcher - @unknown\n"
+            "java.lang.OutOfMemoryError: Java heap space\n"
+            "\tat java.base/java.util.Arrays.copyOf(Arrays.java:3537)\n"
+        )
+        self.assertEqual(get_exception_from_log(text), (
+            "Jan-08 17:40:59.388 [main] ERROR nextflow.cli.Launcher - @unknown\n"
+            "java.lang.OutOfMemoryError: Java heap space\n"
+            "\tat java.base/java.util.Arrays.copyOf(Arrays.java:3537)"
+        ))
+
+
+    def test_can_get_exception_without_log_entry(self):
+        text = "java.nio.file.NoSuchFileException: /media/\n\tat 1"
+        self.assertEqual(get_exception_from_log(text), text)
 
 
 
@@ -206,4 +262,271 @@ class CompletedLineTests(TestCase):
         self.assertEqual(identifier, "")
         self.assertIsNone(finished)
         self.assertEqual(return_code, "")
-        self.assertEqual(status, "")
\ No newline at end of file
+        self.assertEqual(status, "")
+
+
+
+class LogChunksTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, ".nextflow.log")
+    
+
+    def tearDown(self):
+        self.directory.cleanup()
+    
+
+    def test_chunks_are_aligned_to_lines(self):
+        with open(self.path, "w") as f: f.write("".join(f"line {i}\n" for i in range(100)))
+        chunks = get_log_chunks(self.path, 7)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], os.path.getsize(self.path))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+        with open(self.path, "rb") as f: data = f.read()
+        for start, end in chunks:
+            self.assertTrue(data[start:end].endswith(b"\n"))
+        self.assertEqual(
+            b"".join(data[s:e] for s, e in chunks).decode().splitlines(),
+            [f"line {i}" for i in range(100)]
+        )
+    
+
+    def test_can_handle_more_chunks_than_lines(self):
+        with open(self.path, "w") as f: f.write("line 1\nline 2\n")
+        self.assertEqual(get_log_chunks(self.path, 10), [(0, 7), (7, 14)])
+    
+
+    def test_can_handle_empty_file(self):
+        open(self.path, "w").close()
+        self.assertEqual(get_log_chunks(self.path, 4), [])
+
+
+
+class LogEndsTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, ".nextflow.log")
+        with open(self.path, "w") as f: f.write("".join(f"line {i}\n" for i in range(100)))
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_can_read_whole_small_file(self):
+        head, tail = get_log_ends(self.path, 10000)
+        self.assertEqual(head, tail)
+        self.assertEqual(head.splitlines(), [f"line {i}" for i in range(100)])
+
+
+    def test_can_read_ends_of_large_file(self):
+        head, tail = get_log_ends(self.path, 20)
+        self.assertEqual(head, "line 0\nline 1\n")
+        self.assertEqual(tail, "line 98\nline 99\n")
+
+
+    def test_can_handle_missing_file(self):
+        self.assertEqual(get_log_ends(os.path.join(self.directory.name, "x")), ("", ""))
+
+
+
+class LogChunkParsingTests(TestCase):
+
+    def test_can_parse_chunk(self):
+        lines = [
+            "Jun-01 16:45:55.000 [main] DEBUG nextflow.cli.Launcher - $> nextflow run main.nf",
+            "Jun-01 16:45:57.048 [Task submitter] INFO  nextflow.Session - [d6/31d530] Submitted process > SPLIT (file.csv)",
+            "Feb-26 20:52:39.165 [Actor Thread 9] INFO  nextflow.processor.TaskProcessor - [29/af9070] Cached process > LOWER",
+            "Jun-01 16:46:00.365 [Task monitor] DEBUG n.processor.TaskPollingMonitor - Task completed > TaskHandler[id: 1; name: SPLIT (file.csv); status: COMPLETED; exit: 0; error: -; workDir: /work/d6/31d530a65ef23d1cb302940a782909]",
+            "Jun-01 16:46:01.000 [main] INFO  nextflow.Session - Submitted process without identifier",
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, ".nextflow.log")
+            with open(path, "w") as f: f.write("\n".join(lines) + "\n")
+            start = len(lines[0]) + 1
+            events = parse_log_chunk(path, start, os.path.getsize(path))
+        year = datetime.now().year
+        offsets = [sum(len(l) + 1 for l in lines[:i + 1]) for i in range(len(lines))]
+        self.assertEqual(events, [
+            LogEvent("submitted", datetime(year, 6, 1, 16, 45, 57, 48000), offsets[1], "d6/31d530", "SPLIT (file.csv)", "SPLIT"),
+            LogEvent("cached", datetime(year, 2, 26, 20, 52, 39, 165000), offsets[2], "29/af9070", "LOWER", "LOWER", "COMPLETED", "0"),
+            LogEvent("completed", datetime(year, 6, 1, 16, 46, 0, 365000), offsets[3], "d6/31d530", "SPLIT (file.csv)", status="COMPLETED", return_code="0"),
+        ])
+
+
+
+class LogEventIterationTests(TestCase):
+
+    def setUp(self):
+        self.lines = [
+            "Jun-01 16:45:55.000 [main] DEBUG nextflow.cli.Launcher - $> nextflow run main.nf",
+            "Jun-01 16:45:55.100 [main] DEBUG nextflow.Session - Session UUID: a8a84db5-20d0-4862-8db5-addc8ca10c8a",
+            "Jun-01 16:45:57.048 [Task submitter] INFO  nextflow.Session - [d6/31d530] Submitted process > SPLIT (file.csv)",
+            "Jun-01 16:46:00.365 [Task monitor] DEBUG n.processor.TaskPollingMonitor - Task completed > TaskHandler[id: 1; name: SPLIT (file.csv); status: COMPLETED; exit: 0; error: -; workDir: /work/d6/31d530a65ef23d1cb302940a782909]",
+            "Jun-01 16:46:01.000 [main] DEBUG nextflow.script.ScriptRunner - > Execution complete -- Goodbye",
+        ]
+        self.data = ("\n".join(self.lines) + "\n").encode()
+    
+
+    def test_can_iterate_events_from_stream(self):
+        events = list(iter_log_events(io.BytesIO(self.data)))
+        self.assertEqual([e.type for e in events], ["session", "submitted", "completed", "complete"])
+        self.assertEqual(events[0].identifier, "a8a84db5-20d0-4862-8db5-addc8ca10c8a")
+        self.assertEqual(events[1].identifier, "d6/31d530")
+        self.assertEqual(events[-1].offset, len(self.data))
+    
+
+    def test_can_iterate_events_from_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, ".nextflow.log")
+            with open(path, "wb") as f: f.write(self.data)
+            events = list(iter_log_events(path))
+        self.assertEqual([e.type for e in events], ["session", "submitted", "completed", "complete"])
+    
+
+    def test_can_resume_from_offset(self):
+        events = list(iter_log_events(io.BytesIO(self.data)))
+        resumed = list(iter_log_events(io.BytesIO(self.data), offset=events[1].offset))
+        self.assertEqual(resumed, events[2:])
+    
+
+    def test_incomplete_final_line_not_read(self):
+        events = list(iter_log_events(io.BytesIO(self.data[:-1])))
+        self.assertEqual([e.type for e in events], ["session", "submitted", "completed"])
+    
+
+    def test_can_iterate_text_stream(self):
+        events = list(iter_log_events(io.StringIO(self.data.decode())))
+        self.assertEqual([e.type for e in events], ["session", "submitted", "completed", "complete"])
+
+
+
+class LogLineParsingTests(TestCase):
+
+    def test_can_parse_submitted_line(self):
+        line = "Jun-01 16:45:57.048 [Task submitter] INFO  nextflow.Session - [d6/31d530] Submitted process > DEMULTIPLEX:CSV_TO_BARCODE (file.csv)"
+        self.assertEqual(parse_log_line(line, 10), LogEvent(
+            "submitted", datetime(datetime.now().year, 6, 1, 16, 45, 57, 48000), 10,
+            "d6/31d530", "DEMULTIPLEX:CSV_TO_BARCODE (file.csv)", "DEMULTIPLEX:CSV_TO_BARCODE"
+        ))
+    
+
+    def test_can_parse_cached_line(self):
+        line = "Feb-26 20:52:39.165 [Actor Thread 9] INFO  nextflow.processor.TaskProcessor - [29/af9070] Cached process > SPLIT_FILE (file.csv)"
+        event = parse_log_line(line)
+        self.assertEqual(event.type, "cached")
+        self.assertEqual(event.identifier, "29/af9070")
+        self.assertEqual(event.process, "SPLIT_FILE")
+        self.assertEqual(event.status, "COMPLETED")
+        self.assertEqual(event.return_code, "0")
+    
+
+    def test_can_parse_completed_line(self):
+        line = "Jun-01 16:46:08.878 [Task monitor] DEBUG n.processor.TaskPollingMonitor - Task completed > TaskHandler[id: 2; name: DEMULTIPLEX:ULTRAPLEX (file.fastq); status: COMPLETED; exit: 1; error: -; workDir: /work/8a/c2a4dc996d54cad136abeb4e4e309a]"
+        self.assertEqual(parse_log_line(line), LogEvent(
+            "completed", datetime(datetime.now().year, 6, 1, 16, 46, 8, 878000), 0,
+            "8a/c2a4dc", "DEMULTIPLEX:ULTRAPLEX (file.fastq)", status="FAILED", return_code="1"
+        ))
+    
+
+    def test_can_parse_started_line(self):
+        line = "Jun-01 16:45:58.000 [Task monitor] TRACE n.processor.TaskPollingMonitor - Task started > TaskHandler[id: 2; name: ULTRAPLEX (file.fastq); status: RUNNING; exit: -; error: -; workDir: /work/8a/c2a4dc996d54cad136abeb4e4e309a]"
+        event = parse_log_line(line)
+        self.assertEqual(event.type, "started")
+        self.assertEqual(event.identifier, "8a/c2a4dc")
+        self.assertEqual(event.name, "ULTRAPLEX (file.fastq)")
+    
+
+    def test_can_parse_retried_line(self):
+        line = "Jun-01 16:46:08.900 [Task monitor] INFO  nextflow.processor.TaskProcessor - [8a/c2a4dc] NOTE: Process `ULTRAPLEX (file.fastq)` terminated with an error exit status (137) -- Execution is retried (1)"
+        event = parse_log_line(line)
+        self.assertEqual(event.type, "retried")
+        self.assertEqual(event.identifier, "8a/c2a4dc")
+        self.assertEqual(event.name, "ULTRAPLEX (file.fastq)")
+        self.assertEqual(event.return_code, "137")
+        self.assertTrue(event.message.endswith("Execution is retried (1)"))
+    
+
+    def test_can_parse_session_line(self):
+        line = "Feb-03 18:12:26.098 [main] DEBUG nextflow.Session - Session UUID: a8a84db5-20d0-4862-8db5-addc8ca10c8a"
+        event = parse_log_line(line)
+        self.assertEqual(event.type, "session")
+        self.assertEqual(event.identifier, "a8a84db5-20d0-4862-8db5-addc8ca10c8a")
+    
+
+    def test_can_parse_complete_line(self):
+        line = "Jun-01 16:46:10.000 [main] DEBUG nextflow.script.ScriptRunner - > Execution complete -- Goodbye"
+        self.assertEqual(parse_log_line(line).type, "complete")
+    
+
+    def test_can_parse_error_line(self):
+        line = "Jun-01 16:46:09.000 [Task monitor] ERROR nextflow.processor.TaskProcessor - Error executing process > 'ULTRAPLEX (file.fastq)'"
+        event = parse_log_line(line)
+        self.assertEqual(event.type, "error")
+        self.assertEqual(event.message, "Error executing process > 'ULTRAPLEX (file.fastq)'")
+    
+
+    def test_can_handle_other_lines(self):
+        self.assertIsNone(parse_log_line("Jun-01 16:45:55.000 [main] DEBUG nextflow.cli.Launcher - $> nextflow run"))
+        self.assertIsNone(parse_log_line("Jun-01 16:45:55.000 [main] INFO  nextflow.Session - Submitted process"))
+
+
+
+class LogCorpusTests(TestCase):
+    """Checks the logs in tests/logs, one directory per supported Nextflow
+    version, against the events they are known to contain.
+
+    These logs are synthetic fixtures - hand-built from each version's line
+    formats, not captured from real runs - so they only show that the
+    parsers handle the formats as written. Real logs should replace them,
+    added with tests/logs/add_log.py."""
+
+    def setUp(self):
+        directory = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+        self.paths = sorted(glob.glob(os.path.join(directory, "*", "*.log")))
+        self.assertGreaterEqual(len({os.path.dirname(p) for p in self.paths}), 3)
+
+
+    def load(self, path):
+        with open(path) as f: text = f.read()
+        with open(path[:-4] + ".json") as f: expected = json.load(f)
+        return text, expected
+    
+
+    def test_can_parse_run_details(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                text, expected = self.load(path)
+                self.assertEqual(get_identifier_from_log(text), expected["identifier"])
+                self.assertEqual(get_session_uuid_from_log(text), expected["session_uuid"])
+                self.assertEqual(log_is_finished(text), expected["finished"])
+                self.assertIsNotNone(get_started_from_log(text))
+    
+
+    def test_can_iterate_events(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                _, expected = self.load(path)
+                events = [
+                    [e.type, e.identifier, e.name, e.status, e.return_code]
+                    for e in iter_log_events(path)
+                ]
+                self.assertEqual(events, expected["events"])
+    
+
+    def test_chunk_parsing_matches_iteration(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                _, expected = self.load(path)
+                events = [
+                    [e.type, e.identifier, e.name, e.status, e.return_code]
+                    for chunk in get_log_chunks(path, 3)
+                    for e in parse_log_chunk(path, *chunk)
+                ]
+                self.assertEqual(events, [
+                    e for e in expected["events"]
+                    if e[0] in ("submitted", "cached", "completed")
+                ])
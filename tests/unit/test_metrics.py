@@ -0,0 +1,165 @@
+import os
+import tempfile
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from nextflow.metrics import *
+from .base import ModelTest, START
+
+class MetricsUpdateTests(ModelTest):
+
+    def test_can_count_tasks_incrementally(self):
+        metrics = MetricsExporter()
+        tasks = [
+            self.make_process_execution(identifier="aa/1", process="A"),
+            self.make_process_execution(identifier="bb/2", process="B"),
+        ]
+        metrics.update(self.make_execution(process_executions=tasks))
+        self.assertEqual(metrics.tasks, {("happy_turing", "A", "-"): 1, ("happy_turing", "B", "-"): 1})
+        tasks[0].status = "COMPLETED"
+        tasks.append(self.make_process_execution(identifier="cc/3", process="A", status="FAILED"))
+        metrics.update(self.make_execution(process_executions=tasks))
+        self.assertEqual(metrics.tasks, {
+            ("happy_turing", "A", "-"): 0, ("happy_turing", "A", "COMPLETED"): 1,
+            ("happy_turing", "A", "FAILED"): 1, ("happy_turing", "B", "-"): 1
+        })
+
+
+    def test_executions_without_identifier_not_counted(self):
+        metrics = MetricsExporter()
+        tasks = [self.make_process_execution(identifier="aa/1", process="A")]
+        metrics.update(self.make_execution(identifier="", process_executions=tasks), 0.1, 500)
+        self.assertEqual(metrics.tasks, {})
+        self.assertEqual(metrics.log_sizes, {})
+        self.assertEqual(metrics.polls, 1)
+        metrics.update(self.make_execution(process_executions=tasks))
+        self.assertEqual(metrics.tasks, {("happy_turing", "A", "-"): 1})
+
+
+    def test_task_durations_observed_once(self):
+        metrics = MetricsExporter()
+        tasks = [
+            self.make_process_execution(
+                identifier="aa/1", process="A", status="COMPLETED",
+                started=START, finished=START + timedelta(seconds=7)
+            ),
+            self.make_process_execution(
+                identifier="bb/2", process="A", status="COMPLETED", cached=True,
+                started=START, finished=START + timedelta(seconds=3600)
+            ),
+            self.make_process_execution(identifier="cc/3", process="A", status="COMPLETED", started=START),
+        ]
+        metrics.update(self.make_execution(process_executions=tasks))
+        tasks[2].finished = START + timedelta(seconds=40)
+        metrics.update(self.make_execution(process_executions=tasks))
+        metrics.update(self.make_execution(process_executions=tasks))
+        histogram = metrics.task_durations["A"]
+        self.assertEqual(histogram.count, 2)
+        self.assertEqual(histogram.sum, 47)
+
+
+    def test_can_record_polls(self):
+        metrics = MetricsExporter()
+        metrics.update(None, 0.02, 0)
+        metrics.update(self.make_execution(), 0.3, 1000)
+        self.assertEqual(metrics.polls, 2)
+        self.assertEqual(metrics.poll_durations.count, 2)
+        self.assertEqual(metrics.log_read_bytes, 1000)
+        self.assertEqual(metrics.log_read_bytes_total, 1000)
+        metrics.update(self.make_execution())
+        self.assertEqual(metrics.polls, 2)
+
+
+    @patch("time.monotonic")
+    def test_can_measure_log_lag(self, mock_time):
+        metrics = MetricsExporter()
+        mock_time.return_value = 100
+        metrics.update(self.make_execution(log="line1"))
+        mock_time.return_value = 130
+        metrics.update(self.make_execution(log="line1"))
+        self.assertIn('nextflow_log_lag_seconds{execution="happy_turing"} 30', metrics.render())
+        metrics.update(self.make_execution(log="line1\nline2"))
+        mock_time.return_value = 135
+        self.assertIn('nextflow_log_lag_seconds{execution="happy_turing"} 5', metrics.render())
+        metrics.update(self.make_execution(log="line1\nline2", finished=datetime(2025, 1, 1)))
+        self.assertIn('nextflow_log_lag_seconds{execution="happy_turing"} 0', metrics.render())
+
+
+    @patch("time.monotonic")
+    def test_can_measure_lag_from_weblog_events(self, mock_time):
+        metrics = MetricsExporter()
+        mock_time.return_value = 100
+        metrics.update(self.make_execution(), active=True)
+        mock_time.return_value = 160
+        metrics.update(self.make_execution(), active=True)
+        mock_time.return_value = 170
+        self.assertIn('nextflow_log_lag_seconds{execution="happy_turing"} 10', metrics.render())
+
+
+
+class MetricsRenderingTests(ModelTest):
+
+    def setUp(self):
+        self.metrics = MetricsExporter()
+        self.metrics.update(self.make_execution(process_executions=[
+            self.make_process_execution(
+                identifier="aa/1", process='MAIN:"A"', status="COMPLETED",
+                started=START, finished=START + timedelta(seconds=7)
+            )
+        ]), 0.2, 50)
+
+
+    def test_can_render_openmetrics(self):
+        text = self.metrics.render()
+        self.assertIn("# TYPE nextflow_tasks gauge\n", text)
+        self.assertIn('nextflow_tasks{execution="happy_turing",process="MAIN:\\"A\\"",status="COMPLETED"} 1\n', text)
+        self.assertIn("# TYPE nextflow_task_duration_seconds histogram\n", text)
+        self.assertIn('nextflow_task_duration_seconds_bucket{process="MAIN:\\"A\\"",le="5"} 0\n', text)
+        self.assertIn('nextflow_task_duration_seconds_bucket{process="MAIN:\\"A\\"",le="10"} 1\n', text)
+        self.assertIn('nextflow_task_duration_seconds_bucket{process="MAIN:\\"A\\"",le="+Inf"} 1\n', text)
+        self.assertIn('nextflow_task_duration_seconds_sum{process="MAIN:\\"A\\""} 7.0\n', text)
+        self.assertIn("# TYPE nextflow_polls counter\nnextflow_polls_total 1\n", text)
+        self.assertIn('nextflow_poll_duration_seconds_bucket{le="0.25"} 1\n', text)
+        self.assertIn("nextflow_poll_log_read_bytes 50\n", text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+
+    def test_can_render_prometheus_format(self):
+        text = self.metrics.render(openmetrics=False)
+        self.assertIn("# TYPE nextflow_polls_total counter\nnextflow_polls_total 1\n", text)
+        self.assertIn("# TYPE nextflow_log_read_bytes_total counter\n", text)
+        self.assertNotIn("# EOF", text)
+
+
+    def test_can_write_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "nextflow.prom")
+            metrics = MetricsExporter(path=path)
+            metrics.update(None, 0.1, 10)
+            with open(path) as f: text = f.read()
+            self.assertIn("nextflow_polls_total 1\n", text)
+            self.assertNotIn("# EOF", text)
+            self.assertEqual(os.listdir(directory), ["nextflow.prom"])
+
+
+    def test_can_serve_metrics(self):
+        with MetricsExporter(port=0) as metrics:
+            metrics.update(None, 0.1, 10)
+            self.assertTrue(metrics.url.startswith("http://127.0.0.1:"))
+            with urllib.request.urlopen(metrics.url) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                self.assertIn(b"nextflow_polls_total 1\n", response.read())
+            request = urllib.request.Request(metrics.url, headers={"Accept": "application/openmetrics-text"})
+            with urllib.request.urlopen(request) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("application/openmetrics-text"))
+                self.assertTrue(response.read().endswith(b"# EOF\n"))
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(metrics.url.replace("/metrics", "/other"))
+
+
+    def test_no_server_without_port(self):
+        metrics = MetricsExporter()
+        self.assertIsNone(metrics.url)
+        metrics.start()
+        metrics.stop()
@@ -1,5 +1,7 @@
+import os
+import tempfile
 from unittest import TestCase
-from unittest.mock import patch, call
+from unittest.mock import patch
 from nextflow.outputs import *
 
 class PipelineProcessNamesTests(TestCase):
@@ -17,33 +19,55 @@ class PipelineProcessNamesTests(TestCase):
         outputs = get_pipeline_process_names("/ex/file.nf")
         self.assertEqual(outputs, ["module1", "module2"])
         mock_paths.assert_called_with("/ex/file.nf")
+    
+
+    @patch("nextflow.outputs.get_file_process_paths")
+    @patch("nextflow.outputs.load_parse_cache")
+    @patch("nextflow.outputs.save_parse_cache")
+    def test_can_use_on_disk_cache(self, mock_save, mock_load, mock_paths):
+        mock_paths.return_value = {"module1": {"path": "/ex/module1.nf"}}
+        outputs = get_pipeline_process_names("/ex/file.nf", cache_path="/cache.json")
+        self.assertEqual(outputs, ["module1"])
+        mock_load.assert_called_with("/cache.json")
+        mock_save.assert_called_with("/cache.json")
+    
+
+    @patch("nextflow.outputs.get_file_process_paths")
+    @patch("nextflow.outputs.parse_pipeline_files")
+    def test_can_parse_files_in_parallel(self, mock_parse, mock_paths):
+        mock_paths.return_value = {"module1": {"path": "/ex/module1.nf"}}
+        outputs = get_pipeline_process_names("/ex/file.nf", threads=4)
+        self.assertEqual(outputs, ["module1"])
+        mock_parse.assert_called_with("/ex/file.nf", threads=4)
+        mock_paths.assert_called_with("/ex/file.nf")
 
 
 
 class FileProcessPathsTests(TestCase):
 
     @patch("nextflow.outputs.get_file_text")
-    @patch("nextflow.outputs.get_import_names_to_paths")
-    def test_workflow_with_no_subworkflows(self, mock_imports, mock_open):
-        filestring = (
-            "include { MOD2   } from '../modules/python/check/main'\n"
-            "\n"
-            "workflow MYSUB {\n"
-            "MOD1()\n"
-            "MOD2()\n"
-            "}\n"
-            "\n"
-            "workflow {\n"
-            "MOD2()\n"
-            "MOD3()\n"
-            "}\n"
-        )
-        mock_open.side_effect = (filestring, "mod-1", "mod-2", "mod-3")
-        mock_imports.side_effect = [{
-            "MOD1": "/ex/modules/python/mod1/main.nf",
-            "MOD2": "/ex/modules/python/mod2/main.nf",
-            "MOD3": "/ex/modules/python/mod3/main.nf",
-        }, {}, {}, {}]
+    def test_workflow_with_no_subworkflows(self, mock_text):
+        files = {
+            "/ex/file.nf": (
+                "include { MOD1 } from './modules/python/mod1/main'\n"
+                "include { MOD2   } from './modules/python/mod2/main'\n"
+                "include { MOD3 } from './modules/python/mod3/main'\n"
+                "\n"
+                "workflow MYSUB {\n"
+                "MOD1()\n"
+                "MOD2()\n"
+                "}\n"
+                "\n"
+                "workflow {\n"
+                "MOD2()\n"
+                "MOD3()\n"
+                "}\n"
+            ),
+            "/ex/modules/python/mod1/main.nf": "mod-1",
+            "/ex/modules/python/mod2/main.nf": "mod-2",
+            "/ex/modules/python/mod3/main.nf": "mod-3",
+        }
+        mock_text.side_effect = lambda path: files[os.path.normpath(path)]
         paths = get_file_process_paths("/ex/file.nf")
         self.assertEqual(paths, {
             "MYSUB:MOD1": {"path": "/ex/modules/python/mod1/main.nf", "has_workflow_name": True},
@@ -51,73 +75,62 @@ class FileProcessPathsTests(TestCase):
             "MOD2": {"path": "/ex/modules/python/mod2/main.nf", "has_workflow_name": False},
             "MOD3": {"path": "/ex/modules/python/mod3/main.nf", "has_workflow_name": False}
         })
-        self.assertEqual(mock_open.call_args_list, [
-            call("/ex/file.nf"),
-            call("/ex/modules/python/mod1/main.nf"),
-            call("/ex/modules/python/mod2/main.nf"),
-            call("/ex/modules/python/mod3/main.nf"),
-        ])
-        self.assertEqual(mock_imports.call_args_list, [
-            call(filestring, "/ex/file.nf"),
-            call("mod-1", "/ex/modules/python/mod1/main.nf"),
-            call("mod-2", "/ex/modules/python/mod2/main.nf"),
-            call("mod-3", "/ex/modules/python/mod3/main.nf"),
-        ])
+        self.assertEqual({os.path.normpath(c[0][0]) for c in mock_text.call_args_list}, {
+            "/ex/file.nf",
+            "/ex/modules/python/mod1/main.nf",
+            "/ex/modules/python/mod2/main.nf",
+            "/ex/modules/python/mod3/main.nf",
+        })
     
 
     @patch("nextflow.outputs.get_file_text")
-    @patch("nextflow.outputs.get_import_names_to_paths")
-    def test_workflow_with_no_workflows(self, mock_imports, mock_open):
-        filestring1 = (
-            "include {\n" 
-            "  WORK2\n"
-            "   } from '../modules/python/check/main'\n"
-            "\n"
-            " workflow MYSUB   {\n"
-            "MOD1()\n"
-            "WORK2()\n"
-            "MOD2()\n"
-            "}\n"
-            "\n"
-            "workflow {\n"
-            "MOD2()\n"
-            "WORK1()\n"
-            "MOD3()\n"
-            "}\n"
-        )
-        filestring2 = (
-            "  workflow   MYSUB2{\n"
-            "MOD4()\n"
-            "MOD1()\n"
-            "}\n"
-            "\n"
-            "workflow{\n"
-            "MOD5()\n"
-            "MYSUB2()\n"
-            "}\n"
-        )
-        filestring3 = (
-            "     workflow{\n"
-            "MOD5()\n"
-            "MOD2()\n"
-            "}\n"
-        )
-        mock_open.side_effect = (
-            filestring1, "mod-1", filestring2, "mod-4", "mod-5", "mod-2", "mod-3", filestring3, "mod-5", "mod-2"
-        )
-        mock_imports.side_effect = [{
-            "MOD1": "/ex/modules/python/mod1/main.nf",
-            "WORK1": "/ex/workflows/python/work1/main.nf",
-            "MOD2": "/ex/modules/python/mod2/main.nf",
-            "MOD3": "/ex/modules/python/mod3/main.nf",
-            "WORK2": "/ex/workflows/python/work2/main.nf",
-        }, {}, {
-            "MOD4": "/ex/modules/python/mod4/main.nf",
-            "MOD5": "/ex/modules/python/mod5/main.nf",
-        }, {}, {}, {}, {}, {
-            "MOD5": "/ex/modules/python/mod5/main.nf",
-            "MOD2": "/ex/modules/python/mod2/main.nf",
-        }, {}, {}]
+    def test_workflow_with_no_workflows(self, mock_text):
+        files = {
+            "/ex/file.nf": (
+                "include { MOD1 } from './modules/python/mod1/main'\n"
+                "include { WORK1 } from './workflows/python/work1/main'\n"
+                "include { MOD2 } from './modules/python/mod2/main'\n"
+                "include { MOD3 } from './modules/python/mod3/main'\n"
+                "include {\n" 
+                "  WORK2\n"
+                "   } from './workflows/python/work2/main'\n"
+                "\n"
+                " workflow MYSUB   {\n"
+                "MOD1()\n"
+                "WORK2()\n"
+                "MOD2()\n"
+                "}\n"
+                "\n"
+                "workflow {\n"
+                "MOD2()\n"
+                "WORK1()\n"
+                "MOD3()\n"
+                "}\n"
+            ),
+            "/ex/workflows/python/work1/main.nf": (
+                "include { MOD4 } from '../../../modules/python/mod4/main'\n"
+                "include { MOD5 } from '../../../modules/python/mod5/main'\n"
+                "  workflow   MYSUB2{\n"
+                "MOD4()\n"
+                "MOD1()\n"
+                "}\n"
+                "\n"
+                "workflow{\n"
+                "MOD5()\n"
+                "MYSUB2()\n"
+                "}\n"
+            ),
+            "/ex/workflows/python/work2/main.nf": (
+                "include { MOD5 } from '../../../modules/python/mod5/main'\n"
+                "include { MOD2 } from '../../../modules/python/mod2/main'\n"
+                "     workflow{\n"
+                "MOD5()\n"
+                "MOD2()\n"
+                "}\n"
+            ),
+            **{f"/ex/modules/python/mod{n}/main.nf": f"mod-{n}" for n in range(1, 6)},
+        }
+        mock_text.side_effect = lambda path: files[os.path.normpath(path)]
         paths = get_file_process_paths("/ex/file.nf")
         self.assertEqual(paths, {
             "MYSUB:MOD1": {"path": "/ex/modules/python/mod1/main.nf", "has_workflow_name": True},
@@ -129,31 +142,238 @@ class FileProcessPathsTests(TestCase):
             "WORK1:MOD5": {"path": "/ex/modules/python/mod5/main.nf", "has_workflow_name": False},
             "MOD3": {"path": "/ex/modules/python/mod3/main.nf", "has_workflow_name": False}
         })
-        self.assertEqual(mock_open.call_args_list, [
-            call("/ex/file.nf"),
-            call("/ex/modules/python/mod1/main.nf"),
-            call("/ex/workflows/python/work1/main.nf"),
-            call("/ex/modules/python/mod4/main.nf"),
-            call("/ex/modules/python/mod5/main.nf"),
-            call("/ex/modules/python/mod2/main.nf"),
-            call("/ex/modules/python/mod3/main.nf"),
-            call("/ex/workflows/python/work2/main.nf"),
-            call("/ex/modules/python/mod5/main.nf"),
-            call("/ex/modules/python/mod2/main.nf"),
-        ])
-        self.assertEqual(mock_imports.call_args_list, [
-            call(filestring1, "/ex/file.nf"),
-            call("mod-1", "/ex/modules/python/mod1/main.nf"),
-            call(filestring2, "/ex/workflows/python/work1/main.nf"),
-            call("mod-4", "/ex/modules/python/mod4/main.nf"),
-            call("mod-5", "/ex/modules/python/mod5/main.nf"),
-            call("mod-2", "/ex/modules/python/mod2/main.nf"),
-            call("mod-3", "/ex/modules/python/mod3/main.nf"),
-            call(filestring3, "/ex/workflows/python/work2/main.nf"),
-            call("mod-5", "/ex/modules/python/mod5/main.nf"),
-            call("mod-2", "/ex/modules/python/mod2/main.nf"),
-        ])
+        self.assertEqual(
+            {os.path.normpath(c[0][0]) for c in mock_text.call_args_list}, set(files)
+        )
+    
+
+    @patch("nextflow.outputs.get_file_text")
+    def test_workflow_with_processes_defined_alongside_subworkflows(self, mock_text):
+        files = {
+            "/ex/file.nf": (
+                "include { MOD1; MOD2; MOD3 } from './modules/python/mods'\n"
+                "include { WORK1 } from './workflows/python/work1/main'\n"
+                "include {\n" 
+                "  WORK2\n"
+                "   } from './workflows/python/work2/main'\n"
+                "\n"
+                " workflow MYSUB   {\n"
+                "MOD1()\n"
+                "WORK2()\n"
+                "MOD2()\n"
+                "}\n"
+                "\n"
+                "workflow {\n"
+                "MOD2()\n"
+                "WORK1()\n"
+                "MOD3()\n"
+                "}\n"
+            ),
+            "/ex/modules/python/mods.nf": (
+                "process MOD1 {\n}\nprocess MOD2 {\n}\nprocess MOD3 {\n}\n"
+            ),
+            "/ex/workflows/python/work1/main.nf": (
+                "include { MOD4 } from '../../../modules/python/mod4/main'\n"
+                "include { MOD5 } from '../../../modules/python/mod5/main'\n"
+                "  workflow   WORK1{\n"
+                "MOD4()\n"
+                "MOD5()\n"
+                "}\n"
+            ),
+            "/ex/workflows/python/work2/main.nf": (
+                "include { MOD5 } from '../../../modules/python/mod5/main'\n"
+                "     workflow WORK2{\n"
+                "MOD5()\n"
+                "MOD2()\n"
+                "}\n"
+                "process MOD2 {\n}\n"
+            ),
+            "/ex/modules/python/mod4/main.nf": "process MOD4 {\n}\n",
+            "/ex/modules/python/mod5/main.nf": "process MOD5 {\n}\n",
+        }
+        mock_text.side_effect = lambda path: files[os.path.normpath(path)]
+        paths = get_file_process_paths("/ex/file.nf")
+        self.assertEqual(paths, {
+            "MYSUB:MOD1": {"path": "/ex/modules/python/mods.nf", "has_workflow_name": True},
+            "MYSUB:WORK2:MOD5": {"path": "/ex/modules/python/mod5/main.nf", "has_workflow_name": True},
+            "MYSUB:WORK2:MOD2": {"path": "/ex/workflows/python/work2/main.nf", "has_workflow_name": True},
+            "MYSUB:MOD2": {"path": "/ex/modules/python/mods.nf", "has_workflow_name": True},
+            "MOD2": {"path": "/ex/modules/python/mods.nf", "has_workflow_name": False},
+            "WORK1:MOD4": {"path": "/ex/modules/python/mod4/main.nf", "has_workflow_name": False},
+            "WORK1:MOD5": {"path": "/ex/modules/python/mod5/main.nf", "has_workflow_name": False},
+            "MOD3": {"path": "/ex/modules/python/mods.nf", "has_workflow_name": False}
+        })
+    
 
+    @patch("nextflow.outputs.get_file_text")
+    def test_can_follow_local_workflows_and_aliases(self, mock_text):
+        files = {
+            "/ex/file.nf": (
+                "include { MOD1 as ALIGN } from './mod1'\n"
+                "workflow SUB {\n"
+                "ALIGN()\n"
+                "LOCAL()\n"
+                "}\n"
+                "workflow {\n"
+                "SUB()\n"
+                "}\n"
+                "process LOCAL {\n"
+                "}\n"
+            ),
+            "/ex/mod1.nf": "process MOD1 {\n}\n",
+        }
+        mock_text.side_effect = lambda path: files[os.path.normpath(path)]
+        paths = get_file_process_paths("/ex/file.nf")
+        self.assertEqual(paths, {
+            "SUB:ALIGN": {"path": "/ex/mod1.nf", "has_workflow_name": True},
+            "SUB:LOCAL": {"path": "/ex/file.nf", "has_workflow_name": True},
+        })
+
+
+
+    @patch("nextflow.outputs.get_file_text")
+    def test_can_follow_aliased_workflows(self, mock_text):
+        files = {
+            "/ex/file.nf": (
+                "include { ALIGN as ALIGN_READS } from './align'\n"
+                "include { QC } from './qc'\n"
+                "workflow {\n"
+                "ALIGN_READS()\n"
+                "QC()\n"
+                "}\n"
+            ),
+            "/ex/align.nf": (
+                "include { STAR } from './star'\n"
+                "workflow ALIGN {\n"
+                "STAR()\n"
+                "}\n"
+            ),
+            "/ex/qc.nf": (
+                "include { FASTQC } from './fastqc'\n"
+                "workflow QUALITY {\n"
+                "FASTQC()\n"
+                "}\n"
+            ),
+            "/ex/star.nf": "process STAR {\n}\n",
+            "/ex/fastqc.nf": "process FASTQC {\n}\n",
+        }
+        mock_text.side_effect = lambda path: files[os.path.normpath(path)]
+        paths = get_file_process_paths("/ex/file.nf")
+        self.assertEqual(paths, {
+            "ALIGN_READS:STAR": {"path": "/ex/star.nf", "has_workflow_name": False},
+            "QC:FASTQC": {"path": "/ex/fastqc.nf", "has_workflow_name": False},
+        })
+
+
+
+class ParseCacheTests(TestCase):
+
+    def setUp(self):
+        clear_parse_cache()
+        self.directory = tempfile.TemporaryDirectory()
+        self.main = os.path.join(self.directory.name, "main.nf")
+        self.module = os.path.join(self.directory.name, "modules", "mod1.nf")
+        os.mkdir(os.path.dirname(self.module))
+        with open(self.main, "w") as f:
+            f.write("include { MOD1 } from './modules/mod1'\nworkflow {\nMOD1()\n}\n")
+        with open(self.module, "w") as f:
+            f.write("process MOD1 {\n}\n")
+    
+
+    def tearDown(self):
+        clear_parse_cache()
+        self.directory.cleanup()
+    
+
+    def test_unchanged_files_parsed_once(self):
+        with patch("nextflow.outputs.get_file_text", wraps=get_file_text) as mock_text:
+            self.assertEqual(get_pipeline_process_names(self.main), ["MOD1"])
+            self.assertEqual(mock_text.call_count, 2)
+            self.assertEqual(get_pipeline_process_names(self.main), ["MOD1"])
+            self.assertEqual(mock_text.call_count, 2)
+    
+
+    def test_changed_files_parsed_again(self):
+        self.assertEqual(get_pipeline_process_names(self.main), ["MOD1"])
+        with open(self.main, "w") as f:
+            f.write("include { MOD1 as MOD2 } from './modules/mod1'\nworkflow {\nMOD2()\n}\n")
+        self.assertEqual(get_pipeline_process_names(self.main), ["MOD2"])
+    
+
+    def test_missing_files_not_cached(self):
+        self.assertEqual(parse_file("/ex/missing.nf"), Script(
+            path="/ex/missing.nf", includes={}, processes=[], workflows={}
+        ))
+        self.assertEqual(get_file_cache_key("/ex/missing.nf"), None)
+    
+
+    def test_can_save_and_load_cache(self):
+        cache_path = os.path.join(self.directory.name, "cache.json")
+        self.assertEqual(get_pipeline_process_names(self.main, cache_path=cache_path), ["MOD1"])
+        self.assertTrue(os.path.exists(cache_path))
+        clear_parse_cache()
+        with patch("nextflow.outputs.get_file_text") as mock_text:
+            self.assertEqual(get_pipeline_process_names(self.main, cache_path=cache_path), ["MOD1"])
+            self.assertFalse(mock_text.called)
+    
+
+    def test_can_handle_missing_or_invalid_cache_file(self):
+        cache_path = os.path.join(self.directory.name, "cache.json")
+        load_parse_cache(cache_path)
+        with open(cache_path, "w") as f: f.write("{")
+        load_parse_cache(cache_path)
+        self.assertEqual(get_pipeline_process_names(self.main), ["MOD1"])
+
+
+
+class PipelineFileParsingTests(TestCase):
+
+    def setUp(self):
+        clear_parse_cache()
+        self.directory = tempfile.TemporaryDirectory()
+        self.files = {
+            "main.nf": (
+                "include { SUB1 } from './sub1'\ninclude { SUB2 } from './sub2'\n"
+                "workflow {\nSUB1()\nSUB2()\n}\n"
+            ),
+            "sub1.nf": (
+                "include { MOD1 } from './mod1'\ninclude { SUB2 } from './sub2'\n"
+                "workflow SUB1 {\nMOD1()\nSUB2()\n}\n"
+            ),
+            "sub2.nf": (
+                "include { MOD1 } from './mod1'\ninclude { SUB1 } from './sub1'\n"
+                "workflow SUB2 {\nMOD1()\nSUB1()\n}\n"
+            ),
+            "mod1.nf": "process MOD1 {\n}\n",
+        }
+        for name, text in self.files.items():
+            with open(os.path.join(self.directory.name, name), "w") as f:
+                f.write(text)
+        self.main = os.path.join(self.directory.name, "main.nf")
+    
+
+    def tearDown(self):
+        clear_parse_cache()
+        self.directory.cleanup()
+    
+
+    def test_can_parse_each_file_once(self):
+        with patch("nextflow.outputs.get_file_text", wraps=get_file_text) as mock_text:
+            scripts = parse_pipeline_files(self.main, threads=2)
+            self.assertEqual(mock_text.call_count, 4)
+        self.assertEqual(set(scripts), {
+            os.path.join(self.directory.name, name) for name in self.files
+        })
+        self.assertEqual(scripts[self.main].workflows, {"": ["SUB1", "SUB2"]})
+    
+
+    def test_cycles_give_same_names_in_parallel(self):
+        names = get_pipeline_process_names(self.main)
+        self.assertEqual(names, [
+            "SUB1:MOD1", "SUB1:SUB2:MOD1", "SUB2:MOD1", "SUB2:SUB1:MOD1"
+        ])
+        clear_parse_cache()
+        self.assertEqual(get_pipeline_process_names(self.main, threads=4), names)
 
 
 
@@ -107,7 +107,7 @@ class InputDataTests(ProcessExecutionTest):
             self.process_execution.input_data(),
             ["/work/25/7eaa7786ca/file1.dat", "/work/fe/3b80569ba5/file2.dat"]
         )
-        mock_text.assert_called_with(Path("/loc/.command.run"))
+        mock_text.assert_called_with(Path("/loc/.command.run"), None)
     
 
     @patch("nextflow.models.ProcessExecution.full_path", new_callable=PropertyMock)
@@ -119,7 +119,21 @@ class InputDataTests(ProcessExecutionTest):
             self.process_execution.input_data(include_path=False),
             ["file1.dat", "file2.dat"]
         )
-        mock_text.assert_called_with(Path("/loc/.command.run"))
+        mock_text.assert_called_with(Path("/loc/.command.run"), None)
+    
+
+    @patch("nextflow.models.ProcessExecution.full_path", new_callable=PropertyMock)
+    @patch("nextflow.models.get_file_text")
+    def test_input_data_read_once(self, mock_text, mock_path):
+        mock_text.return_value = self.text
+        mock_path.return_value = Path("/loc")
+        self.process_execution.io = Mock()
+        self.process_execution.input_data().append("x")
+        self.assertEqual(
+            self.process_execution.input_data(include_path=False),
+            ["file1.dat", "file2.dat"]
+        )
+        mock_text.assert_called_once_with(Path("/loc/.command.run"), self.process_execution.io)
     
 
     @patch("nextflow.models.ProcessExecution.full_path", new_callable=PropertyMock)
@@ -130,7 +144,7 @@ class InputDataTests(ProcessExecutionTest):
         self.assertEqual(
             self.process_execution.input_data(include_path=False), []
         )
-        mock_text.assert_called_with(Path("/loc/.command.run"))
+        mock_text.assert_called_with(Path("/loc/.command.run"), None)
     
 
     @patch("nextflow.models.ProcessExecution.full_path", new_callable=PropertyMock)
@@ -141,7 +155,7 @@ class InputDataTests(ProcessExecutionTest):
         self.assertEqual(
             self.process_execution.input_data(include_path=False), []
         )
-        mock_text.assert_called_with(Path("/loc/.command.run"))
+        mock_text.assert_called_with(Path("/loc/.command.run"), None)
     
 
     @patch("nextflow.models.ProcessExecution.full_path", new_callable=PropertyMock)
@@ -178,7 +192,7 @@ class InputDataTests(ProcessExecutionTest):
             self.process_execution.input_data(),
             ["/work/25/7eaa7786ca/file1.dat", "/work/fe/3b80569ba5/file2.dat"]
         )
-        mock_text.assert_called_with(Path("/loc/.command.run"))
+        mock_text.assert_called_with(Path("/loc/.command.run"), None)
 
 
 
@@ -239,4 +253,13 @@ class AllOutputDataTests(ProcessExecutionTest):
             self.make_process_execution(io=io).all_output_data(),
             [str(Path("/loc/file1")), str(Path("/loc/file3"))]
         )
-        mock_input.assert_called_with(include_path=False)
\ No newline at end of file
+        mock_input.assert_called_with(include_path=False)
+
+
+class OutputFilesTests(ProcessExecutionTest):
+
+    @patch("nextflow.files.get_output_files")
+    def test_can_get_output_files(self, mock_get):
+        process_execution = self.make_process_execution()
+        self.assertIs(process_execution.output_files(True, threads=4), mock_get.return_value)
+        mock_get.assert_called_with(process_execution, True, False, threads=4)
@@ -0,0 +1,150 @@
+import os
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import patch
+from nextflow.progress import *
+from .base import ModelTest, START
+
+class ProgressTest(ModelTest):
+
+    def make_completed_process_execution(self, process, seconds, status="COMPLETED", **kwargs):
+        return self.make_process_execution(
+            process=process, status=status, started=START,
+            finished=START + timedelta(seconds=seconds), **kwargs
+        )
+
+
+
+class ProgressTests(ProgressTest):
+
+    def setUp(self):
+        self.now = START + timedelta(hours=1)
+        self.names = ["SUB:MOD1", "SUB:MOD2", "MOD3"]
+
+
+    def test_can_get_progress_with_no_process_executions(self):
+        execution = self.make_execution(process_executions=[])
+        progress = get_progress(execution, self.names, now=self.now)
+        self.assertEqual(progress.completed, 0)
+        self.assertEqual(progress.expected, 3)
+        self.assertIsNone(progress.eta)
+        self.assertEqual(progress.fraction, 0)
+
+
+    def test_can_estimate_from_execution(self):
+        execution = self.make_execution(process_executions=[
+            self.make_completed_process_execution("MAIN:SUB:MOD1", 10),
+            self.make_completed_process_execution("MAIN:SUB:MOD1", 30),
+            self.make_process_execution(process="MAIN:SUB:MOD1", started=self.now - timedelta(seconds=5)),
+            self.make_process_execution(process="MAIN:SUB:MOD2", started=self.now - timedelta(seconds=5)),
+        ])
+        progress = get_progress(execution, self.names, now=self.now)
+        self.assertEqual(progress.completed, 2)
+        self.assertEqual(progress.expected, 5)
+        self.assertEqual(progress.fraction, 0.4)
+        self.assertEqual(progress.eta, timedelta(seconds=(15 + 15 + 20) / 2))
+
+
+    def test_can_estimate_from_historical_durations(self):
+        execution = self.make_execution(process_executions=[
+            self.make_completed_process_execution("MAIN:SUB:MOD1", 10),
+            self.make_process_execution(process="MAIN:SUB:MOD2", started=self.now - timedelta(seconds=5)),
+        ])
+        durations = {"MAIN:SUB:MOD2": 20, "MAIN:MOD3": 100}
+        progress = get_progress(execution, self.names, durations, now=self.now)
+        self.assertEqual(progress.completed, 1)
+        self.assertEqual(progress.expected, 3)
+        self.assertEqual(progress.eta, timedelta(seconds=115))
+
+
+    def test_can_count_processes_not_in_static_list(self):
+        execution = self.make_execution(process_executions=[
+            self.make_completed_process_execution("DYNAMIC", 10),
+        ])
+        progress = get_progress(execution, self.names, now=self.now)
+        self.assertEqual(progress.completed, 1)
+        self.assertEqual(progress.expected, 4)
+        self.assertEqual(progress.eta, timedelta(seconds=30))
+
+
+
+    def test_skipped_processes_are_not_expected_once_finished(self):
+        execution = self.make_execution(process_executions=[
+            self.make_completed_process_execution("MAIN:SUB:MOD1", 10),
+            self.make_completed_process_execution("MAIN:SUB:MOD2", 10),
+        ])
+        progress = get_progress(execution, self.names, now=self.now)
+        self.assertEqual(progress.expected, 3)
+        self.assertEqual(progress.eta, timedelta(seconds=10))
+        execution.finished = self.now
+        progress = get_progress(execution, self.names, now=self.now)
+        self.assertEqual(progress.completed, 2)
+        self.assertEqual(progress.expected, 2)
+        self.assertEqual(progress.fraction, 1)
+        self.assertEqual(progress.eta, timedelta())
+
+
+
+class StaticProcessNameTests(TestCase):
+
+    def test_can_match_full_name(self):
+        self.assertEqual(get_static_process_name("SUB:MOD1", {"SUB:MOD1"}), "SUB:MOD1")
+
+
+    def test_can_match_with_extra_workflow_names(self):
+        self.assertEqual(get_static_process_name("MAIN:SUB:MOD1", {"SUB:MOD1"}), "SUB:MOD1")
+
+
+    def test_can_handle_no_match(self):
+        self.assertIsNone(get_static_process_name("MAIN:MOD2", {"SUB:MOD1"}))
+
+
+
+class ExpectedProcessNamesTests(TestCase):
+
+    @patch("nextflow.progress.get_pipeline_process_names")
+    @patch("os.path.isfile")
+    @patch("os.path.isdir")
+    def test_can_get_names_relative_to_run_path(self, mock_isdir, mock_isfile, mock_names):
+        mock_isdir.return_value = False
+        self.assertIs(get_expected_process_names("main.nf", "/run"), mock_names.return_value)
+        mock_names.assert_called_with(os.path.join("/run", "main.nf"))
+        get_expected_process_names("/pipe/main.nf", "/run")
+        mock_names.assert_called_with("/pipe/main.nf")
+
+
+    @patch("nextflow.progress.get_pipeline_process_names")
+    @patch("os.path.isfile")
+    @patch("os.path.isdir")
+    def test_can_get_names_from_directory(self, mock_isdir, mock_isfile, mock_names):
+        mock_isdir.return_value = True
+        get_expected_process_names("/pipe")
+        mock_names.assert_called_with(os.path.join("/pipe", "main.nf"))
+
+
+    @patch("nextflow.progress.get_pipeline_process_names")
+    def test_can_handle_unreadable_pipeline(self, mock_names):
+        self.assertEqual(get_expected_process_names("nf-core/rnaseq", "/run"), [])
+        self.assertFalse(mock_names.called)
+        with patch("os.path.isfile", return_value=True):
+            mock_names.side_effect = PermissionError
+            self.assertEqual(get_expected_process_names("main.nf"), [])
+
+
+
+class ProcessDurationsTests(ProgressTest):
+
+    def test_can_get_mean_durations(self):
+        executions = [
+            self.make_execution(process_executions=[
+                self.make_completed_process_execution("MOD1", 10),
+                self.make_completed_process_execution("MOD1", 20, cached=True),
+                self.make_completed_process_execution("MOD2", 5, "FAILED"),
+            ]),
+            self.make_execution(process_executions=[
+                self.make_completed_process_execution("MOD1", 30),
+                self.make_completed_process_execution("MOD2", 6),
+                self.make_process_execution(process="MOD3"),
+            ]),
+        ]
+        self.assertEqual(get_process_durations(executions), {"MOD1": 20, "MOD2": 6})
@@ -0,0 +1,86 @@
+from unittest import TestCase
+from nextflow.script import *
+
+class TokenizeTests(TestCase):
+
+    def test_can_tokenize_script(self):
+        text = "include { A } from './a' // comment\n/* x { */ B(\"s\")"
+        self.assertEqual([t[:2] for t in tokenize(text)], [
+            ("name", "include"), ("symbol", "{"), ("name", "A"),
+            ("symbol", "}"), ("name", "from"), ("string", "./a"),
+            ("name", "B"), ("symbol", "("), ("string", "s"), ("symbol", ")")
+        ])
+
+
+    def test_can_start_from_position(self):
+        self.assertEqual(list(tokenize("A B", 1)), [("name", "B", 3)])
+
+
+
+class ScriptParsingTests(TestCase):
+
+    def test_can_parse_script(self):
+        text = (
+            "include { MOD1; MOD2 as ALIGN } from './modules/mods'\n"
+            "include {\n  SUB\n} from \"./workflows/sub.nf\"\n"
+            "process LOCAL {\n"
+            "    script:\n"
+            "    \"\"\"\n"
+            "    echo '}' workflow { MOD1() }\n"
+            "    \"\"\"\n"
+            "}\n"
+            "workflow MAIN {\n"
+            "    // MOD1()\n"
+            "    ALIGN(ch.MOD1)\n"
+            "    x = \"SUB()\"\n"
+            "    LOCAL(); ALIGN()\n"
+            "    MAIN()\n"
+            "}\n"
+            "workflow {\n"
+            "    MAIN()\n"
+            "    SUB()\n"
+            "}\n"
+        )
+        script = parse_script(text, "/ex/main.nf")
+        self.assertEqual(script.path, "/ex/main.nf")
+        self.assertEqual(script.includes, {
+            "MOD1": {"name": "MOD1", "path": "/ex/./modules/mods.nf"},
+            "ALIGN": {"name": "MOD2", "path": "/ex/./modules/mods.nf"},
+            "SUB": {"name": "SUB", "path": "/ex/./workflows/sub.nf"},
+        })
+        self.assertEqual(script.processes, ["LOCAL"])
+        self.assertEqual(script.workflows, {
+            "MAIN": ["ALIGN", "LOCAL"], "": ["MAIN", "SUB"]
+        })
+
+
+    def test_can_handle_empty_script(self):
+        self.assertEqual(parse_script(""), Script(
+            path="", includes={}, processes=[], workflows={}
+        ))
+
+
+    def test_can_ignore_invalid_statements(self):
+        text = (
+            "include NAME1 from 'path/to/file1'\n"
+            "include {NAME2} from path/to/file2\n"
+            "def process = 1\n"
+            "workflow {\n"
+            "NAME1()\n"
+        )
+        script = parse_script(text, "/ex/main.nf")
+        self.assertEqual(script.includes, {})
+        self.assertEqual(script.processes, [])
+        self.assertEqual(script.workflows, {"": []})
+
+
+
+class BlockEndTests(TestCase):
+
+    def test_can_get_block_end(self):
+        text = "{ a { b } '}' /* } */ // }\n } c }"
+        self.assertEqual(get_block_end(text, 1), 29)
+
+
+    def test_can_handle_unclosed_block(self):
+        self.assertEqual(get_block_end("{ a { b }", 1), 9)
@@ -0,0 +1,153 @@
+import os
+import json
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+from nextflow.spans import *
+from .base import ModelTest
+
+class SpanTest(ModelTest):
+
+    def make_process_execution(self, **kwargs):
+        return super().make_process_execution(**{
+            "process": "MAIN:FASTQC", "return_code": "0", "status": "COMPLETED",
+            "started": datetime(2025, 1, 1, 12, 1), "finished": datetime(2025, 1, 1, 12, 5),
+            "cpu": 95.5, **kwargs
+        })
+
+
+
+class SpanExporterTests(SpanTest):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "spans.jsonl")
+        self.exporter = SpanExporter(path=self.path, timezone="UTC")
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def read(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+
+    def test_finished_process_executions_exported_once(self):
+        execution = self.make_execution(process_executions=[
+            self.make_process_execution(identifier="aa/111111"),
+            self.make_process_execution(identifier="bb/222222", status="-", finished=None),
+            self.make_process_execution(identifier="cc/333333", cached=True),
+        ])
+        spans = self.exporter.update(execution)
+        self.assertEqual([s["name"] for s in spans], ["FASTQC (1)", "queue", "run"])
+        self.assertEqual(self.exporter.update(execution), [])
+        execution.process_executions[1].status = "FAILED"
+        execution.process_executions[1].finished = datetime(2025, 1, 1, 12, 2)
+        spans = self.exporter.update(execution)
+        self.assertEqual([s["status"]["code"] for s in spans], [2, 1, 2])
+        requests = self.read()
+        self.assertEqual(len(requests), 2)
+        resource = requests[0]["resourceSpans"][0]
+        self.assertEqual(resource["resource"]["attributes"], [
+            {"key": "service.name", "value": {"stringValue": "nextflow"}}
+        ])
+        self.assertEqual(len(resource["scopeSpans"][0]["spans"]), 3)
+
+
+    def test_spans_are_nested(self):
+        task, queue, run = self.exporter.update(self.make_execution(process_executions=[self.make_process_execution(identifier="aa/111111")]))
+        self.assertEqual(len(task["traceId"]), 32)
+        self.assertEqual(len(task["spanId"]), 16)
+        self.assertEqual({s["traceId"] for s in (task, queue, run)}, {task["traceId"]})
+        self.assertEqual(queue["parentSpanId"], task["spanId"])
+        self.assertEqual(run["parentSpanId"], task["spanId"])
+        self.assertEqual(task["startTimeUnixNano"], "1735732800000000000")
+        self.assertEqual(queue["endTimeUnixNano"], "1735732860000000000")
+        self.assertEqual(run["startTimeUnixNano"], "1735732860000000000")
+        self.assertEqual(run["endTimeUnixNano"], "1735733100000000000")
+        self.assertIn({"key": "nextflow.task.cpu", "value": {"doubleValue": 95.5}}, task["attributes"])
+        self.assertNotIn("nextflow.task.peak_rss", [a["key"] for a in task["attributes"]])
+
+
+    def test_execution_span_exported_when_finished(self):
+        execution = self.make_execution(process_executions=[self.make_process_execution(identifier="aa/111111")])
+        task = self.exporter.update(execution)[0]
+        execution.finished, execution.return_code = datetime(2025, 1, 1, 13), "0"
+        root, = self.exporter.update(execution)
+        self.assertEqual(task["parentSpanId"], root["spanId"])
+        self.assertNotIn("parentSpanId", root)
+        self.assertEqual(root["name"], "happy_turing")
+        self.assertEqual(root["status"], {"code": 1})
+        self.assertEqual(self.exporter.update(execution), [])
+
+
+    def test_no_spans_without_identifier(self):
+        execution = self.make_execution(process_executions=[self.make_process_execution(identifier="aa/111111")])
+        execution.identifier = ""
+        self.assertEqual(self.exporter.update(execution), [])
+        self.assertEqual(self.exporter.update(None), [])
+        self.assertFalse(os.path.exists(self.path))
+
+
+    def test_span_without_start_has_no_queue_or_run(self):
+        spans = self.exporter.update(self.make_execution(process_executions=[
+            self.make_process_execution(identifier="aa/111111", status="FAILED", started=None)
+        ]))
+        self.assertEqual(len(spans), 1)
+        self.assertEqual(spans[0]["startTimeUnixNano"], "1735732800000000000")
+
+
+    @patch("urllib.request.urlopen")
+    def test_can_send_to_collector(self, mock_urlopen):
+        exporter = SpanExporter(url="http://localhost:4318/")
+        mock_urlopen.side_effect = [OSError("refused"), MagicMock()]
+        exporter.update(self.make_execution(process_executions=[self.make_process_execution(identifier="aa/111111")]))
+        self.assertEqual(len(exporter.pending), 3)
+        exporter.update(self.make_execution(process_executions=[
+            self.make_process_execution(identifier="aa/111111"), self.make_process_execution(identifier="bb/222222")
+        ]))
+        self.assertEqual(exporter.pending, [])
+        request = mock_urlopen.call_args[0][0]
+        self.assertEqual(request.full_url, "http://localhost:4318/v1/traces")
+        self.assertEqual(request.get_header("Content-type"), "application/json")
+        body = json.loads(request.data)
+        self.assertEqual(len(body["resourceSpans"][0]["scopeSpans"][0]["spans"]), 6)
+
+
+    @patch("urllib.request.urlopen")
+    def test_pending_spans_are_capped(self, mock_urlopen):
+        exporter = SpanExporter(url="http://localhost:4318/", max_pending=4)
+        mock_urlopen.side_effect = OSError("refused")
+        exporter.update(self.make_execution(process_executions=[self.make_process_execution(identifier="aa/111111")]))
+        first = list(exporter.pending)
+        exporter.update(self.make_execution(process_executions=[
+            self.make_process_execution(identifier="aa/111111"), self.make_process_execution(identifier="bb/222222")
+        ]))
+        self.assertEqual(len(exporter.pending), 4)
+        self.assertEqual(exporter.pending[0], first[2])
+        self.assertNotIn(first[0], exporter.pending)
+
+
+
+class SpanHelperTests(TestCase):
+
+    def test_ids_are_deterministic(self):
+        self.assertEqual(make_id(16, "a", "b"), make_id(16, "a", "b"))
+        self.assertNotEqual(make_id(16, "a", "b"), make_id(16, "ab"))
+        self.assertEqual(len(make_id(32, "a")), 32)
+
+
+    def test_can_make_attributes(self):
+        self.assertEqual(make_attributes({"a": "x", "b": 2, "c": None, "d": "", "e": True}), [
+            {"key": "a", "value": {"stringValue": "x"}},
+            {"key": "b", "value": {"intValue": "2"}},
+            {"key": "e", "value": {"boolValue": True}},
+        ])
+
+
+    def test_can_convert_times(self):
+        self.assertEqual(to_unix_nano(datetime(2025, 1, 1, 12, 0, 0, 500), "UTC"), 1735732800000500000)
+        self.assertEqual(to_unix_nano(datetime(2025, 1, 1, 7), "America/New_York"), 1735732800000000000)
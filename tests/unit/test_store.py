@@ -0,0 +1,291 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+from nextflow.store import *
+from nextflow.exceptions import SQLiteNotSupportedError
+from .base import ModelTest
+
+class StoreTest(ModelTest):
+
+    def setUp(self):
+        self.store = ExecutionStore()
+
+
+    def tearDown(self):
+        self.store.close()
+
+
+    def make_process_execution(self, **kwargs):
+        return super().make_process_execution(**{
+            "started": datetime(2025, 1, 1, 12, 1), "bash": "echo", **kwargs
+        })
+
+
+
+class StoreSavingTests(StoreTest):
+
+    def setUp(self):
+        super().setUp()
+        self.execution = self.make_execution(stdout="out", log="LOG", process_executions=[
+            self.make_process_execution(identifier="aa/111111", process="MAIN:FASTQC"),
+            self.make_process_execution(identifier="bb/222222", process="MAIN:ALIGN"),
+        ])
+
+
+    def test_can_save_execution(self):
+        self.assertIsNone(self.execution.database_id)
+        execution_id = self.store.save(self.execution)
+        executions = self.store.get_executions()
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(executions[0].database_id, execution_id)
+        self.assertEqual(executions[0].identifier, "happy_turing")
+        self.assertEqual(executions[0].started, datetime(2025, 1, 1, 12))
+        self.assertEqual(executions[0].log, "")
+        self.assertEqual(
+            sorted(p.identifier for p in executions[0].process_executions),
+            ["aa/111111", "bb/222222"]
+        )
+        process_execution = executions[0].process_executions[0]
+        self.assertIs(process_execution.execution, executions[0])
+        self.assertEqual(process_execution.started, datetime(2025, 1, 1, 12, 1))
+
+
+    def test_can_update_execution_incrementally(self):
+        first_id = self.store.save(self.execution)
+        self.execution.return_code = "0"
+        self.execution.finished = datetime(2025, 1, 1, 13)
+        self.execution.process_executions[0].status = "COMPLETED"
+        self.execution.process_executions[0].finished = datetime(2025, 1, 1, 12, 5)
+        self.execution.process_executions[0].realtime = timedelta(seconds=90)
+        self.execution.process_executions.append(self.make_process_execution(identifier="cc/333333", process="MAIN:QC"))
+        changes = self.store.connection.total_changes
+        self.assertEqual(self.store.save(self.execution), first_id)
+        self.assertEqual(self.store.connection.total_changes - changes, 3)
+        execution = self.store.get_executions()[0]
+        self.assertEqual(execution.return_code, "0")
+        self.assertEqual(len(execution.process_executions), 3)
+        process_execution = self.store.get_process_executions(status="COMPLETED")[0]
+        self.assertEqual(process_execution.realtime, timedelta(seconds=90))
+        self.assertEqual(process_execution.finished, datetime(2025, 1, 1, 12, 5))
+
+
+    def test_execution_without_identifier_not_saved(self):
+        self.execution.identifier = ""
+        self.assertIsNone(self.store.save(self.execution))
+        self.assertIsNone(self.store.save(None))
+        self.assertEqual(self.store.get_executions(), [])
+
+
+    @patch("nextflow.store.sqlite_has_fts5")
+    def test_search_needs_fts5(self, mock_fts5):
+        mock_fts5.return_value = False
+        self.execution.finished = datetime(2025, 1, 1, 13)
+        self.execution.log = (
+            "Jan-08 17:40:59.388 [main] ERROR nextflow.cli.Launcher - @unknown\n"
+            "java.lang.OutOfMemoryError: Java heap space\n\tat x.y(Z.java:1)"
+        )
+        with ExecutionStore() as store:
+            self.assertFalse(store.searchable)
+            store.save(self.execution)
+            self.assertEqual(len(store.get_executions()[0].process_executions), 2)
+            self.assertEqual(store.connection.execute("SELECT COUNT(*) FROM errors").fetchone()[0], 1)
+            with self.assertRaises(SQLiteNotSupportedError):
+                store.search_errors("java heap space")
+
+
+    def test_can_check_for_fts5(self):
+        self.assertTrue(sqlite_has_fts5(self.store.connection))
+
+
+    def test_can_save_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.db")
+            with ExecutionStore(path) as store:
+                store.save(self.execution)
+            with ExecutionStore(path) as store:
+                self.assertEqual(len(store.get_executions()[0].process_executions), 2)
+
+
+
+class StoreQueryTests(StoreTest):
+
+    def setUp(self):
+        super().setUp()
+        for day, session in ((1, "s1"), (10, "s2"), (40, "s2")):
+            finished = datetime(2025, 3, 1) - timedelta(days=day) + timedelta(hours=1)
+            self.store.save(self.make_execution(
+                identifier=f"run_{'abc'[day % 3]}", path=f"/ex{day}", session_uuid=session,
+                started=datetime(2025, 3, 1) - timedelta(days=day), process_executions=[
+                    self.make_process_execution(
+                        identifier="aa/111111", process="MAIN:QC:FASTQC", status="FAILED",
+                        return_code="1", finished=finished, stderr="Killed"
+                    ),
+                    self.make_process_execution(
+                        identifier="bb/222222", process="MAIN:FASTQC", status="COMPLETED",
+                        finished=finished
+                    ),
+                    self.make_process_execution(
+                        identifier="cc/333333", process="MAIN:ALIGN", status="FAILED",
+                        return_code="1", finished=finished
+                    ),
+                ]
+            ))
+
+
+    def test_can_get_all_process_executions(self):
+        process_executions = self.store.get_process_executions()
+        self.assertEqual(len(process_executions), 9)
+        self.assertEqual(process_executions[0].execution.path, "/ex1")
+        self.assertEqual(process_executions[-1].execution.path, "/ex40")
+
+
+    def test_can_filter_by_process_name(self):
+        process_executions = self.store.get_process_executions(process="FASTQC")
+        self.assertEqual(len(process_executions), 6)
+        process_executions = self.store.get_process_executions(process="MAIN:QC:FASTQC")
+        self.assertEqual(len(process_executions), 3)
+
+
+    def test_can_get_failed_tasks_of_process_in_time_window(self):
+        process_executions = self.store.get_process_executions(
+            process="FASTQC", status="FAILED", since=datetime(2025, 3, 1) - timedelta(days=30)
+        )
+        self.assertEqual([p.execution.path for p in process_executions], ["/ex1", "/ex10"])
+        self.assertEqual(process_executions[0].stderr, "Killed")
+        process_executions = self.store.get_process_executions(
+            status="FAILED", until=datetime(2025, 2, 1)
+        )
+        self.assertEqual([p.process for p in process_executions], ["MAIN:ALIGN", "MAIN:QC:FASTQC"])
+
+
+    def test_can_filter_by_session_and_limit(self):
+        process_executions = self.store.get_process_executions(session_uuid="s2")
+        self.assertEqual({p.execution.path for p in process_executions}, {"/ex10", "/ex40"})
+        self.assertEqual(len(self.store.get_process_executions(limit=2)), 2)
+
+
+    def test_can_filter_executions(self):
+        executions = self.store.get_executions(session_uuid="s2", process_executions=False)
+        self.assertEqual([e.path for e in executions], ["/ex10", "/ex40"])
+        self.assertEqual(executions[0].process_executions, [])
+        executions = self.store.get_executions(since=datetime(2025, 2, 1), until=datetime(2025, 2, 25))
+        self.assertEqual([e.path for e in executions], ["/ex10"])
+
+
+    def test_queries_use_indexes(self):
+        for sql in [
+            "SELECT * FROM process_executions WHERE process_name = 'A' AND status = 'FAILED' AND finished >= '2025'",
+            "SELECT * FROM process_executions WHERE process = 'W:A' AND status = 'FAILED' AND finished >= '2025'",
+            "SELECT * FROM process_executions WHERE status = 'FAILED' AND finished >= '2025'",
+            "SELECT * FROM executions WHERE session_uuid = 's1'",
+        ]:
+            plan = " ".join(r[3] for r in self.store.connection.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            self.assertNotIn("SCAN", plan.replace("SCAN CONSTANT", ""))
+
+
+
+class ErrorSearchTests(StoreTest):
+
+    def setUp(self):
+        super().setUp()
+        self.execution = self.make_execution(log="LOG", process_executions=[
+            self.make_process_execution(
+                identifier="aa/111111", process="MAIN:FASTQC", status="FAILED",
+                stderr="Killed: exit status 137"
+            ),
+            self.make_process_execution(
+                identifier="bb/222222", process="MAIN:ALIGN", status="FAILED",
+                stderr="samtools: truncated file", stdout="Killed"
+            ),
+            self.make_process_execution(
+                identifier="cc/333333", process="MAIN:QC", status="COMPLETED",
+                stderr="warning: Killed nothing"
+            ),
+        ])
+        self.store.save(self.execution)
+
+
+    def test_can_search_failed_process_executions(self):
+        matches = self.store.search_errors("killed")
+        self.assertEqual(
+            [(m.process_execution.identifier, m.source) for m in matches],
+            [("bb/222222", "stdout"), ("aa/111111", "stderr")]
+        )
+        self.assertIs(matches[0].execution, matches[1].execution)
+        self.assertEqual(matches[0].execution.path, "/ex")
+        self.assertIs(matches[1].process_execution.execution, matches[1].execution)
+        self.assertEqual(matches[1].text, "Killed: exit status 137")
+        self.assertEqual(matches[1].snippet, "[Killed]: exit status 137")
+        self.assertLess(matches[0].rank, 0)
+
+
+    def test_plain_search_ignores_punctuation(self):
+        matches = self.store.search_errors('status 137 "Killed:')
+        self.assertEqual([m.process_execution.identifier for m in matches], ["aa/111111"])
+        self.assertEqual(self.store.search_errors("  "), [])
+
+
+    def test_can_use_raw_queries(self):
+        matches = self.store.search_errors('"exit status" OR truncated', raw=True)
+        self.assertEqual(len(matches), 2)
+        matches = self.store.search_errors("process: ALIGN AND killed", raw=True)
+        self.assertEqual([m.source for m in matches], ["stdout"])
+
+
+    def test_can_limit_matches(self):
+        self.assertEqual(len(self.store.search_errors("killed", limit=1)), 1)
+
+
+    def test_index_is_updated_when_output_changes(self):
+        self.execution.process_executions[0].stderr = "Segmentation fault"
+        self.store.save(self.execution)
+        self.store.save(self.execution)
+        self.assertEqual(len(self.store.search_errors("killed")), 1)
+        matches = self.store.search_errors("segmentation")
+        self.assertEqual(matches[0].process_execution.identifier, "aa/111111")
+        self.assertEqual(self.store.connection.execute("SELECT COUNT(*) FROM errors").fetchone()[0], 3)
+
+
+    def test_can_search_log_exceptions(self):
+        self.execution.log = (
+            "Jan-08 17:40:59.388 [main] ERROR nextflow.cli.Launcher - @unknown\n"
+            "java.lang.OutOfMemoryError: Java heap space\n\tat x.y(Z.java:1)"
+        )
+        self.store.save(self.execution)
+        self.assertEqual(self.store.search_errors("java heap space"), [])
+        self.execution.finished = datetime(2025, 1, 1, 13)
+        self.store.save(self.execution)
+        matches = self.store.search_errors("java heap space")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0].source, "log")
+        self.assertIsNone(matches[0].process_execution)
+        self.assertEqual(matches[0].execution.identifier, "happy_turing")
+
+
+    @patch("nextflow.store.get_exception_from_log")
+    def test_log_is_only_checked_once_finished(self, mock_exception):
+        mock_exception.return_value = ""
+        for finished in (None, None, datetime(2025, 1, 1, 13), datetime(2025, 1, 1, 13)):
+            self.execution.finished = finished
+            self.store.save(self.execution)
+        mock_exception.assert_called_once_with("LOG")
+        self.assertEqual(self.store.log_exceptions, {1: ""})
+        self.assertNotIn("", self.store.saved[1])
+
+
+
+class SerializationTests(TestCase):
+
+    def test_can_serialize_values(self):
+        self.assertEqual(serialize_value(datetime(2025, 1, 2, 3, 4, 5)), "2025-01-02 03:04:05")
+        self.assertEqual(serialize_value(timedelta(minutes=1, milliseconds=500)), 60.5)
+        self.assertEqual(serialize_value("x"), "x")
+        self.assertIsNone(serialize_value(None))
+
+
+    def test_can_parse_datetimes(self):
+        self.assertEqual(parse_datetime("2025-01-02 03:04:05.100000"), datetime(2025, 1, 2, 3, 4, 5, 100000))
+        self.assertIsNone(parse_datetime(None))
+
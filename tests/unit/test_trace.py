@@ -0,0 +1,145 @@
+import io
+import os
+import tempfile
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import Mock
+from nextflow.trace import *
+
+HEADER = "task_id\thash\tnative_id\tname\tstatus\texit\tsubmit\tduration\trealtime\t%cpu\tpeak_rss\tpeak_vmem\trchar\twchar\n"
+ROW1 = "1\tab/123456\t111\tPROC (1)\tCOMPLETED\t0\t2024-01-01 12:00:00.000\t2s\t1m 4s\t95.3%\t12.5 MB\t20 MB\t1 KB\t512 B\n"
+ROW2 = "2\tcd/789012\t222\tPROC (2)\tFAILED\t1\t2024-01-01 12:00:01.000\t1s\t250ms\t-\t-\t-\t-\t-\n"
+
+class TraceRecordIterationTests(TestCase):
+
+    def test_can_read_trace_records(self):
+        records = list(iter_trace_records(io.BytesIO((HEADER + ROW1 + ROW2).encode())))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].identifier, "ab/123456")
+        self.assertEqual(records[0].name, "PROC (1)")
+        self.assertEqual(records[0].status, "COMPLETED")
+        self.assertEqual(records[0].exit, "0")
+        self.assertEqual(records[0].realtime, timedelta(seconds=64))
+        self.assertEqual(records[0].cpu, 95.3)
+        self.assertEqual(records[0].peak_rss, int(12.5 * 1024 * 1024))
+        self.assertEqual(records[0].rchar, 1024)
+        self.assertEqual(records[0].wchar, 512)
+        self.assertEqual(records[0].offset, len(HEADER + ROW1))
+        self.assertEqual(records[0].fields["native_id"], "111")
+        self.assertEqual(records[1].realtime, timedelta(milliseconds=250))
+        self.assertIsNone(records[1].cpu)
+        self.assertIsNone(records[1].peak_rss)
+        self.assertEqual(records[1].offset, len(HEADER + ROW1 + ROW2))
+    
+
+    def test_can_resume_from_offset(self):
+        stream = io.BytesIO((HEADER + ROW1 + ROW2).encode())
+        records = list(iter_trace_records(stream, len(HEADER + ROW1)))
+        self.assertEqual([r.identifier for r in records], ["cd/789012"])
+    
+
+    def test_can_ignore_incomplete_lines(self):
+        stream = io.BytesIO((HEADER + ROW1 + ROW2[:-5]).encode())
+        self.assertEqual(len(list(iter_trace_records(stream))), 1)
+        self.assertEqual(list(iter_trace_records(io.BytesIO(HEADER[:-5].encode()))), [])
+    
+
+    def test_can_handle_missing_file(self):
+        self.assertEqual(list(iter_trace_records("/nonexistent/trace.txt")), [])
+
+
+
+class TraceValueParsingTests(TestCase):
+
+    def test_can_parse_durations(self):
+        self.assertEqual(parse_trace_duration("1h 2m 3.5s"), timedelta(seconds=3723.5))
+        self.assertEqual(parse_trace_duration("1d 1h"), timedelta(hours=25))
+        self.assertEqual(parse_trace_duration("1500"), timedelta(seconds=1.5))
+        self.assertIsNone(parse_trace_duration("-"))
+        self.assertIsNone(parse_trace_duration("soon"))
+    
+
+    def test_can_parse_memory(self):
+        self.assertEqual(parse_trace_memory("2 GB"), 2 * 1024 ** 3)
+        self.assertEqual(parse_trace_memory("100"), 100)
+        self.assertIsNone(parse_trace_memory("-"))
+        self.assertIsNone(parse_trace_memory("lots"))
+    
+
+    def test_can_parse_percentages(self):
+        self.assertEqual(parse_trace_percentage("101.2%"), 101.2)
+        self.assertEqual(parse_trace_percentage("50"), 50)
+        self.assertIsNone(parse_trace_percentage("-"))
+        self.assertIsNone(parse_trace_percentage("x%"))
+
+
+
+class ProcessExecutionsFromTraceTests(TestCase):
+
+    def test_can_update_process_executions(self):
+        process_executions = [
+            Mock(identifier="ab/123456", return_code="0"),
+            Mock(identifier="cd/789012", return_code=""),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.txt")
+            with open(path, "w") as f: f.write(HEADER + ROW1)
+            offset = update_process_executions_from_trace(process_executions, path)
+            self.assertEqual(offset, len(HEADER + ROW1))
+            with open(path, "a") as f: f.write(ROW2)
+            offset = update_process_executions_from_trace(process_executions, path, offset)
+            self.assertEqual(offset, len(HEADER + ROW1 + ROW2))
+        self.assertEqual(process_executions[0].realtime, timedelta(seconds=64))
+        self.assertEqual(process_executions[0].cpu, 95.3)
+        self.assertEqual(process_executions[0].rchar, 1024)
+        self.assertEqual(process_executions[0].return_code, "0")
+        self.assertEqual(process_executions[1].realtime, timedelta(milliseconds=250))
+        self.assertEqual(process_executions[1].return_code, "1")
+    
+
+    def test_can_skip_unknown_process_executions(self):
+        process_executions = [Mock(identifier="ab/123456", return_code="0")]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.txt")
+            with open(path, "w") as f: f.write(HEADER + ROW2 + ROW1)
+            offset = update_process_executions_from_trace(process_executions, path)
+        self.assertEqual(offset, len(HEADER + ROW2 + ROW1))
+        self.assertEqual(process_executions[0].realtime, timedelta(seconds=64))
+
+
+    def test_can_apply_unknown_rows_later(self):
+        process_executions, pending = [Mock(identifier="ab/123456", return_code="0")], {}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.txt")
+            with open(path, "w") as f: f.write(HEADER + ROW2 + ROW1)
+            offset = update_process_executions_from_trace(process_executions, path, 0, pending)
+            self.assertEqual(offset, len(HEADER + ROW2 + ROW1))
+            self.assertEqual(process_executions[0].cpu, 95.3)
+            self.assertEqual(list(pending), ["cd/789012"])
+            process_executions.append(Mock(identifier="cd/789012", return_code=""))
+            self.assertEqual(update_process_executions_from_trace(
+                process_executions, path, offset, pending
+            ), offset)
+        self.assertEqual(pending, {})
+        self.assertEqual(process_executions[1].realtime, timedelta(milliseconds=250))
+        self.assertEqual(process_executions[1].return_code, "1")
+
+
+    def test_can_read_trace_with_io(self):
+        process_executions = [
+            Mock(identifier="ab/123456", return_code="0"),
+            Mock(identifier="cd/789012", return_code=""),
+        ]
+        custom_io = Mock()
+        custom_io.read.return_value = (HEADER + ROW1 + ROW2).encode()
+        offset = update_process_executions_from_trace(
+            process_executions, "/remote/trace.txt", len(HEADER + ROW1), io=custom_io
+        )
+        custom_io.read.assert_called_with("/remote/trace.txt", "rb")
+        self.assertEqual(offset, len(HEADER + ROW1 + ROW2))
+        self.assertEqual(process_executions[1].realtime, timedelta(milliseconds=250))
+        self.assertIsInstance(process_executions[0].realtime, Mock)
+        custom_io.read.side_effect = FileNotFoundError
+        self.assertEqual(update_process_executions_from_trace(
+            process_executions, "/remote/trace.txt", offset, io=custom_io
+        ), offset)
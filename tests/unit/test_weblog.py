@@ -0,0 +1,113 @@
+import urllib.request
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import Mock
+from nextflow.weblog import *
+from .base import ModelTest
+
+class WeblogReceiverTests(TestCase):
+
+    def test_can_receive_events(self):
+        with WeblogReceiver() as receiver:
+            self.assertTrue(receiver.url.startswith("http://127.0.0.1:"))
+            for body in (b'{"event": "started"}', b"not json", b'{"event": "completed"}'):
+                request = urllib.request.Request(receiver.url, data=body, method="POST")
+                with urllib.request.urlopen(request) as response:
+                    self.assertEqual(response.status, 200)
+            self.assertEqual(receiver.get_events(), [
+                {"event": "started"}, {"event": "completed"}
+            ])
+            self.assertEqual(receiver.get_events(), [])
+
+
+
+class WeblogEventTests(ModelTest):
+
+    def make_execution(self, **kwargs):
+        kwargs = {"identifier": "", "started": None, "session_uuid": "", **kwargs}
+        return super().make_execution(**kwargs)
+
+
+    def test_can_apply_weblog_events(self):
+        execution = self.make_execution()
+        trace = {
+            "hash": "ab/123456", "name": "PROC (1)", "process": "PROC",
+            "workdir": "/ex/work/ab/123456789", "submit": 1704110400000,
+        }
+        apply_weblog_events(execution, [
+            {"event": "started", "runName": "big_name", "runId": "1234-5678", "utcTime": "2024-01-01T12:00:00Z"},
+            {"event": "process_submitted", "trace": {**trace, "status": "SUBMITTED"}},
+            {"event": "process_started", "trace": {**trace, "status": "RUNNING", "start": 1704110401000}},
+        ], timezone="UTC")
+        self.assertEqual(execution.identifier, "big_name")
+        self.assertEqual(execution.session_uuid, "1234-5678")
+        self.assertEqual(execution.started, datetime(2024, 1, 1, 12))
+        self.assertEqual(len(execution.process_executions), 1)
+        process_execution = execution.process_executions[0]
+        self.assertEqual(process_execution.identifier, "ab/123456")
+        self.assertEqual(process_execution.name, "PROC (1)")
+        self.assertEqual(process_execution.process, "PROC")
+        self.assertEqual(process_execution.path, "/ex/work/ab/123456789")
+        self.assertEqual(str(process_execution.full_path), "/ex/work/ab/123456789")
+        self.assertEqual(process_execution.submitted, datetime(2024, 1, 1, 12))
+        self.assertEqual(process_execution.started, datetime(2024, 1, 1, 12, 0, 1))
+        self.assertEqual(process_execution.status, "-")
+        self.assertIs(process_execution.execution, execution)
+        apply_weblog_events(execution, [
+            {"event": "process_completed", "trace": {
+                **trace, "status": "COMPLETED", "complete": 1704110403000, "exit": 0,
+                "realtime": 1500, "%cpu": 98.5, "peak_rss": 1024, "rchar": 10, "wchar": 20
+            }},
+            {"event": "completed", "utcTime": "2024-01-01T12:00:05Z", "metadata": {"workflow": {"exitStatus": 0}}},
+        ], timezone="UTC")
+        self.assertEqual(len(execution.process_executions), 1)
+        self.assertEqual(process_execution.status, "COMPLETED")
+        self.assertEqual(process_execution.finished, datetime(2024, 1, 1, 12, 0, 3))
+        self.assertEqual(process_execution.return_code, "0")
+        self.assertEqual(process_execution.realtime, timedelta(seconds=1.5))
+        self.assertEqual(process_execution.cpu, 98.5)
+        self.assertEqual(process_execution.peak_rss, 1024)
+        self.assertEqual(execution.finished, datetime(2024, 1, 1, 12, 0, 5))
+        self.assertEqual(execution.return_code, "0")
+
+
+    def test_can_handle_cached_and_unknown_events(self):
+        execution = self.make_execution()
+        apply_weblog_events(execution, [
+            {"event": "process_completed", "trace": {"hash": "ab/123456", "status": "CACHED"}},
+            {"event": "process_completed", "trace": {}},
+            {"event": "error"},
+        ])
+        self.assertEqual(len(execution.process_executions), 1)
+        self.assertTrue(execution.process_executions[0].cached)
+        self.assertEqual(execution.process_executions[0].status, "COMPLETED")
+
+
+
+class WeblogTimeTests(TestCase):
+
+    def test_can_parse_times(self):
+        self.assertEqual(parse_weblog_timestamp(1704110400000, "UTC"), datetime(2024, 1, 1, 12))
+        self.assertEqual(parse_weblog_timestamp(1704110400000, "America/New_York"), datetime(2024, 1, 1, 7))
+        self.assertIsNone(parse_weblog_timestamp(None))
+        self.assertEqual(parse_weblog_time("2024-01-01T12:00:00Z", "UTC"), datetime(2024, 1, 1, 12))
+        self.assertIsNone(parse_weblog_time("yesterday"))
+        self.assertIsNone(parse_weblog_time(None))
+
+
+
+class WeblogMetricsTests(TestCase):
+
+    def test_can_copy_metrics(self):
+        source = Mock(process_executions=[Mock(
+            identifier="ab/123456", realtime=1, cpu=2, peak_rss=3, rchar=4, wchar=5
+        )])
+        target = Mock(process_executions=[
+            Mock(identifier="ab/123456", realtime=None, cpu=None, peak_rss=None, rchar=None, wchar=9),
+            Mock(identifier="cd/789012", realtime=None),
+        ])
+        copy_weblog_metrics(source, target)
+        self.assertEqual(target.process_executions[0].realtime, 1)
+        self.assertEqual(target.process_executions[0].rchar, 4)
+        self.assertEqual(target.process_executions[0].wchar, 9)
+        self.assertIsNone(target.process_executions[1].realtime)